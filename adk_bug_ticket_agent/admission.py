@@ -0,0 +1,217 @@
+"""Admission control for agent turns: one turn per session, and a cap on agent runs per worker.
+
+Turns of the same session (two quick messages from one tab) run one after
+another: a turn waits for the previous one to finish before it loads the
+session, so they never run the agent on the same session concurrently or
+interleave their event appends. More than ADMISSION_SESSION_QUEUE turns
+waiting on one session are turned away with 429.
+
+At most ADMISSION_MAX_IN_FLIGHT agent runs (model calls) are in flight per
+worker. Up to ADMISSION_MAX_QUEUE more wait for a slot, first come first
+served, for at most ADMISSION_QUEUE_TIMEOUT_SECONDS. Beyond that the turn is
+answered 503 right away. Answers from the fast path or the response cache
+need no slot. Both rejections carry a Retry-After header estimated from the
+recent agent run time.
+
+Under WSGI every request runs on its own event loop, so waiters are futures
+on their own loops, woken through call_soon_threadsafe.
+"""
+
+import asyncio
+import collections
+import contextlib
+import math
+import os
+import threading
+import time
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", 32))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", 64))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", 15))
+# Turns of one session allowed to wait behind the running one.
+ADMISSION_SESSION_QUEUE = int(os.environ.get("ADMISSION_SESSION_QUEUE", 2))
+ADMISSION_SESSION_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_SESSION_TIMEOUT_SECONDS", 120))
+
+
+class Rejected(Exception):
+    """The turn was not admitted; answered with ``status`` and a Retry-After of ``retry_after`` seconds."""
+
+    def __init__(self, status, retry_after, message):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Slots:
+    """Counting semaphore with a bounded FIFO wait queue, usable from any event loop or thread."""
+
+    def __init__(self, limit, max_waiting):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.in_use = 0
+        self._waiters = collections.deque()  # (loop, future)
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    async def acquire(self, timeout):
+        """True once a slot is held; False when the queue is full or ``timeout`` passes first."""
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return True
+            if len(self._waiters) >= self.max_waiting:
+                return False
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+
+    def _grant(self, future):
+        # Runs on the waiter's loop. A waiter that gave up in the meantime passes the slot on.
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # The slot moves to the first waiter; in_use stays the same.
+                loop, future = self._waiters.popleft()
+            else:
+                self.in_use -= 1
+                return
+        try:
+            loop.call_soon_threadsafe(self._grant, future)
+        except RuntimeError:  # the waiter's loop is closed
+            self.release()
+
+
+def _once(release):
+    # Streaming responses release both from the generator and from response.close().
+    lock = threading.Lock()
+    done = []
+
+    def release_once():
+        with lock:
+            if done:
+                return
+            done.append(True)
+        release()
+    return release_once
+
+
+class AdmissionController:
+    """Per-session serialization and the per-worker cap on agent runs (see the module docstring)."""
+
+    def __init__(self, max_in_flight=ADMISSION_MAX_IN_FLIGHT, max_queue=ADMISSION_MAX_QUEUE,
+                 queue_timeout=ADMISSION_QUEUE_TIMEOUT_SECONDS, session_queue=ADMISSION_SESSION_QUEUE,
+                 session_timeout=ADMISSION_SESSION_TIMEOUT_SECONDS):
+        self.agent_slots = _Slots(max_in_flight, max_queue)
+        self.queue_timeout = queue_timeout
+        self.session_queue = session_queue
+        self.session_timeout = session_timeout
+        self._sessions = {}  # session key -> [_Slots, turns holding or waiting]
+        self._sessions_lock = threading.Lock()
+        # Exponentially weighted mean of how long an agent run holds its slot, for Retry-After.
+        self._mean_run_seconds = 1.0
+        self._stats_lock = threading.Lock()
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0,
+                      "rejected_session": 0, "session_waits": 0}
+
+    def _count(self, event):
+        with self._stats_lock:
+            self.stats[event] += 1
+
+    def retry_after(self):
+        """Seconds until a queued turn could expect a slot, rounded up."""
+        slots = self.agent_slots
+        backlog = (slots.waiting + 1) / max(slots.limit, 1)
+        return max(1, math.ceil(self._mean_run_seconds * backlog))
+
+    async def admit_session(self, key):
+        """Waits until ``key`` (app, user, session) has no turn running; raises Rejected (429) when too many wait.
+
+        Returns the release function for the end of the turn.
+        """
+        with self._sessions_lock:
+            entry = self._sessions.setdefault(key, [_Slots(1, self.session_queue), 0])
+            entry[1] += 1
+        slots = entry[0]
+        if slots.in_use:
+            self._count("session_waits")
+        try:
+            admitted = await slots.acquire(self.session_timeout)
+        except BaseException:
+            self._forget_session(key, entry)
+            raise
+        if not admitted:
+            self._forget_session(key, entry)
+            self._count("rejected_session")
+            raise Rejected(429, 1, "Another message of this conversation is still being answered.")
+
+        def release():
+            slots.release()
+            self._forget_session(key, entry)
+        return _once(release)
+
+    def _forget_session(self, key, entry):
+        with self._sessions_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._sessions[key]
+
+    async def admit_agent_run(self):
+        """Waits for an agent run slot; raises Rejected (503) when the queue is full or the wait times out.
+
+        Returns the release function for when the run is over.
+        """
+        slots = self.agent_slots
+        if slots.in_use >= slots.limit:
+            self._count("queued")
+        queue_full = slots.waiting >= slots.max_waiting
+        if not await slots.acquire(self.queue_timeout):
+            self._count("rejected_queue_full" if queue_full else "rejected_timeout")
+            raise Rejected(503, self.retry_after(), "The assistant is busy. Please retry shortly.")
+        self._count("admitted")
+        acquired_at = time.monotonic()
+
+        def release():
+            held = time.monotonic() - acquired_at
+            with self._stats_lock:
+                self._mean_run_seconds = 0.9 * self._mean_run_seconds + 0.1 * held
+            slots.release()
+        return _once(release)
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return dict(stats, in_flight=self.agent_slots.in_use, waiting=self.agent_slots.waiting,
+                    sessions=len(self._sessions))
+
+
+_admission_instance = None
+_init_lock = threading.Lock()
+
+def get_admission():
+    """The worker's AdmissionController, or None when ADMISSION_ENABLED is off."""
+    global _admission_instance
+    if not ADMISSION_ENABLED:
+        return None
+    if _admission_instance is None:
+        with _init_lock:
+            if _admission_instance is None:
+                _admission_instance = AdmissionController()
+    return _admission_instance
@@ -0,0 +1,106 @@
+"""Rolling summaries for long chat sessions.
+
+The session service only loads the last SESSION_WINDOW_TURNS turns of a
+session. Older turns are folded into a summary kept in the session state
+under SUMMARY_STATE_KEY, and inject_conversation_summary adds it to the
+system instruction of every model call (or ahead of the contents when the
+instruction is served from context_cache).
+"""
+
+import os
+
+from google.genai import types as genai_types
+
+SUMMARY_STATE_KEY = "conversation_summary"
+# Timestamp of the newest event already folded into the summary.
+SUMMARY_UNTIL_STATE_KEY = "conversation_summary_until"
+
+# Turns kept verbatim in the prompt, plus those not yet folded into the summary. 0 disables
+# windowing and compaction.
+SESSION_WINDOW_TURNS = int(os.environ.get("SESSION_WINDOW_TURNS", 10))
+# Fold older turns once this many turns have accumulated beyond the window.
+SESSION_COMPACT_EVERY = int(os.environ.get("SESSION_COMPACT_EVERY", 5))
+SUMMARY_MAX_CHARS = int(os.environ.get("SESSION_SUMMARY_MAX_CHARS", 4000))
+
+_USER_CHARS = 200
+_ANSWER_CHARS = 300
+
+
+def is_turn_start(event):
+    """A turn starts with a message typed by the user (tool responses are authored by the agent)."""
+    return (
+        event.author == "user"
+        and event.content is not None
+        and any(part.text for part in event.content.parts or [])
+    )
+
+
+def split_turns(events):
+    """Groups events into turns. Events before the first user message are dropped."""
+    turns = []
+    for event in events:
+        if is_turn_start(event):
+            turns.append([event])
+        elif turns:
+            turns[-1].append(event)
+    return turns
+
+
+def unsummarized_turns(events, summary_until, window_turns, compact_every):
+    """Events of the turns the model must see verbatim: every turn newer than the summary.
+
+    That is at least the last ``window_turns`` and at most ``compact_every``
+    more, the turns that left the window but are not folded yet.
+    """
+    turns = split_turns(events)
+    newer = sum(1 for turn in turns if not summary_until or turn[0].timestamp > summary_until)
+    keep = min(max(newer, window_turns), window_turns + compact_every)
+    return [event for turn in turns[-keep:] for event in turn]
+
+
+def _clip(text, limit):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _event_text(event):
+    if not event.content or not event.content.parts:
+        return ""
+    return " ".join(part.text for part in event.content.parts if part.text)
+
+
+def summarize_turns(previous_summary, turns):
+    """Extractive summarizer: one line for the question, the tools used and the answer of each turn.
+
+    Deterministic and free of model calls; the oldest lines are dropped once
+    the summary exceeds SUMMARY_MAX_CHARS.
+    """
+    lines = previous_summary.splitlines() if previous_summary else []
+    for turn in turns:
+        lines.append(f"- User: {_clip(_event_text(turn[0]), _USER_CHARS)}")
+        tools = [
+            call.name
+            for event in turn[1:]
+            for call in event.get_function_calls()
+        ]
+        if tools:
+            lines.append(f"  Tools: {', '.join(dict.fromkeys(tools))}")
+        answers = [_event_text(event) for event in turn[1:] if event.author != "user" and _event_text(event)]
+        if answers:
+            lines.append(f"  Assistant: {_clip(answers[-1], _ANSWER_CHARS)}")
+    while lines and sum(len(line) + 1 for line in lines) > SUMMARY_MAX_CHARS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def inject_conversation_summary(callback_context, llm_request):
+    """before_model_callback adding the rolling summary of folded turns to the instruction."""
+    summary = callback_context.state.get(SUMMARY_STATE_KEY)
+    if summary:
+        text = f"**SUMMARY OF EARLIER CONVERSATION (older turns are not shown verbatim):**\n{summary}"
+        if llm_request.config.cached_content:
+            # The instruction is cached and shared by every session; the summary is per session.
+            llm_request.contents.insert(0, genai_types.Content(role="user", parts=[genai_types.Part(text=text)]))
+        else:
+            llm_request.append_instructions([text])
+    return None
@@ -0,0 +1,230 @@
+"""Model-side context caching of the root agent's static prefix.
+
+Every model call of a turn starts with the same system instruction (the
+prompt plus ADK's identity line) and the declarations of every tool. The
+first call of a worker stores them in a Gemini cached content and later
+calls reference it (``config.cached_content``) instead of sending them
+again, so they are not prefilled and are billed at the cached rate.
+
+The cache is keyed by a hash of the model, instruction and declarations.
+When the prompt changes or the toolset is reloaded with different tools,
+the key changes: a new cache is created and the old one deleted. Caches
+are kept alive by extending their TTL shortly before they expire.
+
+Only Gemini models are cached. Calls to other models (the fake model of
+the benchmarks, LiteLLM), prefixes shorter than CONTEXT_CACHE_MIN_TOKENS and
+calls whose cache cannot be created (no credentials, offline) go out
+unchanged; a failed creation is retried after CONTEXT_CACHE_RETRY_SECONDS.
+
+before_model must run before any callback that adds per-session text to the
+instruction: such text goes to the contents once the instruction is cached
+(see compaction.inject_conversation_summary).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+CONTEXT_CACHE_ENABLED = os.environ.get("CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+CONTEXT_CACHE_TTL_SECONDS = int(os.environ.get("CONTEXT_CACHE_TTL_SECONDS", 3600))
+# The TTL is extended once a cache is this close to expiring.
+CONTEXT_CACHE_REFRESH_SECONDS = int(os.environ.get("CONTEXT_CACHE_REFRESH_SECONDS", 300))
+# Gemini rejects cached contents below a model-dependent minimum (1024 tokens for 2.5 Flash).
+CONTEXT_CACHE_MIN_TOKENS = int(os.environ.get("CONTEXT_CACHE_MIN_TOKENS", 1024))
+CONTEXT_CACHE_RETRY_SECONDS = float(os.environ.get("CONTEXT_CACHE_RETRY_SECONDS", 300))
+
+DISPLAY_NAME_PREFIX = "adk-bug-assistant"
+
+
+def is_cacheable_model(model):
+    """True for the models served by ADK's Gemini class, the only ones with cached contents."""
+    from google.adk.models import LLMRegistry
+    from google.adk.models.google_llm import Gemini
+
+    try:
+        return issubclass(LLMRegistry.resolve(model), Gemini)
+    except ValueError:
+        return False
+
+
+def static_prefix(config):
+    """(system instruction, tools, tool config) of a request config: the part every call repeats."""
+    return config.system_instruction, config.tools, config.tool_config
+
+
+def prefix_key(model, config):
+    """Hash of the model and the static prefix; changes when the prompt or a tool declaration does."""
+    instruction, tools, tool_config = static_prefix(config)
+    payload = json.dumps({
+        "model": model,
+        "instruction": instruction if isinstance(instruction, str) else _dump(instruction),
+        "tools": [_dump(tool) for tool in tools or []],
+        "tool_config": _dump(tool_config),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest(), len(payload)
+
+
+def _dump(value):
+    return value.model_dump(mode="json", exclude_none=True) if hasattr(value, "model_dump") else value
+
+
+class ContextCache:
+    """Cached contents of this worker, one per static prefix (see the module docstring)."""
+
+    def __init__(self, client=None, ttl=CONTEXT_CACHE_TTL_SECONDS, refresh=CONTEXT_CACHE_REFRESH_SECONDS,
+                 min_tokens=CONTEXT_CACHE_MIN_TOKENS, retry_seconds=CONTEXT_CACHE_RETRY_SECONDS,
+                 cacheable=is_cacheable_model):
+        self._client = client
+        self.ttl = ttl
+        self.refresh = refresh
+        self.min_tokens = min_tokens
+        self.retry_seconds = retry_seconds
+        self.cacheable = cacheable
+        self._entries = {}  # prefix key -> {"name", "model", "expires_at"}
+        self._busy = set()  # prefix keys being created or extended
+        self._failed_until = {}  # prefix key -> time before which it is not retried
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "created": 0, "extended": 0, "deleted": 0, "failures": 0,
+                      "skipped": 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client()
+        return self._client
+
+    def _count(self, event):
+        with self._lock:
+            self.stats[event] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, caches=len(self._entries))
+
+    async def apply(self, llm_request):
+        """Swaps the request's static prefix for a cached content; returns True when it did."""
+        config = llm_request.config
+        model = llm_request.model
+        if config is None or config.cached_content or not (config.system_instruction or config.tools):
+            return False
+        if not model or not self.cacheable(model):
+            return False
+        key, size = prefix_key(model, config)
+        if size // 4 < self.min_tokens:
+            self._count("skipped")
+            return False
+        name = await self._cache_name(key, model, config)
+        if name is None:
+            return False
+        config.cached_content = name
+        config.system_instruction = None
+        config.tools = None
+        config.tool_config = None
+        return True
+
+    async def _cache_name(self, key, model, config):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] - now > self.refresh:
+                self.stats["hits"] += 1
+                return entry["name"]
+            if key in self._busy or self._failed_until.get(key, 0) > now:
+                # Another call is creating or extending it; use what is there meanwhile.
+                usable = entry is not None and entry["expires_at"] > now
+                self.stats["hits" if usable else "misses"] += 1
+                return entry["name"] if usable else None
+            self._busy.add(key)
+        try:
+            if entry is not None and entry["expires_at"] > now:
+                await asyncio.to_thread(self._extend, entry)
+                self._count("extended")
+            else:
+                entry = await asyncio.to_thread(self._create, model, key, config)
+                self._count("created")
+                await asyncio.to_thread(self._delete_superseded, key, model)
+            with self._lock:
+                self._entries[key] = entry
+                self.stats["hits"] += 1
+            return entry["name"]
+        except Exception as e:
+            print(f"Context cache for {model} not available, sending the full prompt: {e}")
+            with self._lock:
+                self._failed_until[key] = time.time() + self.retry_seconds
+                self.stats["failures"] += 1
+            return None
+        finally:
+            with self._lock:
+                self._busy.discard(key)
+
+    def _create(self, model, key, config):
+        from google.genai import types
+
+        instruction, tools, tool_config = static_prefix(config)
+        cached = self.client.caches.create(model=model, config=types.CreateCachedContentConfig(
+            display_name=f"{DISPLAY_NAME_PREFIX}-{key[:16]}",
+            system_instruction=instruction,
+            tools=tools,
+            tool_config=tool_config,
+            ttl=f"{self.ttl}s",
+        ))
+        print(f"Context cache {cached.name} created for {model}.")
+        return {"name": cached.name, "model": model, "expires_at": time.time() + self.ttl}
+
+    def _extend(self, entry):
+        from google.genai import types
+
+        self.client.caches.update(name=entry["name"], config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s"))
+        entry["expires_at"] = time.time() + self.ttl
+
+    def _delete_superseded(self, key, model):
+        # The prompt or the tools changed: the old prefix of this model is not used any more.
+        with self._lock:
+            old = [(k, e) for k, e in self._entries.items() if k != key and e["model"] == model]
+            for k, _ in old:
+                del self._entries[k]
+        for _, entry in old:
+            self._delete(entry)
+
+    def _delete(self, entry):
+        try:
+            self.client.caches.delete(name=entry["name"])
+            self._count("deleted")
+        except Exception as e:
+            print(f"Could not delete context cache {entry['name']}: {e}")
+
+    def close(self):
+        """Deletes this worker's caches (at shutdown) instead of leaving them until their TTL runs out."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._delete(entry)
+
+
+_context_cache_instance = None
+_init_lock = threading.Lock()
+
+def get_context_cache():
+    """The worker's ContextCache, or None when CONTEXT_CACHE_ENABLED is off."""
+    global _context_cache_instance
+    if not CONTEXT_CACHE_ENABLED:
+        return None
+    if _context_cache_instance is None:
+        with _init_lock:
+            if _context_cache_instance is None:
+                _context_cache_instance = ContextCache()
+    return _context_cache_instance
+
+
+async def before_model(callback_context, llm_request):
+    """before_model_callback sending the static prefix as a cached content when the model supports it."""
+    context_cache = get_context_cache()
+    if context_cache is not None:
+        await context_cache.apply(llm_request)
+    return None
@@ -0,0 +1,85 @@
+"""Text embeddings used for similarity lookups inside the Django process.
+
+EMBEDDING_BACKEND selects the embedder:
+
+- ``hashing`` (default): a local feature-hashing embedder over words, word
+  pairs and character trigrams. No network call and deterministic, good
+  enough to match rephrasings of the same short question.
+- ``vertex``: the Vertex AI / Gemini embedding model in EMBEDDING_MODEL
+  (default text-embedding-005, the model the tickets table is embedded with).
+"""
+
+import os
+import re
+import zlib
+
+import numpy as np
+
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "hashing")
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-005")
+HASHING_DIMENSIONS = int(os.environ.get("HASHING_EMBEDDING_DIMENSIONS", 512))
+
+_WORD_RE = re.compile(r"[a-z0-9_@]+(?:\.[a-z0-9_]+)*")
+# Filler words of chat questions; dropping them lets rephrasings of one question collide.
+_STOPWORDS = frozenset(
+    "a about all an and any are be can do does for from give has have i in is it list me my of on or "
+    "please show some tell that the there these those to what which with you currently".split()
+)
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder; vectors are L2-normalized so a dot product is the cosine similarity."""
+
+    blocking = False
+
+    def __init__(self, dimensions=HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _features(self, text):
+        words = [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+        yield from ((f"w:{w}", 1.0) for w in words)
+        yield from ((f"b:{a} {b}", 0.5) for a, b in zip(words, words[1:]))
+        for w in words:
+            padded = f"#{w}#"
+            yield from ((f"c:{padded[i:i + 3]}", 0.25) for i in range(len(padded) - 2))
+
+    def embed(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dimensions] += weight if h & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_batch(self, texts):
+        return [self.embed(text) for text in texts]
+
+
+class VertexEmbedder:
+    """Embeds text with a Vertex AI / Gemini embedding model through google-genai."""
+
+    blocking = True
+
+    def __init__(self, model=EMBEDDING_MODEL):
+        from google import genai
+
+        self.model = model
+        self._client = genai.Client()
+
+    def embed(self, text):
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts):
+        response = self._client.models.embed_content(model=self.model, contents=list(texts))
+        vectors = [np.asarray(e.values, dtype=np.float32) for e in response.embeddings]
+        return [vector / np.linalg.norm(vector) for vector in vectors]
+
+
+_EMBEDDERS = {"hashing": HashingEmbedder, "vertex": VertexEmbedder}
+
+
+def get_embedder(backend=None, **kwargs):
+    backend = backend or EMBEDDING_BACKEND
+    if backend not in _EMBEDDERS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {sorted(_EMBEDDERS)}")
+    return _EMBEDDERS[backend](**kwargs)
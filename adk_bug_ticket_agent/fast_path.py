@@ -0,0 +1,316 @@
+"""Direct answers to plain ticket lookups, without a model call.
+
+Questions like "ticket 42", "tickets assigned to susan.chen" or "P0 open bugs
+this week" name one or more filters and nothing else. The router answers
+them by calling the matching toolbox tool itself and rendering the markdown
+table the agent instruction asks for. Every word of the question has to be
+understood: a question with anything else in it (a topic, a count, a
+negation, two values for one filter), a write intent or a reference back to
+the conversation goes to the agent, and so does any lookup whose tool fails
+or finds nothing.
+
+When several filters are named, the most selective one picks the tool
+(ticket id, then assignee, date range, priority, status) and the others are
+applied to its rows, reading up to FAST_PATH_MAX_PAGES pages of it; a longer
+result goes to the agent. A single filter answers with the first page and
+the total. On by default; FAST_PATH_ENABLED=false turns it off.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+from . import metrics
+from .tools.toolbox import decode_ticket_page
+from .response_cache import is_cacheable_query, normalize_query
+
+FAST_PATH_ENABLED = os.environ.get("FAST_PATH_ENABLED", "true").lower() == "true"
+FAST_PATH_MAX_PAGES = int(os.environ.get("FAST_PATH_MAX_PAGES", 4))
+
+PRIORITY_WORDS = {"critical": "p0", "high": "p1", "medium": "p2", "low": "p3"}
+STATUSES = {"open": "Open", "in progress": "In Progress", "closed": "Closed", "resolved": "Resolved"}
+
+# Each filter phrase is removed from the question once it is recognized.
+_TICKET_ID_RE = re.compile(r"\b(?:ticket|bug|issue)s? (?:(?:number|id|no) )?(\d+)\b")
+# A dotted name ("susan.chen") only counts after "assigned to"/"owned by": "open tickets for v2.3" names a
+# version, not an assignee. An email address is an assignee wherever it appears.
+_EMAIL = r"[\w.+-]+@[\w-]+\.[\w.]*\w"
+_ASSIGNEE_RE = re.compile(
+    r"\b(?:(?:that|which) (?:are|is) )?(?:(?:assigned to|owned by) (?:user |assignee )?(?:with email )?"
+    rf"({_EMAIL}|[a-z][\w+-]*\.[\w.+-]*\w)|(?:for (?:user |assignee )?(?:with email )?)?({_EMAIL}))"
+)
+_PRIORITY_RE = re.compile(
+    r"\b(?:with )?(?:priority )?(?:(p[0-3])|(critical|high|medium|low) priority|priority (critical|high|medium|low))\b"
+)
+_STATUS_RE = re.compile(r"\b(?:with )?(?:status )?(open|in progress|closed|resolved)\b(?: status\b)?")
+_DATE_RE = re.compile(
+    r"\b(?:(created|opened|updated|modified) )?(?:in )?(today|yesterday|this week|this month|"
+    r"(?:in )?the (?:last|past) (\d+) days|the (?:last|past) week|since (\d{4}-\d{2}-\d{2}))\b"
+)
+_NOUN_RE = re.compile(r"\b(?:tickets|ticket|bugs|bug|issues|issue)\b")
+# Words that carry no filter; anything else sends the question to the agent.
+_FILLER = frozenset(
+    "show me list get give find display fetch pull up look lookup what which are is there any all the a "
+    "can you could would please currently marked as with that and of status details info s".split()
+)
+_FILTER_PHRASES = (("ticket_id", _TICKET_ID_RE), ("assignee", _ASSIGNEE_RE), ("dates", _DATE_RE),
+                   ("priority", _PRIORITY_RE), ("status", _STATUS_RE))
+
+
+def _date_range(match, today):
+    field = "updated_time" if match.group(1) in ("updated", "modified") else "creation_time"
+    period = match.group(2)
+    if period == "today":
+        start = today
+    elif period == "yesterday":
+        start = today = today - timedelta(days=1)
+    elif period == "this week":
+        start = today - timedelta(days=today.weekday())
+    elif period == "this month":
+        start = today.replace(day=1)
+    elif match.group(3):
+        start = today - timedelta(days=int(match.group(3)))
+    elif match.group(4):
+        try:
+            start = date.fromisoformat(match.group(4))
+        except ValueError:
+            return None
+    else:  # "the last week"
+        start = today - timedelta(days=7)
+    return {"start_date": start.isoformat(), "end_date": today.isoformat(), "date_field": field,
+            "implicit": match.group(1) is None}
+
+
+def parse_lookup(query, today=None):
+    """Returns the filters of a plain ticket lookup, or None when the question needs the agent."""
+    normalized = normalize_query(query).rstrip(".")
+    if not normalized or not is_cacheable_query(normalized):
+        return None
+    filters = {}
+    rest = f" {normalized} "
+    for name, pattern in _FILTER_PHRASES:
+        matches = list(pattern.finditer(rest))
+        if len(matches) > 1:
+            return None
+        if not matches:
+            continue
+        match = matches[0]
+        if name == "ticket_id":
+            filters["ticket_id"] = match.group(1)
+        elif name == "assignee":
+            filters["assignee"] = match.group(1) or match.group(2)
+        elif name == "dates":
+            filters["dates"] = _date_range(match, today or date.today())
+            if filters["dates"] is None:
+                return None
+        elif name == "priority":
+            filters["priority"] = match.group(1) or PRIORITY_WORDS[match.group(2) or match.group(3)]
+        else:
+            filters["status"] = STATUSES[match.group(1)]
+        rest = rest[:match.start()] + " " + rest[match.end():]
+    if not filters:
+        return None
+    dates = filters.get("dates")
+    if dates is not None and dates["implicit"] and filters.get("status", "Open") != "Open":
+        # "resolved bugs yesterday" may mean resolved yesterday, not created yesterday.
+        return None
+    if "ticket_id" in filters:
+        if len(filters) > 1:
+            return None
+    elif not _NOUN_RE.search(rest):
+        return None
+    if any(word not in _FILLER for word in _NOUN_RE.sub(" ", rest).split()):
+        return None
+    return filters
+
+
+def _matches(ticket, filters):
+    if "assignee" in filters and filters["assignee"] not in str(ticket.get("assignee") or "").lower():
+        return False
+    if "priority" in filters and str(ticket.get("priority") or "").lower().split(" - ")[0] != filters["priority"]:
+        return False
+    if "status" in filters and str(ticket.get("status") or "").lower() != filters["status"].lower():
+        return False
+    dates = filters.get("dates")
+    if dates is not None:
+        day = str(ticket.get(dates["date_field"]) or "")[:10]
+        if not dates["start_date"] <= day <= dates["end_date"]:
+            return False
+    return True
+
+
+def plan_call(filters):
+    """(tool name, args) for the most selective filter; the rest are applied to its rows."""
+    if "ticket_id" in filters:
+        return "get-ticket-by-id", {"ticket_id": filters["ticket_id"]}
+    if "assignee" in filters:
+        return "get-tickets-by-assignee", {"assignee": filters["assignee"], "after_ticket_id": 0}
+    if "dates" in filters:
+        dates = filters["dates"]
+        return "get-tickets-by-date-range", {"start_date": dates["start_date"], "end_date": dates["end_date"],
+                                             "date_field": dates["date_field"], "after_ticket_id": 0}
+    if "priority" in filters:
+        return "get-tickets-by-priority", {"priority": filters["priority"].upper(), "after_ticket_id": 0}
+    return "get-tickets-by-status", {"status": filters["status"], "after_ticket_id": 0}
+
+
+def _cell(value):
+    return " ".join(str("" if value is None else value).split()).replace("|", "\\|")
+
+
+def render_answer(tool_name, tickets, total_count=None):
+    """Markdown answer in the shape the agent instruction asks for (table for 2+ tickets, timestamps in backticks).
+
+    ``total_count`` above the number of tickets marks them as the first page.
+    """
+    if not tickets:
+        body = "No tickets matched."
+    elif len(tickets) == 1:
+        ticket = tickets[0]
+        body = f"**Ticket {_cell(ticket.get('ticket_id'))}: {_cell(ticket.get('title'))}**\n\n" + "\n".join([
+            f"- **Status:** {_cell(ticket.get('status'))}",
+            f"- **Priority:** {_cell(ticket.get('priority'))}",
+            f"- **Assignee:** {_cell(ticket.get('assignee'))}",
+            f"- **Created:** `{_cell(ticket.get('creation_time'))}`",
+            f"- **Updated:** `{_cell(ticket.get('updated_time'))}`",
+            f"- **Description:** {_cell(ticket.get('description'))}",
+        ])
+    else:
+        rows = [
+            f"| {_cell(t.get('ticket_id'))} | {_cell(t.get('title'))} | {_cell(t.get('assignee'))} | "
+            f"{_cell(t.get('priority'))} | {_cell(t.get('status'))} | `{_cell(t.get('creation_time'))}` |"
+            for t in tickets
+        ]
+        found = (f"I found {total_count} tickets; here are the first {len(tickets)}"
+                 if total_count is not None and total_count > len(tickets) else f"I found {len(tickets)} tickets")
+        body = (f"{found}:\n\n"
+                "| ticket_id | title | assignee | priority | status | created |\n"
+                "|---|---|---|---|---|---|\n" + "\n".join(rows))
+    return f"{body}\n\nI used the `{tool_name}` tool.\n\nIs there anything else I can help you with?"
+
+
+class FastPathRouter:
+    """Answers plain lookups (see parse_lookup) with one toolbox call instead of an agent turn."""
+
+    def __init__(self, toolset):
+        self.toolset = toolset
+        self._lock = threading.Lock()
+        self.stats = {"queries": 0, "answered": 0, "no_match": 0, "fallbacks": 0, "answer_seconds": 0.0}
+
+    def _count(self, event, seconds=0.0):
+        with self._lock:
+            self.stats[event] += 1
+            self.stats["answer_seconds"] += seconds
+
+    async def _call(self, name, args):
+        """(rows, total_count, next_after_ticket_id) of one tool call, or None when it failed."""
+        tools = {tool.name: tool for tool in await self.toolset.get_tools()}
+        tool = tools.get(name)
+        if tool is None:
+            return None
+        start = time.perf_counter()
+        # Read-only toolbox tools go through the worker's tool result cache like the agent's calls.
+        result = await tool.run_async(args=args, tool_context=None)
+        failed = isinstance(result, dict)
+        if metrics.METRICS_ENABLED:
+            metrics.tool_call_seconds.observe(time.perf_counter() - start, "fast_path", name,
+                                              "error" if failed else "ok")
+        if failed:
+            return None
+        page = decode_ticket_page(result)
+        if page is not None:
+            return page
+        try:
+            rows = json.loads(result) if isinstance(result, str) else result
+        except ValueError:
+            return None
+        if rows is None:
+            return [], 0, None
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not (isinstance(rows, list) and all(isinstance(row, dict) for row in rows)):
+            return None
+        return rows, len(rows), None
+
+    async def _lookup(self, name, args, filters):
+        """(matching tickets, total_count or None) or None when the question should go to the agent."""
+        tickets = []
+        for _ in range(FAST_PATH_MAX_PAGES):
+            page = await self._call(name, args)
+            if page is None:
+                return None
+            rows, total_count, next_after = page
+            if len(filters) == 1:
+                # The tool applied the only filter: its first page and total are the answer.
+                return rows, total_count
+            tickets += [row for row in rows if _matches(row, filters)]
+            if next_after is None:
+                return tickets, None
+            args = dict(args, after_ticket_id=next_after)
+        return None
+
+    async def _full_ticket(self, ticket):
+        page = await self._call("get-ticket-by-id", {"ticket_id": str(ticket.get("ticket_id"))})
+        if page is None or len(page[0]) != 1:
+            return None
+        return page[0], None
+
+    async def answer(self, query):
+        """The rendered answer, or None when the question should go to the agent."""
+        start = time.perf_counter()
+        with self._lock:
+            self.stats["queries"] += 1
+        filters = parse_lookup(query)
+        if filters is None:
+            self._count("no_match")
+            return None
+        tool_name, args = plan_call(filters)
+        try:
+            found = await self._lookup(tool_name, args, filters)
+        except Exception as e:
+            print(f"Fast path call of {tool_name} failed, handing the question to the agent: {e!r}")
+            found = None
+        if found is not None and len(found[0]) == 1 and tool_name != "get-ticket-by-id":
+            # List tools leave the description out; the single-ticket answer shows the full row.
+            try:
+                found = await self._full_ticket(found[0][0])
+            except Exception as e:
+                print(f"Fast path call of get-ticket-by-id failed, handing the question to the agent: {e!r}")
+                found = None
+            tool_name = "get-ticket-by-id"
+        if not found or not found[0]:
+            # No match may be a misread filter ("tickets for the login page"); the agent can ask or search.
+            self._count("fallbacks")
+            return None
+        answer = render_answer(tool_name, *found)
+        self._count("answered", time.perf_counter() - start)
+        return answer
+
+    def snapshot(self):
+        """Counters plus the share of questions answered and their mean latency."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["answered_fraction"] = stats["answered"] / stats["queries"] if stats["queries"] else 0.0
+        stats["mean_answer_ms"] = stats["answer_seconds"] * 1000 / stats["answered"] if stats["answered"] else 0.0
+        return stats
+
+
+_fast_path_instance = None
+_init_lock = threading.Lock()
+
+def get_fast_path():
+    """The worker's FastPathRouter, or None when FAST_PATH_ENABLED is off."""
+    global _fast_path_instance
+    if not FAST_PATH_ENABLED:
+        return None
+    if _fast_path_instance is None:
+        with _init_lock:
+            if _fast_path_instance is None:
+                from .tools.tools import toolbox_toolset
+
+                _fast_path_instance = FastPathRouter(toolbox_toolset)
+                print("Fast path for plain ticket lookups enabled.")
+    return _fast_path_instance
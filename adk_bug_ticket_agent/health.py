@@ -0,0 +1,125 @@
+"""Liveness and readiness of a worker, and the warmup that makes it ready.
+
+``/healthz`` answers as soon as the worker serves requests. ``/readyz``
+answers 200 only once every stage listed in READINESS_STAGES has been warmed
+by services.warmup(): the session database pool (``session_db``), the
+memory backend (``memory``), the agent and its runners (``agent``) and the
+toolbox toolset (``toolbox``). The import of the agent modules is timed as
+``imports``. Until then it answers 503, so a load balancer
+or Cloud Run startup probe does not send traffic to a cold worker.
+
+With WARMUP_IN_BACKGROUND (the default) the gunicorn and ASGI startup hooks
+hand warmup to a thread and the worker starts serving /healthz right away.
+Stages that fail are retried every WARMUP_RETRY_SECONDS. Stage timings are
+printed, returned by /readyz and exported as agent_warmup_stage_seconds.
+
+Only the standard library is imported here, so the probes never wait for
+the agent modules to load.
+"""
+
+import os
+import threading
+import time
+
+WARMUP_IN_BACKGROUND = os.environ.get("WARMUP_IN_BACKGROUND", "true").lower() == "true"
+WARMUP_RETRY_SECONDS = float(os.environ.get("WARMUP_RETRY_SECONDS", 2))
+# Stages that must have succeeded before /readyz passes (comma separated).
+READINESS_STAGES = [name for name in os.environ.get(
+    "READINESS_STAGES", "session_db,memory,agent,toolbox").split(",") if name]
+
+
+class WarmupState:
+    """Outcome and duration of each warmup stage, shared by the warmup thread and the probes."""
+
+    def __init__(self, required=READINESS_STAGES):
+        self.required = list(required)
+        self.started = time.monotonic()
+        self.ready_after = None
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, error=None):
+        with self._lock:
+            stage = self._stages.setdefault(name, {"attempts": 0})
+            stage["attempts"] += 1
+            stage.update(ok=error is None, seconds=round(seconds, 4), error=None if error is None else repr(error))
+            if self.ready_after is None and self._ready():
+                self.ready_after = time.monotonic() - self.started
+        print(f"Warmup stage {name} {'done' if error is None else 'failed'} in {seconds:.2f} s"
+              + ("" if error is None else f": {error!r}"))
+
+    def run(self, name, warm):
+        """Runs ``warm()`` as stage ``name`` unless it has already succeeded; returns True on success."""
+        if self.succeeded(name):
+            return True
+        start = time.perf_counter()
+        try:
+            warm()
+        except Exception as e:
+            self.record(name, time.perf_counter() - start, e)
+            return False
+        self.record(name, time.perf_counter() - start)
+        return True
+
+    def succeeded(self, name):
+        with self._lock:
+            return self._stages.get(name, {}).get("ok", False)
+
+    def _ready(self):
+        return all(self._stages.get(name, {}).get("ok", False) for name in self.required)
+
+    @property
+    def ready(self):
+        with self._lock:
+            return self._ready()
+
+    def report(self):
+        with self._lock:
+            return {
+                "status": "ready" if self._ready() else "warming_up",
+                "ready_after_seconds": None if self.ready_after is None else round(self.ready_after, 4),
+                "required": list(self.required),
+                "stages": {name: dict(stage) for name, stage in self._stages.items()},
+            }
+
+
+warmup_state = WarmupState()
+_warmup_started = False
+_warmup_lock = threading.Lock()
+
+
+def _import_services():
+    # Already imported when the gunicorn master preloaded the agent modules; timed as its own stage otherwise.
+    start = time.perf_counter()
+    from . import services
+
+    if not warmup_state.succeeded("imports"):
+        warmup_state.record("imports", time.perf_counter() - start)
+    return services
+
+
+def _warm_until_ready(app_names):
+    services = _import_services()
+    while not services.warmup(app_names):
+        time.sleep(WARMUP_RETRY_SECONDS)
+    print(f"Worker ready after {warmup_state.ready_after:.2f} s.")
+
+
+def start_warmup(app_names=None):
+    """Warms the agent services for the startup hooks: in a thread with WARMUP_IN_BACKGROUND, else inline.
+
+    Inline, the first attempt finishes before this returns and failed stages
+    are retried in the background.
+    """
+    global _warmup_started
+    with _warmup_lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+        # The state may have been created in the gunicorn master; time the worker's own warmup.
+        warmup_state.started = time.monotonic()
+        if not WARMUP_IN_BACKGROUND:
+            if _import_services().warmup(app_names):
+                print(f"Worker ready after {warmup_state.ready_after:.2f} s.")
+                return
+        threading.Thread(target=_warm_until_ready, args=(app_names,), name="warmup", daemon=True).start()
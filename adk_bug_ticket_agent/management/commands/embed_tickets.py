@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from adk_bug_ticket_agent.embedding_worker import (
+    EMBED_BATCH_SIZE,
+    TICKETS_DB_URL,
+    TicketEmbeddingWorker,
+)
+from adk_bug_ticket_agent.embeddings import get_embedder
+
+TICKET_EMBEDDING_DIMENSIONS = 768  # tickets.embedding is vector(768)
+
+
+class Command(BaseCommand):
+    help = (
+        "Embeds tickets queued in ticket_embedding_queue (see sql/embedding_queue.sql). "
+        "Runs until stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="queue every ticket for re-embedding first")
+        parser.add_argument("--once", action="store_true", help="exit once the queue is drained")
+        parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+        parser.add_argument("--poll-interval", type=float, default=5.0, help="seconds to wait when the queue is empty")
+        parser.add_argument("--max-rows-per-second", type=float, help="throttle to stay within the embedding quota")
+        parser.add_argument(
+            "--embedder", choices=["vertex", "hashing"], default="vertex",
+            help="vertex (text-embedding-005, matches search-tickets) or hashing (local, deterministic, for testing)",
+        )
+        parser.add_argument("--db-url", default=TICKETS_DB_URL)
+
+    def handle(self, *args, **options):
+        if options["embedder"] == "hashing":
+            embedder = get_embedder("hashing", dimensions=TICKET_EMBEDDING_DIMENSIONS)
+        else:
+            embedder = get_embedder("vertex")
+        worker = TicketEmbeddingWorker(embedder, db_url=options["db_url"], batch_size=options["batch_size"])
+        try:
+            if options["full"]:
+                self.stdout.write(f"Queued {worker.enqueue_all()} tickets for re-embedding.")
+            self.stdout.write(f"{worker.pending()} tickets waiting to be embedded.")
+            stats = worker.run(
+                once=options["once"],
+                poll_interval=options["poll_interval"],
+                max_rows_per_second=options["max_rows_per_second"],
+            )
+        except Exception as e:
+            raise CommandError(f"Embedding worker stopped: {e}") from e
+        finally:
+            worker.close()
+        self.stdout.write(self.style.SUCCESS(f"{stats['embedded']} tickets embedded, {stats['rows_per_second']:.1f} rows/s."))
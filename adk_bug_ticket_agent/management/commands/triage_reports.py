@@ -0,0 +1,72 @@
+import asyncio
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adk_bug_ticket_agent.triage import (
+    TRIAGE_DUPLICATE_DISTANCE,
+    TRIAGE_QUERIES_PER_SECOND,
+    TRIAGE_SEARCHES_PER_SECOND,
+    TRIAGE_WORKERS,
+    TriagePipeline,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Triages the bug reports of a JSONL file: finds duplicates with search-tickets and creates or "
+        "updates tickets through the toolbox. Rerun with the same --results file to resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("reports", help="JSONL file, one report per line")
+        parser.add_argument("--results", help="per-report results and checkpoint (default: <reports>.results.jsonl)")
+        parser.add_argument("--workers", type=int, default=TRIAGE_WORKERS)
+        parser.add_argument("--queries-per-second", type=float, default=TRIAGE_QUERIES_PER_SECOND,
+                            help="toolbox calls per second (Cloud SQL quota); 0 for no limit")
+        parser.add_argument("--searches-per-second", type=float, default=TRIAGE_SEARCHES_PER_SECOND,
+                            help="duplicate searches per second (query embeddings); 0 for no limit")
+        parser.add_argument("--duplicate-distance", type=float, default=TRIAGE_DUPLICATE_DISTANCE)
+        parser.add_argument("--limit", type=int, help="triage at most this many reports in this run")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["reports"]):
+            raise CommandError(f"No such file: {options['reports']}")
+        results_path = options["results"] or os.path.splitext(options["reports"])[0] + ".results.jsonl"
+        from adk_bug_ticket_agent.tools.tools import toolbox_toolset
+
+        pipeline = TriagePipeline(
+            toolbox_toolset,
+            workers=options["workers"],
+            queries_per_second=options["queries_per_second"],
+            searches_per_second=options["searches_per_second"],
+            duplicate_distance=options["duplicate_distance"],
+        )
+
+        async def run():
+            try:
+                return await pipeline.run(options["reports"], results_path, limit=options["limit"])
+            finally:
+                await toolbox_toolset.close()
+
+        try:
+            stats = asyncio.run(run())
+        except Exception as e:
+            raise CommandError(f"Triage stopped: {e}") from e
+        if stats["skipped"]:
+            self.stdout.write(f"{stats['skipped']} reports already triaged in {results_path}, skipped.")
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['items'] - stats['failed'] - stats['unknown']} reports triaged in {stats['seconds']:.1f} s "
+            f"({stats['items_per_second']:.1f} reports/s): {stats['created']} created, "
+            f"{stats['updated']} updated, {stats['duplicate']} duplicates."
+        ))
+        if stats["failed"]:
+            self.stdout.write(self.style.ERROR(f"{stats['failed']} reports failed (outcome \"failed\" in {results_path}):"))
+            for error, count in sorted(pipeline.errors.items(), key=lambda item: -item[1]):
+                self.stdout.write(f"  {count:>6}  {error}")
+        if stats["unknown"]:
+            self.stdout.write(self.style.WARNING(
+                f"{stats['unknown']} reports timed out in create-new-ticket and may or may not have a ticket "
+                f"(outcome \"unknown\" in {results_path}). Check them, and delete their lines to triage them again."
+            ))
+        self.stdout.write(f"Results: {results_path}")
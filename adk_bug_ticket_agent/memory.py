@@ -0,0 +1,325 @@
+"""Vector memory services for load_memory, as drop-ins for VertexAiRagMemoryService.
+
+Every event with text becomes one memory entry, embedded with the embedder
+from embeddings.py. Entries are partitioned by (app_name, user_id): a search
+only ranks the asking user's memories, by cosine similarity, and returns at
+most MEMORY_TOP_K entries within MEMORY_MAX_DISTANCE. Sessions may be added
+any number of times; only events that are not stored yet are embedded, in one
+batch per call. Each user keeps at most MEMORY_MAX_ENTRIES_PER_USER entries,
+none older than MEMORY_RETENTION_DAYS; the oldest are evicted first.
+
+- NumpyMemoryService keeps the vectors of each user in one in-process matrix
+  and ranks them with a single matrix-vector product (dev, single worker).
+- PgVectorMemoryService stores them in the memory_entries table in the
+  session database (pgvector) and ranks them with the <=> operator.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from google.adk.memory import BaseMemoryService
+from google.adk.memory.base_memory_service import SearchMemoryResponse
+from google.adk.memory.memory_entry import MemoryEntry
+from google.genai import types as genai_types
+
+from .embeddings import get_embedder
+
+MEMORY_TOP_K = int(os.environ.get("MEMORY_TOP_K", 5))
+# Cosine distance (1 - similarity); matches VECTOR_DISTANCE_THRESHOLD of the RAG memory.
+MEMORY_MAX_DISTANCE = float(os.environ.get("MEMORY_MAX_DISTANCE", 0.7))
+MEMORY_MAX_ENTRIES_PER_USER = int(os.environ.get("MEMORY_MAX_ENTRIES_PER_USER", 10000))
+MEMORY_RETENTION_DAYS = float(os.environ.get("MEMORY_RETENTION_DAYS", 90))
+
+
+def event_text(event):
+    if not event.content or not event.content.parts:
+        return ""
+    return "\n".join(part.text for part in event.content.parts if part.text).strip()
+
+
+def memory_entry(author, text, timestamp):
+    return MemoryEntry(
+        content=genai_types.Content(
+            role="user" if author == "user" else "model", parts=[genai_types.Part.from_text(text=text)]
+        ),
+        author=author,
+        timestamp=datetime.fromtimestamp(timestamp).isoformat(),
+    )
+
+
+class _VectorMemoryService(BaseMemoryService):
+    def __init__(self, embedder=None, top_k=MEMORY_TOP_K, max_distance=MEMORY_MAX_DISTANCE,
+                 max_entries_per_user=MEMORY_MAX_ENTRIES_PER_USER, retention_days=MEMORY_RETENTION_DAYS):
+        self.embedder = embedder or get_embedder()
+        self.top_k = top_k
+        self.max_distance = max_distance
+        self.max_entries_per_user = max_entries_per_user
+        self.retention_seconds = retention_days * 86400
+
+    async def _embed(self, texts):
+        if self.embedder.blocking:
+            return await asyncio.to_thread(self.embedder.embed_batch, texts)
+        return self.embedder.embed_batch(texts)
+
+    async def _new_entries(self, session, stored_event_ids):
+        """Returns (event ids, authors, texts, timestamps, vectors) of the events not stored yet."""
+        cutoff = time.time() - self.retention_seconds
+        events = [
+            event for event in session.events
+            if event.id not in stored_event_ids and event.timestamp >= cutoff and event_text(event)
+        ]
+        if not events:
+            return None
+        texts = [event_text(event) for event in events]
+        vectors = np.asarray(await self._embed(texts), dtype=np.float32)
+        return ([event.id for event in events], [event.author for event in events], texts,
+                [event.timestamp for event in events], vectors)
+
+
+class _UserMemories:
+    """One user's entries; vectors are rows of a matrix that grows by doubling."""
+
+    def __init__(self, dimensions):
+        self.vectors = np.zeros((64, dimensions), dtype=np.float32)
+        self.timestamps = np.zeros(64, dtype=np.float64)
+        self.rows = []  # (event_id, session_id, author, text), same order as the vectors
+        self.event_ids = set()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def append(self, session_id, event_ids, authors, texts, timestamps, vectors):
+        size, added = len(self.rows), len(event_ids)
+        if size + added > len(self.vectors):
+            capacity = max(2 * len(self.vectors), size + added)
+            grown_vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+            grown_vectors[:size] = self.vectors[:size]
+            grown_timestamps = np.zeros(capacity, dtype=np.float64)
+            grown_timestamps[:size] = self.timestamps[:size]
+            self.vectors, self.timestamps = grown_vectors, grown_timestamps
+        self.vectors[size:size + added] = vectors
+        self.timestamps[size:size + added] = timestamps
+        self.rows.extend(zip(event_ids, [session_id] * added, authors, texts))
+        self.event_ids.update(event_ids)
+
+    def evict(self, max_entries, cutoff):
+        size = len(self.rows)
+        keep = np.flatnonzero(self.timestamps[:size] >= cutoff)
+        if len(keep) > max_entries:
+            keep = keep[np.argsort(self.timestamps[keep], kind="stable")[-max_entries:]]
+            keep.sort()
+        if len(keep) == size:
+            return 0
+        self.vectors[:len(keep)] = self.vectors[keep]
+        self.timestamps[:len(keep)] = self.timestamps[keep]
+        self.rows = [self.rows[i] for i in keep]
+        self.event_ids = {row[0] for row in self.rows}
+        return size - len(keep)
+
+
+class NumpyMemoryService(_VectorMemoryService):
+    """In-process vector memory; per worker and lost on restart, so for development and tests."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._users = {}
+        self._lock = threading.Lock()
+        self.stats = {"entries_added": 0, "entries_evicted": 0, "searches": 0}
+
+    async def add_session_to_memory(self, session):
+        key = (session.app_name, session.user_id)
+        with self._lock:
+            memories = self._users.get(key)
+        # Re-checked under the lock below, in case another call stored the same events meanwhile.
+        new = await self._new_entries(session, memories.event_ids if memories is not None else set())
+        if new is None:
+            return
+        event_ids, authors, texts, timestamps, vectors = new
+        with self._lock:
+            memories = self._users.get(key)
+            if memories is None:
+                memories = self._users[key] = _UserMemories(vectors.shape[1])
+            fresh = [i for i, event_id in enumerate(event_ids) if event_id not in memories.event_ids]
+            memories.append(session.id, [event_ids[i] for i in fresh], [authors[i] for i in fresh],
+                            [texts[i] for i in fresh], [timestamps[i] for i in fresh], vectors[fresh])
+            self.stats["entries_added"] += len(fresh)
+            self.stats["entries_evicted"] += memories.evict(
+                self.max_entries_per_user, time.time() - self.retention_seconds
+            )
+
+    async def search_memory(self, *, app_name, user_id, query):
+        self.stats["searches"] += 1
+        with self._lock:
+            memories = self._users.get((app_name, user_id))
+            if not memories:
+                return SearchMemoryResponse()
+        query_vector = np.asarray((await self._embed([query]))[0], dtype=np.float32)
+        with self._lock:
+            size = len(memories)
+            if size == 0:
+                return SearchMemoryResponse()
+            scores = memories.vectors[:size] @ query_vector
+            k = min(self.top_k, size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = [(memories.rows[i], memories.timestamps[i]) for i in top
+                       if 1.0 - scores[i] <= self.max_distance]
+        return SearchMemoryResponse(
+            memories=[memory_entry(author, text, timestamp) for (_, _, author, text), timestamp in results]
+        )
+
+
+SCHEMA_SQL = """
+CREATE EXTENSION IF NOT EXISTS vector;
+CREATE TABLE IF NOT EXISTS memory_entries (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    author TEXT,
+    text TEXT NOT NULL,
+    event_time TIMESTAMP WITH TIME ZONE NOT NULL,
+    embedding vector NOT NULL,
+    PRIMARY KEY (app_name, user_id, event_id)
+);
+-- Searches and evictions only touch one user's rows.
+CREATE INDEX IF NOT EXISTS memory_entries_user_time_idx ON memory_entries (app_name, user_id, event_time);
+"""
+
+STORED_EVENTS_SQL = """
+SELECT event_id FROM memory_entries WHERE app_name = %s AND user_id = %s AND session_id = %s
+"""
+
+INSERT_SQL = """
+INSERT INTO memory_entries (app_name, user_id, event_id, session_id, author, text, event_time, embedding)
+VALUES %s
+ON CONFLICT DO NOTHING
+"""
+INSERT_TEMPLATE = "(%s, %s, %s, %s, %s, %s, to_timestamp(%s), %s::vector)"
+
+EVICT_SQL = """
+DELETE FROM memory_entries m
+WHERE m.app_name = %(app_name)s AND m.user_id = %(user_id)s
+  AND (m.event_time < CURRENT_TIMESTAMP - make_interval(secs => %(retention_seconds)s)
+       OR m.event_id IN (SELECT event_id FROM memory_entries
+                         WHERE app_name = %(app_name)s AND user_id = %(user_id)s
+                         ORDER BY event_time DESC OFFSET %(max_entries)s))
+"""
+
+# Exact ranking over the user's rows, found through memory_entries_user_time_idx.
+SEARCH_SQL = """
+SELECT author, text, extract(epoch FROM event_time), distance FROM (
+    SELECT author, text, event_time, embedding <=> %(query)s::vector AS distance
+    FROM memory_entries
+    WHERE app_name = %(app_name)s AND user_id = %(user_id)s
+    ORDER BY distance
+    LIMIT %(top_k)s
+) nearest
+WHERE distance <= %(max_distance)s
+ORDER BY distance
+"""
+
+
+def psycopg2_dsn(db_url):
+    """postgresql+driver://... (a SQLAlchemy URL) -> postgresql://... for psycopg2."""
+    scheme, _, rest = db_url.partition("://")
+    return f"{scheme.split('+')[0]}://{rest}"
+
+
+def vector_literal(vector):
+    return "[" + ",".join(f"{float(x):.7g}" for x in vector) + "]"
+
+
+class PgVectorMemoryService(_VectorMemoryService):
+    """Vector memory in Postgres (pgvector), shared by every worker; creates its table on first use."""
+
+    def __init__(self, db_url, min_connections=1, max_connections=10, **kwargs):
+        super().__init__(**kwargs)
+        self.db_url = psycopg2_dsn(db_url)
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    import psycopg2.pool
+
+                    pool = psycopg2.pool.ThreadedConnectionPool(self.min_connections, self.max_connections, self.db_url)
+                    connection = pool.getconn()
+                    try:
+                        with connection, connection.cursor() as cursor:
+                            cursor.execute(SCHEMA_SQL)
+                    finally:
+                        pool.putconn(connection)
+                    self._pool = pool
+        return self._pool
+
+    def warmup(self):
+        """Opens the connection pool and creates the table, ahead of the first request."""
+        self._get_pool()
+
+    def _execute(self, work):
+        pool = self._get_pool()
+        connection = pool.getconn()
+        try:
+            with connection, connection.cursor() as cursor:
+                return work(cursor)
+        finally:
+            pool.putconn(connection)
+
+    def _stored_event_ids(self, session):
+        def work(cursor):
+            cursor.execute(STORED_EVENTS_SQL, (session.app_name, session.user_id, session.id))
+            return {row[0] for row in cursor.fetchall()}
+        return self._execute(work)
+
+    def _insert(self, session, new):
+        import psycopg2.extras
+
+        event_ids, authors, texts, timestamps, vectors = new
+        rows = [
+            (session.app_name, session.user_id, event_id, session.id, author, text, timestamp, vector_literal(vector))
+            for event_id, author, text, timestamp, vector in zip(event_ids, authors, texts, timestamps, vectors)
+        ]
+
+        def work(cursor):
+            psycopg2.extras.execute_values(cursor, INSERT_SQL, rows, template=INSERT_TEMPLATE)
+            cursor.execute(EVICT_SQL, {
+                "app_name": session.app_name, "user_id": session.user_id,
+                "retention_seconds": self.retention_seconds, "max_entries": self.max_entries_per_user,
+            })
+        self._execute(work)
+
+    def _search(self, app_name, user_id, query_vector):
+        def work(cursor):
+            cursor.execute(SEARCH_SQL, {
+                "query": vector_literal(query_vector), "app_name": app_name, "user_id": user_id,
+                "top_k": self.top_k, "max_distance": self.max_distance,
+            })
+            return cursor.fetchall()
+        return self._execute(work)
+
+    async def add_session_to_memory(self, session):
+        stored = await asyncio.to_thread(self._stored_event_ids, session)
+        new = await self._new_entries(session, stored)
+        if new is not None:
+            await asyncio.to_thread(self._insert, session, new)
+
+    async def search_memory(self, *, app_name, user_id, query):
+        query_vector = (await self._embed([query]))[0]
+        rows = await asyncio.to_thread(self._search, app_name, user_id, query_vector)
+        return SearchMemoryResponse(
+            memories=[memory_entry(author, text, float(timestamp)) for author, text, timestamp, _ in rows]
+        )
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
@@ -0,0 +1,209 @@
+"""Background ingestion of chat sessions into the memory service.
+
+The views enqueue a session after every turn. A session is ingested once it
+has been idle for MEMORY_INGEST_IDLE_SECONDS; a new turn before then pushes
+the deadline back, so an active conversation is uploaded once instead of
+after every turn. A daemon thread with its own event loop ingests due sessions
+in batches of MEMORY_INGEST_BATCH_SIZE, off the request path, and retries
+failures with exponential backoff. The queue holds at most
+MEMORY_INGEST_MAX_PENDING sessions; when it is full, new sessions are dropped
+and counted. flush() (called on shutdown) ingests everything still pending
+without waiting for the idle period.
+
+A session without messages newer than its previous upload by this worker
+(a high-water mark per session, kept for the last MEMORY_INGEST_MAX_TRACKED
+sessions) is not uploaded at all. Memory services that add every upload to
+what they hold (see uploads_new_events_only) get only the new events: the
+Vertex AI RAG corpus stores every upload as a file, so re-sending the whole
+conversation would duplicate it in load_memory results. Services that
+replace what they hold for a session, like ADK's InMemoryMemoryService, get
+the whole session.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+MEMORY_INGESTION_ENABLED = os.environ.get("MEMORY_INGESTION_ENABLED", "true").lower() == "true"
+MEMORY_INGEST_IDLE_SECONDS = float(os.environ.get("MEMORY_INGEST_IDLE_SECONDS", 120))
+MEMORY_INGEST_BATCH_SIZE = int(os.environ.get("MEMORY_INGEST_BATCH_SIZE", 16))
+MEMORY_INGEST_MAX_PENDING = int(os.environ.get("MEMORY_INGEST_MAX_PENDING", 10000))
+# Sessions whose last uploaded event is remembered; an evicted session is uploaded whole next time.
+MEMORY_INGEST_MAX_TRACKED = int(os.environ.get("MEMORY_INGEST_MAX_TRACKED", 100000))
+MEMORY_INGEST_MAX_ATTEMPTS = int(os.environ.get("MEMORY_INGEST_MAX_ATTEMPTS", 5))
+MEMORY_INGEST_RETRY_SECONDS = float(os.environ.get("MEMORY_INGEST_RETRY_SECONDS", 10))
+# How often the worker looks for sessions that became due.
+MEMORY_INGEST_POLL_SECONDS = float(os.environ.get("MEMORY_INGEST_POLL_SECONDS", 5))
+
+
+def uploads_new_events_only(memory_service):
+    """True when the service keeps earlier uploads of a session, so a later upload only needs the new events.
+
+    That is the RAG corpus (one file per upload) and the vector services of memory.py (deduplicated by
+    event id). Any other service, like InMemoryMemoryService, may replace the session and gets all of it.
+    """
+    from .memory import _VectorMemoryService
+
+    if isinstance(memory_service, _VectorMemoryService):
+        return True
+    try:
+        from google.adk.memory import VertexAiRagMemoryService
+    except ImportError:
+        return False
+    return isinstance(memory_service, VertexAiRagMemoryService)
+
+
+class MemoryIngestionQueue:
+    def __init__(self, get_session_service, get_memory_service, idle_seconds=MEMORY_INGEST_IDLE_SECONDS,
+                 batch_size=MEMORY_INGEST_BATCH_SIZE, max_pending=MEMORY_INGEST_MAX_PENDING,
+                 max_attempts=MEMORY_INGEST_MAX_ATTEMPTS, retry_seconds=MEMORY_INGEST_RETRY_SECONDS,
+                 poll_seconds=MEMORY_INGEST_POLL_SECONDS, max_tracked=MEMORY_INGEST_MAX_TRACKED):
+        self._get_session_service = get_session_service
+        self._get_memory_service = get_memory_service
+        self.idle_seconds = idle_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.poll_seconds = poll_seconds
+        self.max_tracked = max_tracked
+        # (app_name, user_id, session_id) -> [due time, failed attempts], in enqueue order.
+        self._pending = OrderedDict()
+        # (app_name, user_id, session_id) -> timestamp of the newest event already uploaded.
+        self._uploaded_until = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._flushing = False
+        self._stopping = False
+        self._thread = None
+        self.stats = {"enqueued": 0, "deduplicated": 0, "dropped": 0, "ingested": 0,
+                      "failed": 0, "retried": 0, "batches": 0,
+                      "unchanged": 0}
+
+    def enqueue(self, app_name, user_id, session_id):
+        """Queues a session for ingestion; returns False when it was dropped because the queue is full."""
+        key = (app_name, user_id, session_id)
+        due = time.monotonic() + self.idle_seconds
+        with self._lock:
+            if self._stopping:
+                return False
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[0] = due
+                self._pending.move_to_end(key)
+                self.stats["deduplicated"] += 1
+                return True
+            if len(self._pending) >= self.max_pending:
+                self.stats["dropped"] += 1
+                return False
+            self._pending[key] = [due, 0]
+            self.stats["enqueued"] += 1
+            self._idle.clear()
+            self._ensure_started()
+        return True
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="memory-ingestion", daemon=True)
+            self._thread.start()
+
+    def _take_due(self):
+        now = time.monotonic()
+        with self._lock:
+            force = self._flushing or self._stopping
+            batch = [(key, entry[1]) for key, entry in self._pending.items() if force or entry[0] <= now]
+            batch = batch[: self.batch_size]
+            for key, _ in batch:
+                del self._pending[key]
+            if not batch and not self._pending:
+                self._idle.set()
+            return batch
+
+    async def _ingest(self, key):
+        app_name, user_id, session_id = key
+        memory_service = self._get_memory_service()
+        delta = uploads_new_events_only(memory_service)
+        with self._lock:
+            uploaded_until = self._uploaded_until.get(key)
+        # An explicit config loads the history beyond the recent window: all of it, or what is new.
+        session = await self._get_session_service().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id,
+            config=GetSessionConfig(after_timestamp=uploaded_until) if uploaded_until and delta else GetSessionConfig(),
+        )
+        if session is None:
+            return
+        events = [event for event in session.events if uploaded_until is None or event.timestamp > uploaded_until]
+        if any(event.content and event.content.parts for event in events):
+            await memory_service.add_session_to_memory(
+                session.model_copy(update={"events": events}) if delta else session)
+        else:
+            with self._lock:
+                self.stats["unchanged"] += 1
+        if events:
+            with self._lock:
+                self._uploaded_until[key] = max(event.timestamp for event in events)
+                self._uploaded_until.move_to_end(key)
+                while len(self._uploaded_until) > self.max_tracked:
+                    self._uploaded_until.popitem(last=False)
+
+    async def _ingest_batch(self, batch):
+        results = await asyncio.gather(*(self._ingest(key) for key, _ in batch), return_exceptions=True)
+        retry_at = time.monotonic()
+        with self._lock:
+            self.stats["batches"] += 1
+            for (key, attempts), result in zip(batch, results):
+                if not isinstance(result, Exception):
+                    self.stats["ingested"] += 1
+                elif attempts + 1 >= self.max_attempts or self._stopping:
+                    self.stats["failed"] += 1
+                    print(f"Giving up on adding session {key[2]} to memory: {result!r}")
+                elif key not in self._pending:
+                    # A turn during ingestion re-queued the session already; otherwise retry later.
+                    self._pending[key] = [retry_at + self.retry_seconds * 2 ** attempts, attempts + 1]
+                    self.stats["retried"] += 1
+                    print(f"Adding session {key[2]} to memory failed, retrying: {result!r}")
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                batch = self._take_due()
+                if batch:
+                    loop.run_until_complete(self._ingest_batch(batch))
+                    continue
+                if self._stopping:
+                    break
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+        finally:
+            loop.close()
+
+    def flush(self, timeout=30):
+        """Ingests every pending session now; returns True if the queue drained within the timeout."""
+        with self._lock:
+            if not self._pending:
+                return True
+            self._flushing = True
+        self._wakeup.set()
+        try:
+            return self._idle.wait(timeout)
+        finally:
+            self._flushing = False
+
+    def stop(self, timeout=30):
+        """Flushes the queue and stops the worker thread; later enqueues are ignored."""
+        drained = self.flush(timeout)
+        with self._lock:
+            self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if not drained:
+            print(f"Memory ingestion stopped with {len(self._pending)} sessions not ingested.")
+        return drained
@@ -0,0 +1,455 @@
+"""Per-turn timings and Prometheus metrics for the agent pipeline.
+
+The views time each phase of a turn (session load, response cache lookup,
+the agent run, post-turn bookkeeping). Agent callbacks time every model call
+(total and time to first response, plus token counts from usage_metadata,
+including the prompt tokens served from a context cache)
+and every tool call, including the search_agent sub-agent and load_memory.
+Everything is recorded in in-process counters and histograms served by
+``/metrics`` in the Prometheus text format; with METRICS_LOG_TURNS=true each
+turn is also printed as one JSON line.
+
+Recording is a dict update under a lock, cheap enough to leave on. Counters
+live in the worker process; set METRICS_DIR to a directory shared by the
+gunicorn workers and each worker writes its counters there every
+METRICS_FLUSH_SECONDS, so a scrape of any worker reports the sum over all of them.
+When a worker shuts down, or a scrape finds the file of a worker that died
+without doing so, its counters and histograms are added to ARCHIVE_FILE and
+its file is deleted, so the summed series never go down (like
+prometheus_client's multiprocess mode). Its gauges (the collected values:
+cache entries, in-flight runs, ready) are dropped. A file not rewritten for
+METRICS_STALE_SECONDS by a live worker keeps its counters but not its gauges.
+"""
+
+import contextlib
+import contextvars
+import fcntl
+import json
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+METRICS_LOG_TURNS = os.environ.get("METRICS_LOG_TURNS", "false").lower() == "true"
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+METRICS_STALE_SECONDS = float(os.environ.get("METRICS_STALE_SECONDS", 6 * METRICS_FLUSH_SECONDS))
+# Counter and histogram totals of the workers that have exited, in METRICS_DIR.
+ARCHIVE_FILE = "archive.json"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Timings still waiting for their after-callback, keyed by invocation/call id.
+# Entries of calls that raised are dropped once they are older than this.
+_PENDING_MAX_AGE_SECONDS = 600
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: (list(value) if isinstance(value, list) else value) for labels, value in self._values.items()}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            # Per-bucket (not cumulative) counts, then sum and count.
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-2] += value
+            state[-1] += 1
+
+
+turn_seconds = Histogram("agent_turn_seconds", "Duration of an agent turn.", ["endpoint", "outcome"])
+turn_phase_seconds = Histogram("agent_turn_phase_seconds", "Duration of each phase of an agent turn.", ["phase"])
+model_call_seconds = Histogram("agent_model_call_seconds", "Duration of a model call.", ["agent", "model"])
+model_first_response_seconds = Histogram(
+    "agent_model_first_response_seconds", "Time from a model request to its first (possibly partial) response.",
+    ["agent", "model"],
+)
+model_tokens = Counter("agent_model_tokens_total", "Tokens reported by the model.", ["agent", "model", "kind"])
+tool_call_seconds = Histogram("agent_tool_call_seconds", "Duration of a tool call.", ["agent", "tool", "status"])
+errors = Counter("agent_errors_total", "Turns that failed with an exception.", ["endpoint"])
+
+REGISTRY = [turn_seconds, turn_phase_seconds, model_call_seconds, model_first_response_seconds,
+            model_tokens, tool_call_seconds, errors]
+
+# Functions returning [(name, documentation, {label: value}, value)] of counters read
+# from other components (caches, queues) at scrape time.
+_collectors = []
+
+
+def register_collector(collector):
+    _collectors.append(collector)
+
+
+class TurnTrace:
+    """Timings of one turn, filled in by the views and the agent callbacks."""
+
+    def __init__(self, endpoint, app_name=None, session_id=None):
+        self.endpoint = endpoint
+        self.app_name = app_name
+        self.session_id = session_id
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.model_calls = []
+        self.tool_calls = []
+        self.tokens = {"prompt": 0, "cached": 0, "candidates": 0}
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def finish(self, outcome):
+        elapsed = time.perf_counter() - self.start
+        if not METRICS_ENABLED:
+            return elapsed
+        turn_seconds.observe(elapsed, self.endpoint, outcome)
+        if outcome == "error":
+            errors.inc(self.endpoint)
+        if METRICS_LOG_TURNS:
+            print(json.dumps({
+                "event": "agent_turn", "endpoint": self.endpoint, "app_name": self.app_name,
+                "session_id": self.session_id, "outcome": outcome, "seconds": round(elapsed, 4),
+                "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+                "model_calls": self.model_calls, "tool_calls": self.tool_calls, "tokens": self.tokens,
+            }))
+        return elapsed
+
+
+class _Phase:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.trace.phases[self.name] = self.trace.phases.get(self.name, 0.0) + elapsed
+        if METRICS_ENABLED:
+            turn_phase_seconds.observe(elapsed, self.name)
+        return False
+
+
+_current_trace = contextvars.ContextVar("agent_turn_trace", default=None)
+
+
+def start_turn(endpoint, app_name=None, session_id=None):
+    return use_turn(TurnTrace(endpoint, app_name, session_id))
+
+
+def use_turn(trace):
+    """Makes ``trace`` the one the agent callbacks of the current context report to."""
+    _current_trace.set(trace)
+    return trace
+
+
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def _start(key, value):
+    now = time.perf_counter()
+    with _pending_lock:
+        if len(_pending) > 1000:
+            for stale in [k for k, (started, _) in _pending.items() if now - started > _PENDING_MAX_AGE_SECONDS]:
+                del _pending[stale]
+        _pending[key] = (now, value)
+
+
+def before_model(callback_context, llm_request):
+    """before_model_callback: starts the timer of a model call."""
+    if METRICS_ENABLED:
+        _start(("model", callback_context.invocation_id, callback_context.agent_name),
+               {"model": llm_request.model or "unknown", "first": None})
+    return None
+
+
+def after_model(callback_context, llm_response):
+    """after_model_callback: records a model call once its complete (non-partial) response arrives."""
+    if not METRICS_ENABLED:
+        return None
+    key = ("model", callback_context.invocation_id, callback_context.agent_name)
+    now = time.perf_counter()
+    with _pending_lock:
+        entry = _pending.get(key) if llm_response.partial else _pending.pop(key, None)
+        if entry is not None and entry[1]["first"] is None:
+            entry[1]["first"] = now - entry[0]
+    if entry is None or llm_response.partial:
+        return None
+    started, call = entry
+    agent, model, elapsed = callback_context.agent_name, call["model"], now - started
+    model_call_seconds.observe(elapsed, agent, model)
+    model_first_response_seconds.observe(call["first"], agent, model)
+    usage = llm_response.usage_metadata
+    prompt_tokens = (usage.prompt_token_count or 0) if usage else 0
+    # Part of prompt_tokens read from context_cache instead of prefilled.
+    cached_tokens = (usage.cached_content_token_count or 0) if usage else 0
+    candidate_tokens = (usage.candidates_token_count or 0) if usage else 0
+    if prompt_tokens:
+        model_tokens.inc(agent, model, "prompt", amount=prompt_tokens)
+    if cached_tokens:
+        model_tokens.inc(agent, model, "cached", amount=cached_tokens)
+    if candidate_tokens:
+        model_tokens.inc(agent, model, "candidates", amount=candidate_tokens)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.model_calls.append({"agent": agent, "model": model, "seconds": round(elapsed, 4)})
+        trace.tokens["prompt"] += prompt_tokens
+        trace.tokens["cached"] += cached_tokens
+        trace.tokens["candidates"] += candidate_tokens
+    return None
+
+
+def before_tool(tool, args, tool_context):
+    """before_tool_callback: starts the timer of a tool call."""
+    if METRICS_ENABLED:
+        _start(("tool", tool_context.function_call_id), None)
+    return None
+
+
+def after_tool(tool, args, tool_context, tool_response):
+    """after_tool_callback: records the tool call; a response carrying an "error" key counts as an error."""
+    if not METRICS_ENABLED:
+        return None
+    with _pending_lock:
+        entry = _pending.pop(("tool", tool_context.function_call_id), None)
+    if entry is None:
+        return None
+    elapsed = time.perf_counter() - entry[0]
+    status = "error" if isinstance(tool_response, dict) and "error" in tool_response else "ok"
+    tool_call_seconds.observe(elapsed, tool_context.agent_name, tool.name, status)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.tool_calls.append({"tool": tool.name, "status": status, "seconds": round(elapsed, 4)})
+    return None
+
+
+# --- Exposition ---
+
+def _snapshot():
+    return {
+        "metrics": {metric.name: [[list(labels), value] for labels, value in metric.snapshot().items()]
+                    for metric in REGISTRY},
+        "collected": [[name, documentation, labels, value]
+                      for collector in _collectors for name, documentation, labels, value in collector()],
+    }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+
+def _add_metrics(total, metrics):
+    # Sums the "metrics" part of snapshots: counters add up, histogram states element-wise.
+    for name, rows in metrics.items():
+        merged = {tuple(labels): value for labels, value in total.get(name, [])}
+        for labels, value in rows:
+            labels = tuple(labels)
+            if isinstance(value, list):
+                previous = merged.get(labels, [0] * len(value))
+                merged[labels] = [a + b for a, b in zip(previous, value)]
+            else:
+                merged[labels] = merged.get(labels, 0.0) + value
+        total[name] = [[list(labels), value] for labels, value in merged.items()]
+    return total
+
+
+@contextlib.contextmanager
+def _archive_lock():
+    # Serializes archiving across the worker processes sharing METRICS_DIR.
+    with open(os.path.join(METRICS_DIR, ARCHIVE_FILE + ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _archive(path, metrics=None):
+    """Adds the counters of a worker's snapshot (``metrics``, or those in ``path``) to the archive, then deletes ``path``.
+
+    The caller holds _archive_lock().
+    """
+    if metrics is None:
+        snapshot = _read_json(path, None)
+        if snapshot is None:
+            return  # archived by another worker meanwhile
+        metrics = snapshot["metrics"]
+    archive_path = os.path.join(METRICS_DIR, ARCHIVE_FILE)
+    archive = _read_json(archive_path, {"metrics": {}})
+    _add_metrics(archive["metrics"], metrics)
+    with open(archive_path + ".tmp", "w") as f:
+        json.dump(archive, f)
+    os.replace(archive_path + ".tmp", archive_path)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def _merged_snapshots():
+    """Snapshots of the workers in METRICS_DIR and the archive, with this worker's current one in place of its file."""
+    snapshots = [_snapshot()]
+    own = f"{os.getpid()}.json"
+    now = time.time()
+    # Under the lock, so a file being archived by another worker is counted exactly once.
+    with _archive_lock():
+        for filename in os.listdir(METRICS_DIR):
+            if not filename.endswith(".json") or filename in (own, ARCHIVE_FILE):
+                continue
+            path = os.path.join(METRICS_DIR, filename)
+            try:
+                pid = int(filename[:-len(".json")])
+                if not _pid_alive(pid):
+                    # Exited or killed without archiving its counters itself.
+                    _archive(path)
+                    continue
+                stale = now - os.path.getmtime(path) > METRICS_STALE_SECONDS
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue  # being replaced right now, or not a worker snapshot
+            if stale:
+                snapshot["collected"] = []  # not flushing any more: its gauges are not current
+            snapshots.append(snapshot)
+        try:
+            archive = _read_json(os.path.join(METRICS_DIR, ARCHIVE_FILE), None)
+        except (OSError, ValueError):
+            archive = None
+    if archive is not None:
+        snapshots.append({"metrics": archive["metrics"], "collected": []})
+    return snapshots
+
+
+def _label_text(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    snapshots = _merged_snapshots() if METRICS_DIR else [_snapshot()]
+    totals = {}
+    for snapshot in snapshots:
+        _add_metrics(totals, snapshot["metrics"])
+    lines = []
+    for metric in REGISTRY:
+        merged = {tuple(labels): value for labels, value in totals.get(metric.name, [])}
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in sorted(merged.items()):
+            if metric.kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), value):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{metric.name}_bucket{_label_text(metric.labelnames, labels, [('le', le)])} {cumulative}")
+                lines.append(f"{metric.name}_sum{_label_text(metric.labelnames, labels)} {value[-2]}")
+                lines.append(f"{metric.name}_count{_label_text(metric.labelnames, labels)} {value[-1]}")
+            else:
+                lines.append(f"{metric.name}{_label_text(metric.labelnames, labels)} {value}")
+    collected = {}
+    for snapshot in snapshots:
+        for name, documentation, labels, value in snapshot["collected"]:
+            entry = collected.setdefault(name, [documentation, {}])
+            key = tuple(sorted(labels.items()))
+            entry[1][key] = entry[1].get(key, 0) + value
+    for name, (documentation, values) in sorted(collected.items()):
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in sorted(values.items()):
+            lines.append(f"{name}{_label_text([k for k, _ in labels], [v for _, v in labels])} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_snapshot():
+    """Writes this worker's counters to METRICS_DIR for the other workers' scrapes."""
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    with _snapshot_lock:
+        if _flusher_stop.is_set():
+            return  # archived at shutdown; a new file would be counted twice
+        with open(path + ".tmp", "w") as f:
+            json.dump(_snapshot(), f)
+        os.replace(path + ".tmp", path)
+
+
+def remove_snapshot():
+    """At shutdown: adds this worker's counters to the archive and deletes its file, dropping its gauges."""
+    with _snapshot_lock:
+        _flusher_stop.set()
+        with _archive_lock():
+            _archive(os.path.join(METRICS_DIR, f"{os.getpid()}.json"), _snapshot()["metrics"])
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+_flusher_stop = threading.Event()
+_snapshot_lock = threading.Lock()
+
+
+def start_flusher():
+    """Starts the thread that writes this worker's snapshot every METRICS_FLUSH_SECONDS (METRICS_DIR only)."""
+    global _flusher
+    if not METRICS_DIR or not METRICS_ENABLED or _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+
+            def flush_forever():
+                while not _flusher_stop.wait(METRICS_FLUSH_SECONDS):
+                    try:
+                        write_snapshot()
+                    except OSError as e:
+                        print(f"Writing metrics to {METRICS_DIR} failed: {e}")
+
+            _flusher = threading.Thread(target=flush_forever, name="metrics-flush", daemon=True)
+            _flusher.start()
@@ -0,0 +1,173 @@
+"""Semantic cache of final answers, checked before a turn is handed to the Runner.
+
+Opt-in with SEMANTIC_CACHE_ENABLED=true. A question is answered from the cache
+when an earlier question of the same user in the same app normalizes to the
+same text, or its embedding is at least SEMANTIC_CACHE_THRESHOLD similar and
+it mentions the same ticket ids, priorities, statuses, e-mail addresses and
+negation or comparison words ("not", "without", "before", ...). Entries expire
+after SEMANTIC_CACHE_TTL_SECONDS and the least recently used ones are evicted
+beyond SEMANTIC_CACHE_MAX_ENTRIES.
+
+Questions that ask for a change (create/update intents) or refer back to the
+conversation ("it", "that ticket") are never cached. Every entry is dropped
+when a ticket write tool runs in this worker (see invalidate_on_ticket_write);
+writes made by other workers are only seen once entries expire.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from .cache import TTLCache
+from .embeddings import get_embedder
+from .tools.toolbox import is_write_tool
+
+SEMANTIC_CACHE_ENABLED = os.environ.get("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_TTL_SECONDS = float(os.environ.get("SEMANTIC_CACHE_TTL_SECONDS", 300))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", 512))
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", 0.85))
+
+_WRITE_INTENT_RE = re.compile(
+    r"\b(create|open a|file|add|new ticket|update|change|set|bump|raise|lower|increase|decrease|"
+    r"escalate|assign|reassign|close|reopen|resolve|mark|move|delete|remove)\b"
+)
+_CONTEXT_RE = re.compile(
+    r"\b(it|its|them|they|above|previous|same|again|more|(this|that|these|those) (one|ones|ticket|tickets|issue|issues))\b"
+)
+# Negation and comparison words count as entities: "tickets not assigned to susan.chen@x.com" embeds
+# close to "tickets assigned to susan.chen@x.com" but asks for the opposite.
+_ENTITY_RE = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+|\bp[0-4]\b|\b\d+\b|\b(?:open|in progress|closed|resolved|low|medium|high|critical)\b"
+    r"|\b(?:not|no|none|never|without|except|excluding|other than|unassigned|\w+n t|before|after|since|until|"
+    r"older|newer|earlier|later|than|over|under|between|least|most)\b"
+)
+
+
+def normalize_query(text):
+    return " ".join(re.sub(r"[^\w@.\s-]", " ", text.lower()).split())
+
+
+def _entities(normalized):
+    return frozenset(m.group(0) for m in _ENTITY_RE.finditer(normalized))
+
+
+def is_cacheable_query(normalized):
+    return not _WRITE_INTENT_RE.search(normalized) and not _CONTEXT_RE.search(normalized)
+
+
+class SemanticResponseCache:
+    def __init__(self, embedder=None, ttl=SEMANTIC_CACHE_TTL_SECONDS,
+                 max_entries=SEMANTIC_CACHE_MAX_ENTRIES, threshold=SEMANTIC_CACHE_THRESHOLD):
+        self.embedder = embedder or get_embedder()
+        self.threshold = threshold
+        self._entries = TTLCache(max_entries, ttl)
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; answers computed across a write are not stored.
+        self.generation = 0
+        self.stats = {
+            "lookups": 0, "hits": 0, "exact_hits": 0, "misses": 0, "skipped": 0,
+            "stores": 0, "invalidations": 0, "lookup_seconds": 0.0, "hit_seconds": 0.0,
+        }
+
+    async def _embed(self, text):
+        if self.embedder.blocking:
+            return await asyncio.to_thread(self.embedder.embed, text)
+        return self.embedder.embed(text)
+
+    async def lookup(self, app_name, user_id, query):
+        """Returns (answer or None, ticket) where ticket is passed back to store().
+
+        Answers are kept per user: "my tickets" or "what is my name?" depend on
+        who asks (load_memory is per user).
+        """
+        start = time.perf_counter()
+        normalized = normalize_query(query)
+        self.stats["lookups"] += 1
+        if not is_cacheable_query(normalized):
+            self.stats["skipped"] += 1
+            return None, None
+
+        ticket = {"key": (app_name, user_id, normalized), "generation": self.generation, "embedding": None}
+        answer = self._entries.get(ticket["key"])
+        if answer is not None:
+            self.stats["exact_hits"] += 1
+            answer = answer["answer"]
+        else:
+            ticket["embedding"] = embedding = await self._embed(normalized)
+            entities = _entities(normalized)
+            candidates = [entry for (entry_app, entry_user, _), entry in self._entries.items()
+                          if entry_app == app_name and entry_user == user_id and entry["entities"] == entities]
+            if candidates:
+                scores = np.stack([entry["embedding"] for entry in candidates]) @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    answer = candidates[best]["answer"]
+
+        elapsed = time.perf_counter() - start
+        self.stats["lookup_seconds"] += elapsed
+        if answer is None:
+            self.stats["misses"] += 1
+            return None, ticket
+        self.stats["hits"] += 1
+        self.stats["hit_seconds"] += elapsed
+        return answer, None
+
+    async def store(self, ticket, answer):
+        """Caches the answer for a missed lookup unless a ticket write happened meanwhile."""
+        if ticket is None or not answer or ticket["generation"] != self.generation:
+            return
+        embedding = ticket["embedding"]
+        if embedding is None:
+            embedding = await self._embed(ticket["key"][2])
+        with self._lock:
+            if ticket["generation"] != self.generation:
+                return
+            self._entries.set(ticket["key"], {
+                "embedding": embedding,
+                "entities": _entities(ticket["key"][2]),
+                "answer": answer,
+            })
+            self.stats["stores"] += 1
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+
+    def snapshot(self):
+        """Counters plus hit rate and mean lookup latencies, for logs and metrics."""
+        stats = dict(self.stats, entries=len(self._entries))
+        cacheable = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / cacheable if cacheable else 0.0
+        stats["mean_lookup_ms"] = stats["lookup_seconds"] * 1000 / stats["lookups"] if stats["lookups"] else 0.0
+        stats["mean_hit_ms"] = stats["hit_seconds"] * 1000 / stats["hits"] if stats["hits"] else 0.0
+        return stats
+
+
+_response_cache_instance = None
+_init_lock = threading.Lock()
+
+def get_response_cache():
+    """The worker's SemanticResponseCache, or None when SEMANTIC_CACHE_ENABLED is off."""
+    global _response_cache_instance
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    if _response_cache_instance is None:
+        with _init_lock:
+            if _response_cache_instance is None:
+                _response_cache_instance = SemanticResponseCache()
+                print("Semantic response cache enabled.")
+    return _response_cache_instance
+
+
+def invalidate_on_ticket_write(tool, args, tool_context, tool_response):
+    """after_tool_callback dropping cached answers once a ticket write tool has run."""
+    if is_write_tool(tool.name) and _response_cache_instance is not None:
+        _response_cache_instance.invalidate()
+        print(f"Semantic response cache invalidated after {tool.name}.")
+    return None
@@ -0,0 +1,489 @@
+import asyncio
+import collections
+import copy
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.database_session_service import (
+    StorageAppState, StorageEvent, StorageSession, StorageUserState, _extract_state_delta,
+)
+from sqlalchemy import func, select
+
+from . import compaction
+
+# Connection pool sizing for the session database. Only applied to server
+# databases (PostgreSQL); SQLite manages its own pool.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+
+# In-process cache of recently used sessions in front of the database (see CachedDatabaseSessionService).
+SESSION_CACHE_ENABLED = os.environ.get("SESSION_CACHE_ENABLED", "true").lower() == "true"
+SESSION_CACHE_MAX_SESSIONS = int(os.environ.get("SESSION_CACHE_MAX_SESSIONS", 1000))
+# Held events are written once the turn ends, or as soon as this many are waiting.
+SESSION_CACHE_FLUSH_EVENTS = int(os.environ.get("SESSION_CACHE_FLUSH_EVENTS", 32))
+# Check the session's version in the database before serving it from the cache. Turn off only
+# when every turn of a session is routed to the same worker.
+SESSION_CACHE_VALIDATE = os.environ.get("SESSION_CACHE_VALIDATE", "true").lower() == "true"
+
+
+def _engine_kwargs(db_url):
+    if db_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+    }
+
+
+class ThreadedDatabaseSessionService(DatabaseSessionService):
+    """DatabaseSessionService that keeps blocking SQLAlchemy calls off the event loop.
+
+    ADK's DatabaseSessionService exposes async methods but talks to the database
+    with a synchronous engine. Under ASGI every concurrent agent turn in a
+    worker shares one event loop, so each call is run to completion in a
+    worker thread instead.
+    """
+
+    def __init__(self, db_url, **kwargs):
+        super().__init__(db_url=db_url, **{**_engine_kwargs(db_url), **kwargs})
+
+    async def create_session(self, **kwargs):
+        return await asyncio.to_thread(asyncio.run, super().create_session(**kwargs))
+
+    async def get_session(self, **kwargs):
+        return await asyncio.to_thread(asyncio.run, super().get_session(**kwargs))
+
+    async def list_sessions(self, **kwargs):
+        return await asyncio.to_thread(asyncio.run, super().list_sessions(**kwargs))
+
+    async def delete_session(self, **kwargs):
+        return await asyncio.to_thread(asyncio.run, super().delete_session(**kwargs))
+
+    async def append_event(self, session, event):
+        return await asyncio.to_thread(asyncio.run, super().append_event(session=session, event=event))
+
+
+class CompactingDatabaseSessionService(ThreadedDatabaseSessionService):
+    """Loads only a window of recent turns plus a rolling summary of older ones.
+
+    get_session() without a config first reads the start times of the last
+    ``window_turns + compact_every`` user messages, then loads the events
+    from the start of the oldest turn it keeps: the turns not yet folded into
+    the summary, at least the last ``window_turns``. The window starts at a
+    user message and no turn is missing from both the window and the
+    summary, however many tool calls a turn made. Pass an explicit
+    GetSessionConfig (for example ``GetSessionConfig()``) to load the full
+    history.
+
+    compact_session() folds turns that have left the window into the summary
+    stored in the session state; see compaction.py.
+    """
+
+    def __init__(self, db_url, window_turns=compaction.SESSION_WINDOW_TURNS,
+                 compact_every=compaction.SESSION_COMPACT_EVERY,
+                 summarizer=compaction.summarize_turns, **kwargs):
+        super().__init__(db_url, **kwargs)
+        self.window_turns = window_turns
+        self.compact_every = compact_every
+        self.summarizer = summarizer
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        windowed = config is None and self.window_turns > 0
+        if windowed:
+            start = await asyncio.to_thread(self._window_start, app_name, user_id, session_id)
+            config = GetSessionConfig(after_timestamp=start) if start is not None else GetSessionConfig()
+        session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None and windowed:
+            session.events = self._window(session)
+        return session
+
+    def _window_start(self, app_name, user_id, session_id):
+        # Timestamp of the user message starting the oldest turn the window keeps (see
+        # compaction.unsummarized_turns), or None when the session has no user message yet.
+        with self.database_session_factory() as db:
+            storage_session = db.get(StorageSession, (app_name, user_id, session_id))
+            if storage_session is None:
+                return None
+            summary_until = storage_session.state.get(compaction.SUMMARY_UNTIL_STATE_KEY)
+            starts = db.execute(
+                select(StorageEvent.timestamp).where(
+                    StorageEvent.app_name == app_name,
+                    StorageEvent.user_id == user_id,
+                    StorageEvent.session_id == session_id,
+                    StorageEvent.author == "user",
+                ).order_by(StorageEvent.timestamp.desc()).limit(self.window_turns + self.compact_every)
+            ).scalars().all()
+        if not starts:
+            return None
+        newer = sum(1 for start in starts if not summary_until or start.timestamp() > summary_until)
+        keep = min(max(newer, self.window_turns), len(starts))
+        # after_timestamp is inclusive; the margin only absorbs float rounding, as _window trims to whole turns.
+        return starts[keep - 1].timestamp() - 1e-6
+
+    def _window(self, session):
+        return compaction.unsummarized_turns(
+            session.events, session.state.get(compaction.SUMMARY_UNTIL_STATE_KEY), self.window_turns,
+            self.compact_every,
+        )
+
+    async def compact_session(self, *, app_name, user_id, session_id):
+        """Folds turns older than the window into the summary once enough have piled up.
+
+        Reads only the events newer than the current summary, so the cost stays
+        bounded by the window plus ``compact_every`` turns. Returns True when
+        the summary was updated.
+        """
+        compacted, _ = await self._compact(app_name=app_name, user_id=user_id, session_id=session_id)
+        return compacted
+
+    async def _compact(self, *, app_name, user_id, session_id):
+        # Returns (compacted, turns left before the next compaction is due).
+        if self.window_turns <= 0:
+            return False, 0
+        state_session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id,
+            config=GetSessionConfig(num_recent_events=1),
+        )
+        if state_session is None:
+            return False, 0
+        summary_until = state_session.state.get(compaction.SUMMARY_UNTIL_STATE_KEY)
+        session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id,
+            config=GetSessionConfig(after_timestamp=summary_until) if summary_until else GetSessionConfig(),
+        )
+        events = [e for e in session.events if not summary_until or e.timestamp > summary_until]
+        turns = compaction.split_turns(events)
+        if len(turns) < self.window_turns + self.compact_every:
+            return False, self.window_turns + self.compact_every - len(turns)
+
+        folded = turns[: len(turns) - self.window_turns]
+        summary = self.summarizer(session.state.get(compaction.SUMMARY_STATE_KEY, ""), folded)
+        if asyncio.iscoroutine(summary):
+            summary = await summary
+        await self.append_event(
+            session,
+            Event(
+                invocation_id=f"compaction-{uuid.uuid4()}",
+                author="system",
+                timestamp=time.time(),
+                actions=EventActions(state_delta={
+                    compaction.SUMMARY_STATE_KEY: summary,
+                    compaction.SUMMARY_UNTIL_STATE_KEY: folded[-1][-1].timestamp,
+                }),
+            ),
+        )
+        print(f"Compacted {len(folded)} turns of session {session_id} into the conversation summary.")
+        return True, self.compact_every
+
+
+def _apply_event(session, event):
+    # What BaseSessionService.append_event does to the in-memory session.
+    if event.actions and event.actions.state_delta:
+        for key, value in event.actions.state_delta.items():
+            if not key.startswith(State.TEMP_PREFIX):
+                session.state[key] = value
+    session.events.append(event)
+
+
+def _copy_session(session, last_update_time):
+    return Session(app_name=session.app_name, user_id=session.user_id, id=session.id,
+                   state=copy.deepcopy(session.state), events=list(session.events),
+                   last_update_time=last_update_time)
+
+
+def _after(events, newest):
+    # The events, in order, shifted to start after the newest stored event when they do not already.
+    if newest is None or events[0].timestamp > newest:
+        return events
+    shift = newest - events[0].timestamp + 1e-6
+    return [event.model_copy(update={"timestamp": event.timestamp + shift}) for event in events]
+
+
+class _CachedSession:
+    def __init__(self, key, session):
+        self.key = key
+        self.session = session  # the cache's own copy; callers get copies of it
+        # Version handed out as last_update_time; bumped by every append through the cache.
+        self.stamp = session.last_update_time
+        # update_time of the session row when it was last read or written by this worker.
+        self.db_version = session.last_update_time
+        self.pending = []  # events appended but not written yet, in order
+        # User turns left before compaction can be due; 0 means ask the database.
+        self.turns_to_compaction = 0
+        self.flush_lock = threading.Lock()
+
+
+class CachedDatabaseSessionService(CompactingDatabaseSessionService):
+    """Keeps recently used sessions in memory and writes each turn's events in one transaction.
+
+    get_session() (the windowed view the Runner and the views use) is served
+    from an LRU of up to ``max_sessions`` sessions. With ``validate`` on, a
+    hit costs one read of the session row's update_time; when another worker
+    wrote the session since, the entry is dropped and the session is loaded
+    from the database. Explicit GetSessionConfig reads always go to the
+    database.
+
+    Copies handed out carry a version in last_update_time. append_event()
+    with the current version is applied in memory and held; one with an
+    older version, or for a session that is not cached, drops the entry and
+    is written directly (the database's own staleness check applies). Held
+    events are written together by flush_session(), which the views call
+    at the end of every turn, or once ``flush_events`` are waiting. The
+    write also bumps the row's update_time, so other workers see the change.
+
+    Versions come from the database clock: a session loaded from the
+    database carries the row's update_time, appends through the cache
+    advance it by a microsecond each, and every write moves update_time
+    strictly forward. A copy that falls back to ADK's append_event is
+    therefore checked against the same clock as the rows it compares with.
+
+    A write locks the session row (SELECT ... FOR UPDATE). When another
+    worker wrote the session after this worker last read it, the held
+    events are still written, since the turn already happened, but after the
+    newest stored event: their timestamps are shifted so the two turns do
+    not interleave when the session is loaded. Their state changes are
+    merged key by key into the locked row's state, and the entry is dropped
+    so the next turn reloads the session.
+    """
+
+    def __init__(self, db_url, max_sessions=SESSION_CACHE_MAX_SESSIONS, flush_events=SESSION_CACHE_FLUSH_EVENTS,
+                 validate=SESSION_CACHE_VALIDATE, **kwargs):
+        super().__init__(db_url, **kwargs)
+        self.max_sessions = max_sessions
+        self.flush_events = flush_events
+        self.validate = validate
+        self._entries = collections.OrderedDict()  # (app_name, user_id, session_id) -> _CachedSession
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "bypassed": 0, "conflicts": 0, "flushes": 0,
+                      "events_written": 0, "compaction_checks_skipped": 0}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries),
+                        pending=sum(len(entry.pending) for entry in self._entries.values()))
+
+    def _issue(self, entry):
+        # A copy for one caller, trimmed to the window like CompactingDatabaseSessionService.get_session.
+        with self._lock:
+            session = entry.session
+            if self.window_turns > 0:
+                session.events = self._window(session)
+            return _copy_session(session, entry.stamp)
+
+    def _store(self, key, session):
+        entry = _CachedSession(key, _copy_session(session, session.last_update_time))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                # Entries holding unwritten events belong to turns in progress and stay.
+                oldest = next((k for k, e in self._entries.items() if not e.pending and e is not entry), None)
+                if oldest is None:
+                    break
+                del self._entries[oldest]
+        return entry
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _forget(self, entry):
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+
+    async def _drop(self, entry):
+        # Writes what the entry still holds, then forgets it.
+        self._forget(entry)
+        if entry.pending:
+            await asyncio.to_thread(self._flush, entry)
+
+    def _read_version(self, key):
+        app_name, user_id, session_id = key
+        with self.database_session_factory() as db:
+            update_time = db.execute(
+                select(StorageSession.update_time).where(
+                    StorageSession.app_name == app_name,
+                    StorageSession.user_id == user_id,
+                    StorageSession.id == session_id,
+                )
+            ).scalar_one_or_none()
+        return None if update_time is None else update_time.timestamp()
+
+    async def create_session(self, **kwargs):
+        session = await super().create_session(**kwargs)
+        return self._issue(self._store((session.app_name, session.user_id, session.id), session))
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        if config is not None:
+            await self.flush_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            return await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id,
+                                             config=config)
+        key = (app_name, user_id, session_id)
+        entry = self._lookup(key)
+        if entry is not None and self.validate:
+            if await asyncio.to_thread(self._read_version, key) != entry.db_version:
+                self._count("stale")
+                await self._drop(entry)
+                entry = None
+        if entry is not None:
+            self._count("hits")
+            return self._issue(entry)
+        self._count("misses")
+        session = await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            return None
+        return self._issue(self._store(key, session))
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        entry = self._lookup((app_name, user_id, session_id))
+        if entry is not None:
+            self._forget(entry)
+        return await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session, event):
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock:
+            entry = self._entries.get(key)
+            accepted = entry is not None and session.last_update_time == entry.stamp
+            if accepted:
+                _apply_event(entry.session, event)
+                _apply_event(session, event)
+                entry.pending.append(event)
+                entry.stamp += 1e-6
+                session.last_update_time = entry.stamp
+                if compaction.is_turn_start(event):
+                    entry.turns_to_compaction -= 1
+                flush_now = len(entry.pending) >= self.flush_events
+        if not accepted:
+            if entry is not None:
+                self._count("bypassed")
+                await self._drop(entry)
+            return await super().append_event(session, event)
+        if flush_now:
+            await asyncio.to_thread(self._flush, entry)
+        return event
+
+    async def flush_session(self, *, app_name, user_id, session_id):
+        """Writes the events held for the session in one transaction; returns how many were written."""
+        entry = self._lookup((app_name, user_id, session_id))
+        if entry is None or not entry.pending:
+            return 0
+        return await asyncio.to_thread(self._flush, entry)
+
+    async def flush_all(self):
+        """Writes every held event (at shutdown)."""
+        with self._lock:
+            entries = [entry for entry in self._entries.values() if entry.pending]
+        for entry in entries:
+            try:
+                await asyncio.to_thread(self._flush, entry)
+            except Exception as e:
+                print(f"Session flush failed for session {entry.key[2]}: {e}")
+
+    def _flush(self, entry):
+        with entry.flush_lock:
+            with self._lock:
+                events, entry.pending = entry.pending, []
+            if not events:
+                return 0
+            try:
+                db_version, conflict = self._write_events(entry, events)
+            except Exception:
+                with self._lock:
+                    entry.pending[:0] = events  # retried by the next flush
+                raise
+            with self._lock:
+                entry.db_version = db_version
+                self.stats["flushes"] += 1
+                self.stats["events_written"] += len(events)
+                if conflict:
+                    # Another worker wrote the session too; reload it next time.
+                    self.stats["conflicts"] += 1
+                    if self._entries.get(entry.key) is entry:
+                        del self._entries[entry.key]
+            return len(events)
+
+    def _write_events(self, entry, events):
+        # One transaction for all events; returns (new update_time, whether someone else wrote in between).
+        session = entry.session
+        app_delta, user_delta, session_delta = {}, {}, {}
+        for event in events:
+            if event.actions and event.actions.state_delta:
+                app, user, own = _extract_state_delta(event.actions.state_delta)
+                app_delta.update(app)
+                user_delta.update(user)
+                session_delta.update(own)
+        app_name, user_id, session_id = entry.key
+        with self.database_session_factory() as db:
+            storage_session = db.execute(
+                select(StorageSession).where(
+                    StorageSession.app_name == app_name,
+                    StorageSession.user_id == user_id,
+                    StorageSession.id == session_id,
+                ).with_for_update()
+            ).scalar_one_or_none()
+            if storage_session is None:
+                raise ValueError(f"Session not found: {session.id}")
+            stored_version = storage_session.update_time
+            conflict = stored_version.timestamp() != entry.db_version
+            if conflict:
+                newest = db.execute(
+                    select(func.max(StorageEvent.timestamp)).where(
+                        StorageEvent.app_name == app_name,
+                        StorageEvent.user_id == user_id,
+                        StorageEvent.session_id == session_id,
+                    )
+                ).scalar_one_or_none()
+                events = _after(events, None if newest is None else newest.timestamp())
+            if app_delta:
+                storage_app_state = db.get(StorageAppState, (session.app_name))
+                storage_app_state.state = {**storage_app_state.state, **app_delta}
+            if user_delta:
+                storage_user_state = db.get(StorageUserState, (session.app_name, session.user_id))
+                storage_user_state.state = {**storage_user_state.state, **user_delta}
+            if session_delta:
+                storage_session.state = {**storage_session.state, **session_delta}
+            storage_session.update_time = func.now()
+            db.add_all([StorageEvent.from_event(session, event) for event in events])
+            db.flush()
+            db.refresh(storage_session, ["update_time"])
+            version = storage_session.update_time
+            if version <= stored_version:
+                # now() did not move past the previous version (second resolution on SQLite, or the
+                # transaction started before the lock was granted); the version must still go forward.
+                version = storage_session.update_time = stored_version + timedelta(microseconds=1)
+            db.commit()
+            return version.timestamp(), conflict
+
+    async def compact_session(self, *, app_name, user_id, session_id):
+        # Compaction reads the database, so the turn's events go first. While the cache
+        # knows how many turns are left before compaction is due, the reads are skipped.
+        await self.flush_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        entry = self._lookup((app_name, user_id, session_id))
+        if entry is not None and entry.turns_to_compaction > 0:
+            self._count("compaction_checks_skipped")
+            return False
+        # A compaction appends the summary with a session read from the database, which drops the entry.
+        compacted, turns_left = await self._compact(app_name=app_name, user_id=user_id, session_id=session_id)
+        if entry is not None and not compacted:
+            entry.turns_to_compaction = turns_left
+        return compacted
+
+    def _count(self, event):
+        with self._lock:
+            self.stats[event] += 1
@@ -1,8 +1,5 @@
 from django.apps import AppConfig
 
-from vertexai import agent_engines
-from .views import get_root_agent
-
 REMOTE_AGENT_ENGINE_RESOURCE_NAME = None
 LOCATION = "us-central1"
 PROJECT_NUMBER = "genai-playground24"  # Replace with your actual project number
@@ -24,6 +21,11 @@ def create_agent_engine_remote_app():
     Returns:
         The created remote_app instance.
     """
+    # Imported here: vertexai takes seconds to import and is only needed for this deployment path.
+    from vertexai import agent_engines
+
+    from ..services import get_root_agent
+
     print("Attempting to create/get Agent Engine Remote App...")
     remote_app = agent_engines.create(
         agent_engine=get_root_agent(),
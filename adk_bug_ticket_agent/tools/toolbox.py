@@ -0,0 +1,492 @@
+"""Async client for the MCP Toolbox for Databases.
+
+All toolbox traffic goes through one aiohttp session per worker process, so
+connections are kept alive and reused across agent turns, the number of
+requests in flight is capped, and every call has a timeout.
+
+The session lives on a private event loop thread. Django runs async views on
+the ASGI server's loop, but under WSGI every request gets a fresh loop from
+async_to_sync, and an aiohttp session cannot be shared across loops. Callers
+on any loop await the owner loop's futures, so a tool call never blocks them.
+
+ADK runs the tool calls of one model response one after another.
+ParallelReadCalls starts the read-only ticket calls of a response together
+as soon as the response arrives, and hands each result to ADK when it gets to
+that call. Write tools are serialized per ticket on the owner loop.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+
+import aiohttp
+from google.adk.tools import FunctionTool
+from google.adk.tools.base_toolset import BaseToolset
+from toolbox_core import ToolboxClient
+
+from ..cache import TTLCache
+
+TOOLBOX_URL = os.getenv("MCP_TOOLBOX_URL", "http://127.0.0.1:5000")
+TOOLBOX_TOOLSET = os.getenv("MCP_TOOLBOX_TOOLSET", "tickets_toolset")
+# search-tickets parameters bound by the agent instead of the model.
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", 3))
+SEARCH_MAX_DISTANCE = float(os.getenv("SEARCH_MAX_DISTANCE", 0.3))
+# Tickets per page of the get-tickets-by-* list tools, bound by the agent like top_k.
+TICKET_PAGE_SIZE = int(os.getenv("TICKET_PAGE_SIZE", 25))
+# Keep-alive connection pool shared by every tool call of the worker.
+TOOLBOX_MAX_CONNECTIONS = int(os.getenv("TOOLBOX_MAX_CONNECTIONS", 20))
+TOOLBOX_KEEPALIVE_SECONDS = float(os.getenv("TOOLBOX_KEEPALIVE_SECONDS", 60))
+# Tool calls allowed in flight at once; further calls wait for a slot.
+TOOLBOX_MAX_CONCURRENCY = int(os.getenv("TOOLBOX_MAX_CONCURRENCY", 20))
+TOOLBOX_CALL_TIMEOUT = float(os.getenv("TOOLBOX_CALL_TIMEOUT", 15))
+TOOLBOX_LOAD_TIMEOUT = float(os.getenv("TOOLBOX_LOAD_TIMEOUT", 5))
+# Toolset definitions are re-fetched in the background once they are this old.
+TOOLBOX_REFRESH_SECONDS = float(os.getenv("TOOLBOX_REFRESH_SECONDS", 300))
+# After a failed load, requests go without ticket tools for this long before retrying.
+TOOLBOX_RETRY_SECONDS = float(os.getenv("TOOLBOX_RETRY_SECONDS", 10))
+# Read-through cache for read-only ticket tools. A TTL of 0 disables it.
+TOOL_CACHE_TTL_SECONDS = float(os.getenv("TOOL_CACHE_TTL_SECONDS", 30))
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 256))
+# Read-only ticket calls of one model response run concurrently, at most this many at once. 1 disables it.
+TOOL_PARALLELISM = int(os.getenv("TOOL_PARALLELISM", 4))
+
+# "outcome" of the error a write tool returns when the toolbox did not answer: it may have been applied.
+WRITE_OUTCOME_UNKNOWN = "unknown"
+
+
+def is_write_tool(name):
+    """True for the toolbox tools in tools.yaml that modify tickets."""
+    return name.startswith("update-ticket-") or name == "create-new-ticket"
+
+
+def is_read_tool(name):
+    """True for the toolbox tools in tools.yaml that only read tickets."""
+    return name.startswith("get-ticket") or name == "search-tickets"
+
+
+def encode_ticket_page(result, page_size=TICKET_PAGE_SIZE):
+    """Re-encodes a page of a get-tickets-by-* tool as compact columns and rows for the model.
+
+    The list tools return JSON rows carrying a total_count column, one row
+    past the page (telling whether another page follows) and a row of NULL
+    ticket columns for an empty page. They become one JSON object:
+    ``{"total_count", "returned", "next_after_ticket_id", "columns", "rows"}``
+    with each ticket as a list of values, so the column names are sent once
+    instead of once per ticket. Other results are returned unchanged.
+    """
+    if not isinstance(result, str) or '"total_count"' not in result:
+        return result  # not a page; skip parsing it
+    try:
+        rows = json.loads(result)
+    except ValueError:
+        return result
+    if not (isinstance(rows, list) and rows and isinstance(rows[0], dict) and "total_count" in rows[0]):
+        return result
+    tickets = [row for row in rows if row.get("ticket_id") is not None]
+    columns = [name for name in rows[0] if name != "total_count"]
+    page, more = tickets[:page_size], len(tickets) > page_size
+    return json.dumps({
+        "total_count": rows[0]["total_count"],
+        "returned": len(page),
+        "next_after_ticket_id": page[-1]["ticket_id"] if more else None,
+        "columns": columns,
+        "rows": [[ticket[name] for name in columns] for ticket in page],
+    }, separators=(",", ":"), default=str)
+
+
+def decode_ticket_page(result):
+    """(tickets as dicts, total_count, next_after_ticket_id) of an encoded page, or None for other results."""
+    try:
+        page = json.loads(result)
+    except (TypeError, ValueError):
+        return None
+    if not (isinstance(page, dict) and "columns" in page and "rows" in page):
+        return None
+    tickets = [dict(zip(page["columns"], row)) for row in page["rows"]]
+    return tickets, page.get("total_count"), page.get("next_after_ticket_id")
+
+
+class ToolResultCache:
+    """Read-through cache of read-only tool results, keyed by tool name and arguments.
+
+    Cleared whenever a write tool runs in this worker; writes made by other
+    workers are only seen once entries expire after TOOL_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, maxsize=TOOL_CACHE_MAX_ENTRIES, ttl=TOOL_CACHE_TTL_SECONDS):
+        self.enabled = ttl > 0
+        self._entries = TTLCache(maxsize, ttl)
+        # Bumped on every invalidation; results read across a write are not stored.
+        self.generation = 0
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self.tool_stats = {}
+
+    @staticmethod
+    def key(name, args, kwargs):
+        return name, json.dumps([args, kwargs], sort_keys=True, default=str)
+
+    def _count(self, name, outcome):
+        self.stats[outcome] += 1
+        per_tool = self.tool_stats.setdefault(name, {"hits": 0, "misses": 0})
+        per_tool[outcome] += 1
+
+    async def get_or_call(self, name, args, kwargs, call):
+        if not self.enabled or not is_read_tool(name):
+            return await call()
+        key = self.key(name, args, kwargs)
+        result = self._entries.get(key)
+        if result is not None:
+            self._count(name, "hits")
+            return result
+        self._count(name, "misses")
+        generation = self.generation
+        result = await call()
+        # Error results are dicts; only the JSON strings returned by the toolbox are cached.
+        if isinstance(result, str) and generation == self.generation:
+            self._entries.set(key, result)
+        return result
+
+    def invalidate(self):
+        self.generation += 1
+        self._entries.clear()
+        self.stats["invalidations"] += 1
+
+    def snapshot(self):
+        """Counters, hit rate and per-tool hits/misses, for logs and metrics."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return dict(
+            self.stats,
+            entries=len(self._entries),
+            hit_rate=self.stats["hits"] / lookups if lookups else 0.0,
+            tools={name: dict(counts) for name, counts in self.tool_stats.items()},
+        )
+
+
+class ToolboxPool:
+    """Owns the aiohttp session, the concurrency limit and the loop they live on."""
+
+    def __init__(self, url=TOOLBOX_URL):
+        self.url = url
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        # key -> [asyncio.Lock, holders and waiters]; only touched on the owner loop.
+        self._key_locks = {}
+
+    def _ensure_started(self):
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="toolbox-loop", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    async def _open(self):
+        # Runs on the owner loop: aiohttp objects bind to the loop that creates them.
+        if self._client is None:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=TOOLBOX_MAX_CONNECTIONS,
+                    keepalive_timeout=TOOLBOX_KEEPALIVE_SECONDS,
+                ),
+                timeout=aiohttp.ClientTimeout(total=TOOLBOX_CALL_TIMEOUT),
+            )
+            self._client = ToolboxClient(self.url, session=session)
+            self._semaphore = asyncio.Semaphore(TOOLBOX_MAX_CONCURRENCY)
+        return self._client
+
+    @contextlib.asynccontextmanager
+    async def _serialized(self, key):
+        if key is None:
+            yield
+            return
+        entry = self._key_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._key_locks[key]
+
+    async def run(self, coro_fn, timeout, serialize_on=None):
+        """Runs ``await coro_fn(client)`` on the owner loop and awaits it from the caller's loop.
+
+        Calls sharing a ``serialize_on`` key run one at a time, in arrival order.
+        """
+        loop = self._ensure_started()
+
+        async def on_owner_loop():
+            client = await self._open()
+            async with self._serialized(serialize_on):
+                async with self._semaphore:
+                    return await asyncio.wait_for(coro_fn(client), timeout)
+
+        future = asyncio.run_coroutine_threadsafe(on_owner_loop(), loop)
+        return await asyncio.wrap_future(future)
+
+    async def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        async def close_client():
+            if self._client is not None:
+                await self._client.close()
+            self._client = None
+
+        try:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(close_client(), loop))
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+class PooledToolboxTool:
+    """Async callable for one toolbox tool that invokes it through the pool.
+
+    Carries the remote tool's name, docstring and signature so ADK builds the
+    same function declaration as for the toolbox_core tool itself. Read tools
+    go through the result cache; write tools clear it once they have run.
+    """
+
+    def __init__(self, pool, tool, result_cache):
+        self._pool = pool
+        self._tool = tool
+        self._result_cache = result_cache
+        self.__name__ = tool.__name__
+        self.__doc__ = tool.__doc__
+        self.__signature__ = tool.__signature__
+
+    async def _invoke(self, args, kwargs, serialize_on=None):
+        try:
+            result = await self._pool.run(
+                lambda client: self._tool(*args, **kwargs), TOOLBOX_CALL_TIMEOUT, serialize_on=serialize_on
+            )
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            print(f"Toolbox call {self.__name__} failed: {e!r}")
+            if is_write_tool(self.__name__) and not isinstance(e, aiohttp.ClientConnectorError):
+                # The request was sent: the write may have been committed even though no answer came back.
+                return {
+                    "error": f"The ticket database did not answer in time ({type(e).__name__}). The change may "
+                             "have been applied: check the ticket with get-ticket-by-id (or search-tickets for a "
+                             "new ticket) before trying again.",
+                    "outcome": WRITE_OUTCOME_UNKNOWN,
+                }
+            return {"error": f"The ticket database did not answer in time ({type(e).__name__}). Try again later."}
+        return encode_ticket_page(result) if is_read_tool(self.__name__) else result
+
+    async def __call__(self, *args, **kwargs):
+        if is_write_tool(self.__name__):
+            # Concurrent turns updating the same ticket apply their writes one at a time.
+            ticket_id = kwargs.get("ticket_id")
+            try:
+                return await self._invoke(args, kwargs, serialize_on=None if ticket_id is None else f"ticket:{ticket_id}")
+            finally:
+                self._result_cache.invalidate()
+        return await self._result_cache.get_or_call(
+            self.__name__, args, kwargs, lambda: self._invoke(args, kwargs)
+        )
+
+
+class ToolboxToolset(BaseToolset):
+    """Ticket tools from the toolbox, loaded on first use and cached.
+
+    ADK calls get_tools() before every model call. The first call fetches the
+    toolset definition; afterwards the cached tools are returned immediately
+    and a stale definition is re-fetched in the background. When the toolbox
+    is unreachable the agent runs without ticket tools and the load is retried
+    after TOOLBOX_RETRY_SECONDS, so a dead toolbox never breaks startup.
+    """
+
+    def __init__(self, toolset_name=TOOLBOX_TOOLSET, pool=None, bound_params=None):
+        super().__init__()
+        self.toolset_name = toolset_name
+        self.pool = pool or ToolboxPool()
+        self.bound_params = bound_params or {}
+        self.result_cache = ToolResultCache()
+        self._tools = None
+        self._loaded_at = 0.0
+        self._failed_at = None
+        self._loading = None
+        self._loading_lock = threading.Lock()
+
+    async def _load(self):
+        tools = await self.pool.run(
+            lambda client: client.load_toolset(self.toolset_name, bound_params=self.bound_params),
+            TOOLBOX_LOAD_TIMEOUT,
+        )
+        return [FunctionTool(PooledToolboxTool(self.pool, tool, self.result_cache)) for tool in tools]
+
+    async def _refresh(self):
+        try:
+            self._tools = await self._load()
+            self._loaded_at = time.monotonic()
+            self._failed_at = None
+            print(f"Loaded {len(self._tools)} tools from toolset {self.toolset_name} at {self.pool.url}")
+        except Exception as e:
+            self._failed_at = time.monotonic()
+            print(f"Could not load toolset {self.toolset_name} from {self.pool.url}: {e!r}")
+
+    def prefetch(self):
+        """Starts loading the toolset in the background without waiting for it."""
+        self._start_refresh()
+
+    def wait_until_loaded(self, timeout=TOOLBOX_LOAD_TIMEOUT + 1):
+        """Blocks until the toolset is loaded or a load attempt fails; True when it is loaded.
+
+        For warmup threads only: it must not be called on an event loop.
+        """
+        if self._tools is None:
+            try:
+                self._start_refresh().result(timeout)
+            except Exception:
+                pass  # reported by _refresh(); the result is judged below
+        return self._tools is not None
+
+    def _start_refresh(self):
+        # The pool marshals the load onto its own loop, so this shared future is awaitable from any loop.
+        loop = self.pool._ensure_started()
+        with self._loading_lock:
+            if self._loading is None or self._loading.done():
+                self._loading = asyncio.run_coroutine_threadsafe(self._refresh(), loop)
+            return self._loading
+
+    async def get_tools(self, readonly_context=None):
+        now = time.monotonic()
+        if self._tools is None:
+            if self._failed_at is not None and now - self._failed_at < TOOLBOX_RETRY_SECONDS:
+                return []
+            await asyncio.wrap_future(self._start_refresh())
+        elif now - self._loaded_at > TOOLBOX_REFRESH_SECONDS:
+            self._start_refresh()
+        return [tool for tool in self._tools or [] if self._is_tool_selected(tool, readonly_context)]
+
+    async def close(self):
+        # Shared by every runner; Runner.close() may call this several times.
+        # The cached tools hold the pool's session, so they are reloaded after a close.
+        self._tools = None
+        await self.pool.close()
+
+
+class ParallelReadCalls:
+    """Runs the read-only ticket calls of one model response concurrently.
+
+    after_model() starts every read-only toolbox call of a response with two
+    or more of them, at most ``max_parallel`` at once. ADK then runs the calls
+    one by one as usual, and before_tool() answers each with its started call
+    instead of calling the tool again, so a turn waits for the slowest lookup
+    rather than the sum of them. Write tools are never started early, and
+    neither are reads that come after a write in the same response: they must
+    see what the write changed. When a write runs, the calls still started for
+    its invocation are dropped.
+
+    One instance serves every thread of the worker, each running its own event
+    loop: the started calls are kept under a lock and a task is always
+    cancelled on its own loop.
+    """
+
+    # Started calls that ADK never asked for (the turn failed) are dropped after this long.
+    MAX_AGE_SECONDS = 300
+
+    def __init__(self, toolset, max_parallel=TOOL_PARALLELISM):
+        self.toolset = toolset
+        self.max_parallel = max_parallel
+        self._started = {}  # (invocation id, tool name, args) -> [(started at, task)]
+        self._lock = threading.Lock()
+        self.stats = {"batches": 0, "calls": 0}
+
+    @staticmethod
+    def _key(invocation_id, name, args):
+        return invocation_id, name, json.dumps(args or {}, sort_keys=True, default=str)
+
+    @staticmethod
+    def _cancel(task):
+        try:
+            task.get_loop().call_soon_threadsafe(task.cancel)
+        except RuntimeError:
+            pass  # its loop is closed; the task is gone with it
+
+    def _prune(self, now):
+        stale = []
+        with self._lock:
+            for key, calls in list(self._started.items()):
+                fresh = [(started, task) for started, task in calls if now - started < self.MAX_AGE_SECONDS]
+                stale += [task for started, task in calls if now - started >= self.MAX_AGE_SECONDS]
+                if fresh:
+                    self._started[key] = fresh
+                else:
+                    del self._started[key]
+        for task in stale:
+            self._cancel(task)
+
+    def _drop(self, invocation_id):
+        # Results started before a write may predate it; later calls must go to the toolbox.
+        with self._lock:
+            dropped = [self._started.pop(key) for key in [key for key in self._started if key[0] == invocation_id]]
+        for calls in dropped:
+            for _, task in calls:
+                self._cancel(task)
+
+    def after_model(self, callback_context, llm_response):
+        """after_model_callback: starts the read-only calls of the response."""
+        if self.max_parallel < 2 or llm_response.partial or not llm_response.content:
+            return None
+        calls = []
+        for part in llm_response.content.parts or []:
+            if not part.function_call:
+                continue
+            if is_write_tool(part.function_call.name):
+                break  # ADK runs the calls in order; later reads must wait for the write.
+            if is_read_tool(part.function_call.name):
+                calls.append(part.function_call)
+        tools = {tool.name: tool for tool in self.toolset._tools or []}
+        calls = [call for call in calls if call.name in tools]
+        if len(calls) < 2:
+            return None
+        now = time.monotonic()
+        self._prune(now)
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def run(tool, args):
+            async with semaphore:
+                # Goes through FunctionTool like ADK's own call (argument checks included); no tool_context is needed.
+                return await tool.run_async(args=args, tool_context=None)
+
+        loop = asyncio.get_running_loop()
+        started = [(self._key(callback_context.invocation_id, call.name, call.args),
+                    loop.create_task(run(tools[call.name], call.args or {}))) for call in calls]
+        with self._lock:
+            for key, task in started:
+                self._started.setdefault(key, []).append((now, task))
+            self.stats["batches"] += 1
+            self.stats["calls"] += len(calls)
+        return None
+
+    async def before_tool(self, tool, args, tool_context):
+        """before_tool_callback: returns the result of the call started by after_model(), if any."""
+        if is_write_tool(tool.name):
+            self._drop(tool_context.invocation_id)
+            return None
+        key = self._key(tool_context.invocation_id, tool.name, args)
+        with self._lock:
+            calls = self._started.get(key)
+            if not calls:
+                return None
+            _, task = calls.pop(0)
+            if not calls:
+                del self._started[key]
+        try:
+            result = await task
+        except Exception as e:
+            # Let ADK call the tool itself, which reports the error the usual way.
+            print(f"Parallel call of {tool.name} failed, calling it again: {e!r}")
+            return None
+        # ADK treats an empty response as "not handled"; FunctionTool results are wrapped the same way later.
+        return result if isinstance(result, dict) and result else {"result": result}
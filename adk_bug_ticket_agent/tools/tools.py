@@ -1,15 +1,14 @@
 from datetime import datetime
-import os
 
 from google.adk.agents import Agent
 from google.adk.tools import google_search
-from google.adk.tools.agent_tool import AgentTool
-from toolbox_core import ToolboxSyncClient
 
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+# .env is loaded by web_ui/settings.py, before MCP_TOOLBOX_URL and the TOOLBOX_* settings are read here.
+from .toolbox import (
+    SEARCH_MAX_DISTANCE, SEARCH_TOP_K, TICKET_PAGE_SIZE, TOOLBOX_TOOLSET, ParallelReadCalls, ToolboxToolset,
+)
+from .web_search import build_search_tool
+from .. import metrics
 
 
 # ----- Example of a Function tool -----
@@ -28,15 +27,20 @@ search_agent = Agent(
     You're a specialist in Google Search.
     """,
     tools=[google_search],
+    before_model_callback=metrics.before_model,
+    after_model_callback=metrics.after_model,
 )
 
-search_tool = AgentTool(search_agent)
+# Cached and time-budgeted; WEB_SEARCH_MODE=snippets swaps the sub-agent for raw search results. See web_search.py.
+search_tool = build_search_tool(search_agent)
 
 
 # ----- Example of Google Cloud Tools (MCP Toolbox for Databases) -----
-TOOLBOX_URL = os.getenv("MCP_TOOLBOX_URL", "http://127.0.0.1:5000")
+# Loaded lazily on the first agent turn through a pooled async client; see toolbox.py.
+toolbox_toolset = ToolboxToolset(
+    TOOLBOX_TOOLSET,
+    bound_params={"top_k": SEARCH_TOP_K, "max_distance": SEARCH_MAX_DISTANCE, "page_size": TICKET_PAGE_SIZE},
+)
 
-# Initialize Toolbox client
-toolbox = ToolboxSyncClient(TOOLBOX_URL)
-# Load all the tools from toolset
-toolbox_tools = toolbox.load_toolset("tickets_toolset")
+# Read-only ticket lookups requested together by the model run concurrently.
+parallel_reads = ParallelReadCalls(toolbox_toolset)
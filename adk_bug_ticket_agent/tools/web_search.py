@@ -0,0 +1,204 @@
+"""Web search for the agent, cached and bounded by a per-turn time budget.
+
+By default (WEB_SEARCH_MODE=agent) web lookups go to search_agent, a Gemini
+sub-agent with the google_search built-in, as before. With
+WEB_SEARCH_MODE=snippets the agent gets a ``web_search`` function tool
+instead, which returns the raw title/link/snippet results of a search
+backend without a nested model conversation: the Google Custom Search JSON
+API (WEB_SEARCH_BACKEND=google, needs GOOGLE_SEARCH_API_KEY and
+GOOGLE_SEARCH_ENGINE_ID) or a local stub with synthetic results
+(WEB_SEARCH_BACKEND=stub, for tests and benchmarks).
+
+In both modes results are cached per worker by normalized query for
+WEB_SEARCH_CACHE_TTL_SECONDS, so the same CVE or known-issue lookup made by
+different users is searched once. The searches of one agent turn share
+WEB_SEARCH_BUDGET_SECONDS; a search still running when the budget is spent
+is cancelled and the model gets an error telling it to answer without it.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+
+import aiohttp
+from google.adk.tools import FunctionTool, ToolContext
+from google.adk.tools.agent_tool import AgentTool
+
+from ..cache import TTLCache
+
+# "agent" (search_agent sub-agent with google_search) or "snippets" (raw results from WEB_SEARCH_BACKEND).
+WEB_SEARCH_MODE = os.getenv("WEB_SEARCH_MODE", "agent").lower()
+# "google" (Custom Search JSON API) or "stub" (synthetic results, no network).
+WEB_SEARCH_BACKEND = os.getenv("WEB_SEARCH_BACKEND", "google").lower()
+GOOGLE_SEARCH_API_KEY = os.getenv("GOOGLE_SEARCH_API_KEY")
+GOOGLE_SEARCH_ENGINE_ID = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
+WEB_SEARCH_MAX_RESULTS = int(os.getenv("WEB_SEARCH_MAX_RESULTS", 5))
+WEB_SEARCH_STUB_LATENCY_MS = float(os.getenv("WEB_SEARCH_STUB_LATENCY_MS", 0))
+# Cached results per worker. A TTL of 0 disables the cache.
+WEB_SEARCH_CACHE_TTL_SECONDS = float(os.getenv("WEB_SEARCH_CACHE_TTL_SECONDS", 3600))
+WEB_SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("WEB_SEARCH_CACHE_MAX_ENTRIES", 256))
+# Total time the web searches of one agent turn may take.
+WEB_SEARCH_BUDGET_SECONDS = float(os.getenv("WEB_SEARCH_BUDGET_SECONDS", 20))
+
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
+
+def normalize_search_query(text):
+    """Lowercased words, punctuation dropped except inside terms like CVE-2024-3094 or v1.2."""
+    words = (word.strip(".-") for word in re.sub(r"[^\w\s.-]", " ", str(text).lower()).split())
+    return " ".join(word for word in words if word)
+
+
+class StubSearchBackend:
+    """Synthetic search results, optionally after ``latency`` seconds; ``results`` maps a normalized query to fixed results."""
+
+    def __init__(self, latency=WEB_SEARCH_STUB_LATENCY_MS / 1000, results=None):
+        self.latency = latency
+        self.results = results or {}
+        self.calls = 0
+
+    async def search(self, query, max_results=WEB_SEARCH_MAX_RESULTS):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        normalized = normalize_search_query(query)
+        if normalized in self.results:
+            return self.results[normalized][:max_results]
+        slug = "-".join(normalized.split())[:60]
+        return [
+            {
+                "title": f"Result {i} for {query}",
+                "link": f"https://example.com/{slug}/{i}",
+                "snippet": f"Synthetic search result {i} about {query}.",
+            }
+            for i in range(1, max_results + 1)
+        ]
+
+
+class GoogleSearchBackend:
+    """Google Custom Search JSON API (https://developers.google.com/custom-search/v1/overview)."""
+
+    def __init__(self, api_key=GOOGLE_SEARCH_API_KEY, engine_id=GOOGLE_SEARCH_ENGINE_ID):
+        self.api_key = api_key
+        self.engine_id = engine_id
+
+    async def search(self, query, max_results=WEB_SEARCH_MAX_RESULTS):
+        if not self.api_key or not self.engine_id:
+            raise RuntimeError("GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_ENGINE_ID must be set for web search")
+        params = {"key": self.api_key, "cx": self.engine_id, "q": query, "num": min(max_results, 10)}
+        # Searches are rare next to ticket calls; a session per search keeps this loop-agnostic.
+        async with aiohttp.ClientSession() as session:
+            async with session.get(GOOGLE_SEARCH_URL, params=params) as response:
+                response.raise_for_status()
+                data = await response.json()
+        return [
+            {"title": item.get("title"), "link": item.get("link"), "snippet": item.get("snippet")}
+            for item in data.get("items", [])[:max_results]
+        ]
+
+
+def get_search_backend(name=WEB_SEARCH_BACKEND):
+    return StubSearchBackend() if name == "stub" else GoogleSearchBackend()
+
+
+class WebSearchCache:
+    """Cached, time-budgeted web lookups shared by both search modes."""
+
+    # Budgets of turns that have not searched for this long are forgotten.
+    MAX_TURN_AGE_SECONDS = 600
+
+    def __init__(self, ttl=WEB_SEARCH_CACHE_TTL_SECONDS, max_entries=WEB_SEARCH_CACHE_MAX_ENTRIES,
+                 budget=WEB_SEARCH_BUDGET_SECONDS):
+        self.enabled = ttl > 0
+        self.budget = budget
+        self._entries = TTLCache(max_entries, ttl)
+        self._deadlines = {}  # invocation id -> (deadline, started at)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "timeouts": 0, "budget_exhausted": 0, "errors": 0}
+
+    def _count(self, event):
+        with self._lock:
+            self.stats[event] += 1
+
+    def _remaining(self, invocation_id):
+        now = time.monotonic()
+        with self._lock:
+            for key, (_, started) in list(self._deadlines.items()):
+                if now - started > self.MAX_TURN_AGE_SECONDS:
+                    del self._deadlines[key]
+            deadline, _ = self._deadlines.setdefault(invocation_id, (now + self.budget, now))
+        return deadline - now
+
+    async def lookup(self, query, invocation_id, search):
+        """Returns the cached result for ``query`` or ``await search()`` within what is left of the turn's budget."""
+        key = normalize_search_query(query)
+        if self.enabled:
+            result = self._entries.get(key)
+            if result is not None:
+                self._count("hits")
+                return result
+        self._count("misses")
+        remaining = self._remaining(invocation_id)
+        if remaining <= 0:
+            self._count("budget_exhausted")
+            return {"error": "The web search time budget of this turn is used up. Answer with what you already have."}
+        try:
+            # wait_for cancels the search when the budget runs out.
+            result = await asyncio.wait_for(search(), remaining)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            print(f"Web search for {key!r} cancelled after the turn's {self.budget:.0f} s budget")
+            return {"error": "The web search did not finish in time. Answer with what you already have."}
+        except Exception as e:
+            self._count("errors")
+            print(f"Web search for {key!r} failed: {e!r}")
+            return {"error": f"The web search failed ({type(e).__name__})."}
+        if self.enabled and result and not (isinstance(result, dict) and "error" in result):
+            self._entries.set(key, result)
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        return dict(stats, entries=len(self._entries), hit_rate=stats["hits"] / lookups if lookups else 0.0)
+
+
+web_search_cache = WebSearchCache()
+_search_backend = get_search_backend()
+
+
+class CachedAgentTool(AgentTool):
+    """AgentTool whose answers go through web_search_cache and the per-turn budget."""
+
+    def __init__(self, agent, cache=web_search_cache, **kwargs):
+        super().__init__(agent, **kwargs)
+        self._cache = cache
+
+    async def run_async(self, *, args, tool_context):
+        return await self._cache.lookup(
+            args.get("request", ""), tool_context.invocation_id,
+            lambda: super(CachedAgentTool, self).run_async(args=args, tool_context=tool_context),
+        )
+
+
+async def web_search(query: str, tool_context: ToolContext) -> dict:
+    """
+    Search the web and return the top results (title, link and snippet).
+    Use it for information the ticket database does not have, such as known
+    issues in the software community (CVEs, widespread outages).
+    """
+    results = await web_search_cache.lookup(
+        query, tool_context.invocation_id, lambda: _search_backend.search(query)
+    )
+    return results if isinstance(results, dict) else {"results": results}
+
+
+def build_search_tool(search_agent, mode=WEB_SEARCH_MODE):
+    """The agent's web search tool for WEB_SEARCH_MODE."""
+    if mode == "snippets":
+        print(f"Web search returns raw results from the {WEB_SEARCH_BACKEND} backend.")
+        return FunctionTool(web_search)
+    return CachedAgentTool(search_agent)
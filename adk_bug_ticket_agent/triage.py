@@ -0,0 +1,384 @@
+"""Batch triage of bug reports from a JSONL file.
+
+Each line is one report: ``{"title": ..., "description": ..., "assignee":
+..., "priority": ..., "status": ...}`` (only title and description are
+required; an ``id`` is copied to the results). For every report the pipeline
+searches for a duplicate with ``search-tickets``. A match within
+TRIAGE_DUPLICATE_DISTANCE is updated when the report raises its priority or
+the ticket was closed (it is reopened); otherwise a ticket is created with
+``create-new-ticket``. Calls go through the worker's pooled toolbox client,
+the same tools the agent uses.
+
+TRIAGE_WORKERS reports are triaged at a time. Every toolbox call takes a
+token from a TRIAGE_QUERIES_PER_SECOND bucket (the Cloud SQL quota) and every
+duplicate search also one from TRIAGE_SEARCHES_PER_SECOND: search-tickets
+embeds the report with the Vertex AI embedding model, the only model call of
+the pipeline. Failed calls are retried TRIAGE_MAX_ATTEMPTS times, except a
+create-new-ticket that timed out: it may have been committed, so the report
+is recorded with outcome "unknown" instead of filing the ticket again.
+
+Results are appended to a JSONL file, one line per report, as soon as the
+report is done; the file is the checkpoint. A rerun with the same results
+file skips the reports already triaged (or "unknown": check those by hand
+and delete their lines to triage them again) and retries the failed ones. Reports
+in flight when a run is killed are triaged again; those that were created
+are found by the duplicate search once their embedding has been written.
+
+Run it with ``python manage.py triage_reports reports.jsonl``, or POST the
+file to ``agent/triage/`` to run it as a background job.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from .tools.toolbox import WRITE_OUTCOME_UNKNOWN
+
+TRIAGE_WORKERS = int(os.environ.get("TRIAGE_WORKERS", 8))
+# Toolbox calls per second (Cloud SQL), and duplicate searches per second (query embeddings). 0 = unlimited.
+TRIAGE_QUERIES_PER_SECOND = float(os.environ.get("TRIAGE_QUERIES_PER_SECOND", 20))
+TRIAGE_SEARCHES_PER_SECOND = float(os.environ.get("TRIAGE_SEARCHES_PER_SECOND", 5))
+# Tighter than SEARCH_MAX_DISTANCE: a report this close to a ticket is the same bug.
+TRIAGE_DUPLICATE_DISTANCE = float(os.environ.get("TRIAGE_DUPLICATE_DISTANCE", 0.15))
+TRIAGE_MAX_ATTEMPTS = int(os.environ.get("TRIAGE_MAX_ATTEMPTS", 3))
+TRIAGE_RETRY_SECONDS = float(os.environ.get("TRIAGE_RETRY_SECONDS", 2))
+# Uploaded files, results and job status of the triage jobs; shared by the workers of one host.
+TRIAGE_DIR = os.environ.get("TRIAGE_DIR", os.path.join(tempfile.gettempdir(), "adk_triage"))
+TRIAGE_MAX_JOBS = int(os.environ.get("TRIAGE_MAX_JOBS", 1))
+
+PRIORITIES = {"p0": "P0 - Critical", "p1": "P1 - High", "p2": "P2 - Medium", "p3": "P3 - Low"}
+CLOSED_STATUSES = ("closed", "resolved")
+# "unknown" is not retried by a rerun either: the ticket may exist already.
+DONE_OUTCOMES = ("created", "duplicate", "updated", WRITE_OUTCOME_UNKNOWN)
+
+
+class InvalidReport(ValueError):
+    """A report line that is not a JSON object with a title and a description."""
+
+
+class TriageCallError(RuntimeError):
+    """A toolbox call still failed after TRIAGE_MAX_ATTEMPTS attempts."""
+
+
+class TriageOutcomeUnknown(TriageCallError):
+    """create-new-ticket timed out: the ticket may or may not have been created."""
+
+
+class RateLimiter:
+    """Token bucket shared by the workers of one run; a rate of 0 or less never waits."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                # Holding the lock keeps the waiters in order.
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._updated = time.monotonic()
+                self._tokens = 1
+            self._tokens -= 1
+
+
+def parse_report(line):
+    """The report of one JSONL line with its priority and status normalized; raises InvalidReport."""
+    try:
+        report = json.loads(line)
+    except ValueError as e:
+        raise InvalidReport(f"not JSON: {e}")
+    if not isinstance(report, dict):
+        raise InvalidReport("not a JSON object")
+    title, description = str(report.get("title") or "").strip(), str(report.get("description") or "").strip()
+    if not title or not description:
+        raise InvalidReport("a report needs a title and a description")
+    priority = str(report.get("priority") or "P3").strip()
+    code = priority.lower().split(" - ")[0]
+    if code not in PRIORITIES:
+        raise InvalidReport(f"unknown priority {priority!r}")
+    return {
+        "id": report.get("id"),
+        "title": title,
+        "description": description,
+        "assignee": str(report.get("assignee") or "").strip(),
+        "priority": PRIORITIES[code],
+        "status": str(report.get("status") or "Open").strip(),
+    }
+
+
+def completed_lines(results_path):
+    """Line numbers of the input already triaged according to an earlier results file."""
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path) as results:
+        for line in results:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue  # a line cut short when the run was killed
+            if result.get("outcome") in DONE_OUTCOMES:
+                done.add(result["line"])
+    return done
+
+
+def _rows(result):
+    rows = json.loads(result) if isinstance(result, str) else result
+    if rows is None:
+        return []
+    return rows if isinstance(rows, list) else [rows]
+
+
+class TriagePipeline:
+    """Triages the reports of a JSONL file (see the module docstring)."""
+
+    def __init__(self, toolset, workers=TRIAGE_WORKERS, queries_per_second=TRIAGE_QUERIES_PER_SECOND,
+                 searches_per_second=TRIAGE_SEARCHES_PER_SECOND, duplicate_distance=TRIAGE_DUPLICATE_DISTANCE,
+                 max_attempts=TRIAGE_MAX_ATTEMPTS, retry_seconds=TRIAGE_RETRY_SECONDS):
+        self.toolset = toolset
+        self.workers = workers
+        self.queries_per_second = queries_per_second
+        self.searches_per_second = searches_per_second
+        self.duplicate_distance = duplicate_distance
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.stats = {"items": 0, "created": 0, "duplicate": 0, "updated": 0, "failed": 0, WRITE_OUTCOME_UNKNOWN: 0,
+                      "skipped": 0, "tool_calls": 0, "retries": 0, "seconds": 0.0, "items_per_second": 0.0}
+        self.errors = {}
+        # Normalized title -> future of the ticket the first report with it ended up on. New
+        # tickets are not found by search-tickets until their embedding is written, so
+        # repeats within one run are matched by title.
+        self._titles = {}
+
+    async def _call(self, tools, name, args, limiters):
+        for attempt in range(1, self.max_attempts + 1):
+            for limiter in limiters:
+                await limiter.acquire()
+            self.stats["tool_calls"] += 1
+            try:
+                result = await tools[name].run_async(args=args, tool_context=None)
+            except Exception as e:
+                result = {"error": repr(e)}
+            # Toolbox failures come back as {"error": ...}; results are JSON strings.
+            if not isinstance(result, dict):
+                return result
+            if name == "create-new-ticket" and result.get("outcome") == WRITE_OUTCOME_UNKNOWN:
+                # Sending it again could file the ticket twice.
+                raise TriageOutcomeUnknown(f"{name}: {result['error']}")
+            if attempt < self.max_attempts:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry_seconds * 2 ** (attempt - 1))
+        raise TriageCallError(f"{name}: {result.get('error', result)}")
+
+    async def triage(self, tools, report, limiters):
+        """Triages one parsed report; returns the result fields (outcome, ticket_id, ...)."""
+        key = " ".join(report["title"].lower().split())
+        first = self._titles.get(key)
+        if first is not None:
+            ticket_id = await asyncio.shield(first)
+            if ticket_id == WRITE_OUTCOME_UNKNOWN:
+                raise TriageOutcomeUnknown("same title as an earlier report whose create-new-ticket timed out")
+            if ticket_id is not None:
+                return {"outcome": "duplicate", "ticket_id": ticket_id, "actions": ["same title earlier in this run"]}
+        else:
+            first = self._titles[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._triage(tools, report, limiters)
+        except TriageOutcomeUnknown:
+            first.set_result(WRITE_OUTCOME_UNKNOWN)
+            raise
+        except BaseException:
+            if not first.done():
+                first.set_result(None)
+            raise
+        if not first.done():
+            first.set_result(result.get("ticket_id"))
+        return result
+
+    async def _triage(self, tools, report, limiters):
+        query_limit, search_limit = limiters
+        found = _rows(await self._call(tools, "search-tickets", {
+            "query": f"{report['title']}\n\n{report['description']}", "status": "any",
+        }, [query_limit, search_limit]))
+        nearest = min(found, key=lambda row: row.get("distance", 1.0), default=None)
+        if nearest is None or nearest.get("distance", 1.0) > self.duplicate_distance:
+            created = _rows(await self._call(tools, "create-new-ticket", {
+                "title": report["title"], "description": report["description"], "assignee": report["assignee"],
+                "priority": report["priority"], "status": report["status"],
+            }, [query_limit]))
+            return {"outcome": "created", "ticket_id": created[0].get("ticket_id") if created else None}
+
+        ticket_id = str(nearest["ticket_id"])
+        actions = []
+        if report["priority"] < str(nearest.get("priority") or "P9"):  # "P0 - Critical" sorts first
+            await self._call(tools, "update-ticket-priority",
+                             {"priority": report["priority"], "ticket_id": ticket_id}, [query_limit])
+            actions.append(f"priority {nearest.get('priority')} -> {report['priority']}")
+        if str(nearest.get("status") or "").lower() in CLOSED_STATUSES:
+            await self._call(tools, "update-ticket-status", {"status": "Open", "ticket_id": ticket_id}, [query_limit])
+            actions.append(f"status {nearest.get('status')} -> Open")
+        return {"outcome": "updated" if actions else "duplicate", "ticket_id": nearest["ticket_id"],
+                "distance": nearest.get("distance"), "actions": actions}
+
+    async def run(self, input_path, results_path, limit=None, on_progress=None):
+        """Triages the reports of ``input_path`` not yet in ``results_path``; returns the stats.
+
+        ``limit`` caps the reports triaged in this run. ``on_progress(stats)``
+        is called after every report.
+        """
+        tools = {tool.name: tool for tool in await self.toolset.get_tools()}
+        missing = {"search-tickets", "create-new-ticket", "update-ticket-priority", "update-ticket-status"} - tools.keys()
+        if missing:
+            raise RuntimeError(f"toolset {getattr(self.toolset, 'toolset_name', '')} lacks {sorted(missing)}")
+        limiters = (RateLimiter(self.queries_per_second), RateLimiter(self.searches_per_second))
+        done = completed_lines(results_path)
+        queue = asyncio.Queue(maxsize=self.workers * 2)
+        start = time.perf_counter()
+
+        with open(results_path, "a") as results:
+            def record(result):
+                results.write(json.dumps(result, default=str) + "\n")
+                results.flush()
+                self.stats["items"] += 1
+                self.stats[result["outcome"]] += 1
+                if result["outcome"] == "failed":
+                    self.errors[result["error"]] = self.errors.get(result["error"], 0) + 1
+                self.stats["seconds"] = time.perf_counter() - start
+                self.stats["items_per_second"] = self.stats["items"] / self.stats["seconds"]
+                if on_progress is not None:
+                    on_progress(dict(self.stats))
+
+            async def worker():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    line_number, line = item
+                    item_start = time.perf_counter()
+                    result = {"line": line_number}
+                    try:
+                        report = parse_report(line)
+                        result["id"] = report["id"]
+                        result.update(await self.triage(tools, report, limiters))
+                    except TriageOutcomeUnknown as e:
+                        result.update(outcome=WRITE_OUTCOME_UNKNOWN, error=str(e))
+                    except (InvalidReport, TriageCallError) as e:
+                        result.update(outcome="failed", error=str(e))
+                    except Exception as e:
+                        result.update(outcome="failed", error=repr(e))
+                    result["seconds"] = round(time.perf_counter() - item_start, 4)
+                    record(result)
+
+            tasks = [asyncio.create_task(worker()) for _ in range(self.workers)]
+            try:
+                queued = 0
+                with open(input_path) as reports:
+                    for line_number, line in enumerate(reports, 1):
+                        if not line.strip():
+                            continue
+                        if line_number in done:
+                            self.stats["skipped"] += 1
+                            continue
+                        if limit is not None and queued >= limit:
+                            break
+                        await queue.put((line_number, line))
+                        queued += 1
+                for _ in tasks:
+                    await queue.put(None)
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+        self.stats["seconds"] = time.perf_counter() - start
+        self.stats["items_per_second"] = self.stats["items"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
+        return dict(self.stats)
+
+
+def _job_path(job_id, suffix):
+    return os.path.join(TRIAGE_DIR, f"{job_id}{suffix}")
+
+
+def _write_status(job_id, status):
+    # Written whole and renamed, so a worker reading it never sees half a file.
+    path = _job_path(job_id, ".status.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(status, f)
+    os.replace(path + ".tmp", path)
+
+
+def job_status(job_id):
+    """Status of a triage job started by any worker of this host, or None for an unknown job."""
+    if not job_id.replace("-", "").isalnum():
+        return None
+    try:
+        with open(_job_path(job_id, ".status.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+_running_jobs = set()
+_jobs_lock = threading.Lock()
+
+
+def start_job(reports, toolset=None):
+    """Saves the uploaded ``reports`` (bytes of JSONL) and triages them in a background thread.
+
+    Returns the job id, or None when TRIAGE_MAX_JOBS jobs are already running in this worker.
+    """
+    job_id = str(uuid.uuid4())
+    with _jobs_lock:
+        if len(_running_jobs) >= TRIAGE_MAX_JOBS:
+            return None
+        _running_jobs.add(job_id)
+    os.makedirs(TRIAGE_DIR, exist_ok=True)
+    with open(_job_path(job_id, ".jsonl"), "wb") as f:
+        f.write(reports)
+    status = {"job_id": job_id, "status": "running", "started": time.time(),
+              "results": _job_path(job_id, ".results.jsonl"), "stats": {}}
+    _write_status(job_id, status)
+
+    def run():
+        last_written = 0.0
+
+        def on_progress(stats):
+            nonlocal last_written
+            if time.monotonic() - last_written >= 1:
+                last_written = time.monotonic()
+                _write_status(job_id, dict(status, stats=stats))
+
+        try:
+            if toolset is not None:
+                pipeline = TriagePipeline(toolset)
+            else:
+                from .tools.tools import toolbox_toolset
+
+                pipeline = TriagePipeline(toolbox_toolset)
+            stats = asyncio.run(pipeline.run(_job_path(job_id, ".jsonl"), status["results"], on_progress=on_progress))
+            status.update(status="done", stats=stats, errors=pipeline.errors)
+            print(f"Triage job {job_id} done: {stats['items']} reports, {stats['failed']} failed, "
+                  f"{stats[WRITE_OUTCOME_UNKNOWN]} unknown, "
+                  f"{stats['items_per_second']:.1f} reports/s")
+        except Exception as e:
+            status.update(status="failed", error=repr(e))
+            print(f"Triage job {job_id} failed: {e!r}")
+        finally:
+            status["finished"] = time.time()
+            _write_status(job_id, status)
+            with _jobs_lock:
+                _running_jobs.discard(job_id)
+
+    threading.Thread(target=run, name=f"triage-{job_id[:8]}", daemon=True).start()
+    return job_id
@@ -3,4 +3,7 @@ from . import views
 
 urlpatterns = [
     path('interact/', views.interact_with_agent, name='interact_with_agent'),
+    path('interact/stream/', views.interact_with_agent_stream, name='interact_with_agent_stream'),
+    path('triage/', views.triage_jobs, name='triage_jobs'),
+    path('triage/<str:job_id>/', views.triage_job_status, name='triage_job_status'),
 ]
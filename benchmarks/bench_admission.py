@@ -0,0 +1,158 @@
+"""Latency under a burst with and without admission control, and turns of one session.
+
+Sends ``--burst`` turns at once to ``agent/interact/`` (fake Gemini and
+toolbox, in-memory sessions, fast path off so every turn runs the agent).
+The fake model serves at most ``--model-capacity`` calls at a time, like a
+per-project Gemini quota; further calls wait for it. Admission control is
+measured off and on (``--max-in-flight``, ``--max-queue``,
+``--queue-timeout``). Reported: answered and rejected turns, the latency of
+answered turns and of rejections, and the wall time of the burst.
+
+Then ``--same-session`` messages are posted at once to one session and the
+session's events are checked for turns that interleaved.
+
+    python -m benchmarks.bench_admission --burst 300 --model-capacity 16
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks.fakes import FakeLlm, FakeToolboxServer, register_fake_llm
+
+INTERACT_URL = "/agent/interact/"
+QUESTION = "Show me all the tickets with status Open"
+
+
+def _payload(text, session_id=None):
+    return json.dumps({
+        "appName": "AgentBugAssistant",
+        "userId": "bench_user",
+        "sessionId": session_id or str(uuid.uuid4()),
+        "newMessage": {"role": "user", "parts": [{"text": text}]},
+    })
+
+
+def _setup(args):
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "fake-gemini"
+    os.environ["FAST_PATH_ENABLED"] = "false"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    FakeLlm.latency = args.llm_latency_ms / 1000
+    register_fake_llm()
+
+    # The model serves at most model_capacity calls at a time.
+    generate = FakeLlm.generate_content_async
+    capacity = {}
+
+    async def capped_generate(self, llm_request, stream=False):
+        semaphore = capacity.setdefault(asyncio.get_running_loop(), asyncio.Semaphore(args.model_capacity))
+        async with semaphore:
+            async for response in generate(self, llm_request, stream):
+                yield response
+
+    FakeLlm.generate_content_async = capped_generate
+
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_bug_ticket_agent import services
+
+    services._session_service_instance = InMemorySessionService()
+    services._memory_service_instance = InMemoryMemoryService()
+    services.warmup()
+    return toolbox
+
+
+async def _burst(n):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+
+    async def one():
+        start = time.perf_counter()
+        response = await client.post(INTERACT_URL, _payload(QUESTION), content_type="application/json")
+        return response.status_code, response.get("Retry-After"), time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(n)))
+    return results, time.perf_counter() - start
+
+
+async def _same_session(n):
+    from django.test import AsyncClient
+
+    from adk_bug_ticket_agent.services import get_session_service
+
+    client = AsyncClient()
+    session_id = str(uuid.uuid4())
+    responses = await asyncio.gather(*(
+        client.post(INTERACT_URL, _payload(f"{QUESTION} (message {i})", session_id), content_type="application/json")
+        for i in range(n)
+    ))
+    session = await get_session_service().get_session(
+        app_name="AgentBugAssistant", user_id="bench_user", session_id=session_id)
+    # Each turn's events must be contiguous; a turn id that reappears after another turn's events interleaved.
+    invocations = [event.invocation_id for event in session.events]
+    runs = [invocation for i, invocation in enumerate(invocations) if i == 0 or invocations[i - 1] != invocation]
+    interleaved = len(runs) - len(set(runs))
+    return collections.Counter(response.status_code for response in responses), len(set(invocations)), interleaved
+
+
+def _describe(latencies):
+    if not latencies:
+        return "n=0"
+    ordered = sorted(latencies)
+    return (f"n={len(ordered)} p50={statistics.median(ordered) * 1000:7.1f} ms  "
+            f"p95={ordered[int(len(ordered) * 0.95)] * 1000:7.1f} ms  max={ordered[-1] * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=300)
+    parser.add_argument("--model-capacity", type=int, default=16)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--queue-timeout", type=float, default=5)
+    parser.add_argument("--same-session", type=int, default=3)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--tool-latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    toolbox = _setup(args)
+    from adk_bug_ticket_agent import admission
+
+    try:
+        for enabled in (False, True):
+            admission.ADMISSION_ENABLED = enabled
+            admission._admission_instance = admission.AdmissionController(
+                max_in_flight=args.max_in_flight, max_queue=args.max_queue, queue_timeout=args.queue_timeout)
+            results, elapsed = asyncio.run(_burst(args.burst))
+            statuses = collections.Counter(status for status, _, _ in results)
+            retry_after = sorted({value for _, value, _ in results if value})
+            print(f"admission={'on ' if enabled else 'off'} burst={args.burst} wall={elapsed:5.2f} s  "
+                  f"statuses={dict(statuses)}  retry_after={retry_after}")
+            print(f"  answered  {_describe([seconds for status, _, seconds in results if status == 200])}")
+            print(f"  rejected  {_describe([seconds for status, _, seconds in results if status != 200])}")
+            if enabled:
+                print(f"  counters  {admission._admission_instance.snapshot()}")
+
+            statuses, turns, interleaved = asyncio.run(_same_session(args.same_session))
+            print(f"  {args.same_session} messages to one session: statuses={dict(statuses)}  "
+                  f"turns_recorded={turns}  interleaved_turns={interleaved}")
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Prefill per model call of the root agent with and without the context cache.
+
+Runs ``--sessions`` conversations of ``--turns`` turns each through
+``agent/interact/`` (fake toolbox, fast path off, sessions in a SQLite
+file), once with CONTEXT_CACHE_ENABLED off and once on. The model is a
+FakeLlm that, like Gemini, expands ``cached_content`` into the instruction
+and tool declarations stored by a fake caches client, so both runs make the
+same tool calls. A last before_model callback measures what each call would
+send: instruction, tool declarations and contents (about 4 characters per
+token, as no tokenizer is available offline). Reported: model calls,
+prefill tokens per call (static prefix and contents), and how many calls
+went out with a cached content.
+
+Then the toolset loses a tool (as after a toolbox refresh) and the prompt
+changes, one turn each, which must create a new cache and delete the old.
+
+    python -m benchmarks.bench_context_cache --sessions 5 --turns 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from types import SimpleNamespace
+from typing import ClassVar
+
+from benchmarks.fakes import FakeLlm, FakeToolboxServer
+
+INTERACT_URL = "/agent/interact/"
+APP_NAME = "AgentBugAssistant"
+MODEL = "fake-cached-gemini"
+
+
+class FakeCaches:
+    """client.caches of google-genai, keeping the cached contents in memory."""
+
+    store: ClassVar[dict] = {}
+
+    def __init__(self):
+        self.calls = {"create": 0, "update": 0, "delete": 0}
+
+    def create(self, model, config):
+        self.calls["create"] += 1
+        name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+        FakeCaches.store[name] = config
+        return SimpleNamespace(name=name, model=model)
+
+    def update(self, name, config):
+        self.calls["update"] += 1
+        if name not in FakeCaches.store:
+            raise KeyError(name)
+
+    def delete(self, name):
+        self.calls["delete"] += 1
+        del FakeCaches.store[name]
+
+
+class CachingFakeLlm(FakeLlm):
+    """FakeLlm reading the instruction and tools of ``cached_content`` back, as Gemini does."""
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake-cached-.*"]
+
+    async def generate_content_async(self, llm_request, stream=False):
+        name = llm_request.config.cached_content
+        if name:
+            cached = FakeCaches.store[name]  # a deleted cache fails the call, like the API
+            config = llm_request.config.model_copy(update={
+                "cached_content": None, "system_instruction": cached.system_instruction,
+                "tools": cached.tools, "tool_config": cached.tool_config,
+            })
+            llm_request = llm_request.model_copy(update={"config": config})
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+def _chars(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, list):
+        return sum(_chars(item) for item in value)
+    return len(json.dumps(value.model_dump(mode="json", exclude_none=True), separators=(",", ":")))
+
+
+def _setup():
+    toolbox = FakeToolboxServer(latency=0)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = MODEL
+    os.environ["FAST_PATH_ENABLED"] = "false"
+    os.environ["MEMORY_INGESTION_ENABLED"] = "false"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.models import LLMRegistry
+
+    from adk_bug_ticket_agent import services
+
+    FakeLlm.latency = 0
+    LLMRegistry.register(CachingFakeLlm)
+    services._memory_service_instance = InMemoryMemoryService()
+    return toolbox
+
+
+def _record(calls):
+    """Appends a before_model callback recording the size of every model call as it is sent."""
+    from adk_bug_ticket_agent import services
+
+    def record(callback_context, llm_request):
+        config = llm_request.config
+        calls.append({
+            "cached": bool(config.cached_content),
+            "static": _chars(config.system_instruction) + _chars(config.tools) + _chars(config.tool_config),
+            "contents": _chars(llm_request.contents),
+        })
+        return None
+
+    services.get_root_agent().before_model_callback.append(record)
+
+
+def _use(enabled):
+    from adk_bug_ticket_agent import context_cache, services
+    from adk_bug_ticket_agent.sessions import CachedDatabaseSessionService
+
+    context_cache.CONTEXT_CACHE_ENABLED = enabled
+    context_cache._context_cache_instance = None
+    if enabled:
+        context_cache._context_cache_instance = context_cache.ContextCache(
+            client=SimpleNamespace(caches=FakeCaches()), cacheable=lambda model: model.startswith("fake-cached-"))
+    sessions_dir = tempfile.mkdtemp()
+    services._session_service_instance = CachedDatabaseSessionService(
+        f"sqlite:///{os.path.join(sessions_dir, 'sessions.db')}")
+    services._runners.clear()
+    return context_cache._context_cache_instance
+
+
+async def _conversations(client, sessions, turns):
+    for _ in range(sessions):
+        session_id = str(uuid.uuid4())
+        for turn in range(turns):
+            payload = json.dumps({
+                "appName": APP_NAME, "userId": "bench_user", "sessionId": session_id,
+                "newMessage": {"role": "user", "parts": [{"text": f"Show me the open tickets (turn {turn})"}]},
+            })
+            response = await client.post(INTERACT_URL, payload, content_type="application/json")
+            assert response.status_code == 200, response.content
+
+
+def _report(name, calls, seconds):
+    n = len(calls)
+    static = sum(call["static"] for call in calls) // 4
+    contents = sum(call["contents"] for call in calls) // 4
+    print(f"{name:<4} calls={n}  cached={sum(call['cached'] for call in calls):>4}  "
+          f"~prefill tokens/call={(static + contents) / n:7.0f} (static {static / n:6.0f} + contents {contents / n:6.0f})  "
+          f"wall={seconds:5.1f} s")
+    return (static + contents) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    toolbox = _setup()
+    from django.test import AsyncClient
+
+    from adk_bug_ticket_agent import services
+    from adk_bug_ticket_agent.tools.tools import toolbox_toolset
+
+    calls = []
+    _record(calls)
+    client = AsyncClient()
+    try:
+        per_call = {}
+        for name, enabled in (("off", False), ("on", True)):
+            cache = _use(enabled)
+            calls.clear()
+            start = time.perf_counter()
+            asyncio.run(_conversations(client, args.sessions, args.turns))
+            per_call[name] = _report(name, calls, time.perf_counter() - start)
+        print(f"prefill tokens per call: {per_call['off']:.0f} -> {per_call['on']:.0f} "
+              f"({1 - per_call['on'] / per_call['off']:.0%} fewer); {cache.snapshot()}")
+
+        agent = services.get_root_agent()
+        tools, instruction = toolbox_toolset._tools, agent.instruction
+        for change, undo in (
+            ("toolset lost a tool", lambda: setattr(toolbox_toolset, "_tools", tools)),
+            ("prompt changed", lambda: setattr(agent, "instruction", instruction)),
+        ):
+            if change.startswith("toolset"):
+                toolbox_toolset._tools = tools[:-1]
+            else:
+                agent.instruction = instruction + "\n\nAlways answer in English."
+            calls.clear()
+            asyncio.run(_conversations(client, 1, 1))
+            stats = cache.snapshot()
+            print(f"{change:<20} cached calls {sum(call['cached'] for call in calls)}/{len(calls)}  "
+                  f"created={stats['created']} deleted={stats['deleted']} live caches={len(FakeCaches.store)}")
+            undo()
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
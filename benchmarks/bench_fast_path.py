@@ -0,0 +1,146 @@
+"""Share of a mixed question workload answered by the fast path, and its latency.
+
+Runs the same questions against ``agent/interact/`` (fake Gemini and toolbox,
+in-memory sessions) with FAST_PATH_ENABLED off and on. Each question gets a
+new session. Reports the fraction of turns the fast path answered and the
+latency of fast-path turns next to that of agent turns.
+
+    python -m benchmarks.bench_fast_path --requests 200 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks.fakes import FakeLlm, FakeToolboxServer, register_fake_llm
+
+INTERACT_URL = "/agent/interact/"
+
+# Roughly the mix of the example questions in the README: plain lookups,
+# topic searches, follow-ups, writes and questions for the web search agent.
+QUESTIONS = [
+    "Show me all the tickets with status Open",
+    "Which issues are currently marked as In Progress?",
+    "all bugs that are assigned to user@example.com",
+    "Show me ticket 7",
+    "ticket 12",
+    "P0 open bugs this week",
+    "tickets assigned to user3@example.com",
+    "critical priority tickets",
+    "List the tickets with highest priority",
+    "Can you bump the priority of ticket 7 to P0?",
+    "Any tickets about password reset emails?",
+    "What are some possible root-causes for the unresponsive login page issue?",
+    "Which of them are P0?",
+    "Do you remember which ones were blocked earlier?",
+    "How many tickets are open?",
+    "Create a ticket for the broken export button",
+]
+
+
+def _payload(text):
+    return json.dumps({
+        "appName": "AgentBugAssistant",
+        "userId": "bench_user",
+        "sessionId": str(uuid.uuid4()),
+        "newMessage": {"role": "user", "parts": [{"text": text}]},
+    })
+
+
+def _setup(args):
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "fake-gemini"
+    os.environ["TOOL_CACHE_TTL_SECONDS"] = "0"  # every lookup reaches the toolbox
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    FakeLlm.latency = args.llm_latency_ms / 1000
+    register_fake_llm()
+
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_bug_ticket_agent import services
+
+    services._session_service_instance = InMemorySessionService()
+    services._memory_service_instance = InMemoryMemoryService()
+    services.warmup()
+    return toolbox
+
+
+async def _run(n_requests, concurrency):
+    from django.test import AsyncClient
+
+    from adk_bug_ticket_agent.fast_path import get_fast_path
+
+    semaphore = asyncio.Semaphore(concurrency)
+    client = AsyncClient()
+    fast_path = get_fast_path()
+
+    async def one(i):
+        text = QUESTIONS[i % len(QUESTIONS)]
+        async with semaphore:
+            answered = fast_path.stats["answered"] if fast_path else 0
+            start = time.perf_counter()
+            response = await client.post(INTERACT_URL, _payload(text), content_type="application/json")
+            assert response.status_code == 200, response.content
+            elapsed = time.perf_counter() - start
+            # Concurrent turns may bump the counter too; the answer text tells them apart.
+            used_fast_path = (fast_path is not None and fast_path.stats["answered"] > answered
+                              and "I used the `get-ticket" in response.json()["content"]["parts"][0]["text"])
+            return used_fast_path, elapsed
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return results, time.perf_counter() - start
+
+
+def _describe(latencies):
+    if not latencies:
+        return "n=0"
+    ordered = sorted(latencies)
+    return (f"n={len(ordered)} p50={statistics.median(ordered) * 1000:7.1f} ms  "
+            f"p95={ordered[int(len(ordered) * 0.95)] * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    toolbox = _setup(args)
+    from adk_bug_ticket_agent import fast_path
+
+    try:
+        for enabled in (False, True):
+            fast_path.FAST_PATH_ENABLED = enabled
+            model_calls = FakeLlm.calls
+            results, elapsed = asyncio.run(_run(args.requests, args.concurrency))
+            fast = [seconds for used, seconds in results if used]
+            agent = [seconds for used, seconds in results if not used]
+            print(
+                f"fast_path={'on ' if enabled else 'off'} turns={len(results)} "
+                f"throughput={len(results) / elapsed:6.1f} turns/s  fast_path_share={len(fast) / len(results):5.1%}  "
+                f"model_calls={FakeLlm.calls - model_calls}"
+            )
+            print(f"  all turns       {_describe([seconds for _, seconds in results])}")
+            if enabled:
+                print(f"  fast path turns {_describe(fast)}")
+                print(f"  agent turns     {_describe(agent)}")
+        print(f"router stats: {fast_path.get_fast_path().snapshot()}")
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
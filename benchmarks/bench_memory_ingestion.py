@@ -0,0 +1,149 @@
+"""Per-turn latency with sessions added to memory inline vs. by the background queue.
+
+Runs multi-turn conversations against ``agent/interact/`` (fake Gemini and
+toolbox, in-memory sessions). The memory service blocks for
+``--upload-latency-ms`` per ``add_session_to_memory`` call, like the
+synchronous RAG file upload of VertexAiRagMemoryService. ``inline`` adds the
+session to memory at the end of every turn inside the request; ``background``
+queues it with the MemoryIngestionQueue and flushes the queue at the end.
+
+    python -m benchmarks.bench_memory_ingestion --conversations 40 --turns 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+
+from google.adk.memory import InMemoryMemoryService
+
+from benchmarks.fakes import FakeLlm, FakeToolboxServer, register_fake_llm
+
+INTERACT_URL = "/agent/interact/"
+APP_NAME = "AgentBugAssistant"
+
+
+class SlowMemoryService(InMemoryMemoryService):
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+        self.uploads = 0
+
+    async def add_session_to_memory(self, session):
+        time.sleep(self.latency)  # blocking, like rag.upload_file
+        self.uploads += 1
+        await super().add_session_to_memory(session)
+
+
+def _payload(session_id, text):
+    return json.dumps({
+        "appName": APP_NAME,
+        "userId": "bench_user",
+        "sessionId": session_id,
+        "newMessage": {"role": "user", "parts": [{"text": text}]},
+    })
+
+
+def _setup(args):
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "fake-gemini"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    FakeLlm.latency = args.llm_latency_ms / 1000
+    register_fake_llm()
+
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_bug_ticket_agent import services
+
+    services._session_service_instance = InMemorySessionService()
+    services.warmup()
+    return toolbox
+
+
+async def _run(conversations, turns):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+
+    async def conversation():
+        session_id = str(uuid.uuid4())
+        latencies = []
+        for turn in range(turns):
+            start = time.perf_counter()
+            response = await client.post(INTERACT_URL, _payload(session_id, f"Show me open tickets, part {turn}"),
+                                         content_type="application/json")
+            assert response.status_code == 200, response.content
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(conversation() for _ in range(conversations)))
+    return [latency for latencies in results for latency in latencies], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=40)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--upload-latency-ms", type=float, default=300)
+    parser.add_argument("--idle-seconds", type=float, default=1.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    toolbox = _setup(args)
+    from adk_bug_ticket_agent import services, views
+    from adk_bug_ticket_agent.memory_ingestion import MemoryIngestionQueue
+
+    compact_session = views.compact_session
+
+    async def compact_and_ingest(app_name, user_id, session_id):
+        await compact_session(app_name, user_id, session_id)
+        session = await services.get_session_service().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        await services.get_memory_service().add_session_to_memory(session)
+
+    try:
+        for mode in ("inline", "background"):
+            memory_service = SlowMemoryService(args.upload_latency_ms / 1000)
+            services._memory_service_instance = memory_service
+            if mode == "inline":
+                views.compact_session = compact_and_ingest
+                services.MEMORY_INGESTION_ENABLED = False
+                queue = None
+            else:
+                views.compact_session = compact_session
+                services.MEMORY_INGESTION_ENABLED = True
+                queue = services._memory_ingestion_instance = MemoryIngestionQueue(
+                    services.get_session_service, services.get_memory_service,
+                    idle_seconds=args.idle_seconds, poll_seconds=0.1,
+                )
+            latencies, elapsed = asyncio.run(_run(args.conversations, args.turns))
+            flush_start = time.perf_counter()
+            if queue is not None:
+                queue.stop()
+            flush_ms = (time.perf_counter() - flush_start) * 1000
+            ordered = sorted(latencies)
+            print(
+                f"{mode:<10} turns={len(ordered)} throughput={len(ordered) / elapsed:6.1f} turns/s  "
+                f"p50={statistics.median(ordered) * 1000:7.1f} ms  p99={ordered[int(len(ordered) * 0.99)] * 1000:7.1f} ms  "
+                f"uploads={memory_service.uploads}  flush={flush_ms:6.0f} ms"
+            )
+            if queue is not None:
+                print(f"           {queue.stats}")
+    finally:
+        views.compact_session = compact_session
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Cost of the per-turn metrics, and a sample of what /metrics reports.
+
+Runs the same turns against ``agent/interact/`` (fake Gemini and toolbox,
+in-memory sessions) with METRICS_ENABLED off and on, then times the
+recording primitives on their own and prints the agent_* series of a scrape.
+
+    python -m benchmarks.bench_metrics --requests 300 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks.fakes import FakeLlm, FakeToolboxServer, register_fake_llm
+
+INTERACT_URL = "/agent/interact/"
+
+
+def _payload(text):
+    return json.dumps({
+        "appName": "AgentBugAssistant",
+        "userId": "bench_user",
+        "sessionId": str(uuid.uuid4()),
+        "newMessage": {"role": "user", "parts": [{"text": text}]},
+    })
+
+
+def _setup(args):
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "fake-gemini"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    FakeLlm.latency = args.llm_latency_ms / 1000
+    register_fake_llm()
+
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_bug_ticket_agent import services
+
+    services._session_service_instance = InMemorySessionService()
+    services._memory_service_instance = InMemoryMemoryService()
+    services.warmup()
+    return toolbox
+
+
+async def _run(n_requests, concurrency):
+    from django.test import AsyncClient
+
+    semaphore = asyncio.Semaphore(concurrency)
+    client = AsyncClient()
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(INTERACT_URL, _payload(f"Show me open tickets {i}"),
+                                         content_type="application/json")
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return latencies, time.perf_counter() - start
+
+
+def _per_call_us(fn, n=100_000):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    toolbox = _setup(args)
+    from adk_bug_ticket_agent import metrics
+
+    try:
+        for enabled in (False, True):
+            metrics.METRICS_ENABLED = enabled
+            latencies, elapsed = asyncio.run(_run(args.requests, args.concurrency))
+            ordered = sorted(latencies)
+            print(
+                f"metrics={'on ' if enabled else 'off'} requests={len(ordered)} throughput={len(ordered) / elapsed:7.1f} req/s  "
+                f"p50={statistics.median(ordered) * 1000:7.1f} ms  p99={ordered[int(len(ordered) * 0.99)] * 1000:7.1f} ms"
+            )
+    finally:
+        toolbox.stop()
+
+    histogram = metrics.Histogram("bench_seconds", "", ["tool"])
+    print(f"Histogram.observe: {_per_call_us(lambda: histogram.observe(0.07, 'get-ticket-by-id')):.2f} us/call")
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f"render: {(time.perf_counter() - start) * 1000:.2f} ms for {len(text.splitlines())} lines")
+    for line in text.splitlines():
+        if line.startswith(("agent_turn_phase_seconds_sum", "agent_turn_seconds_count", "agent_model_call_seconds_sum",
+                            "agent_tool_call_seconds_count", "agent_model_tokens_total", "agent_runners")):
+            print("  " + line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Turn latency when the model asks for several ticket lookups at once.
+
+A scripted model requests get-tickets-by-status, get-tickets-by-priority and
+search-tickets in one response, then answers. Each turn runs against
+``agent/interact/`` (fake toolbox, in-memory sessions) with the lookups run
+one after another (TOOL_PARALLELISM=1) and concurrently. A second part sends
+concurrent update-ticket-status calls for one ticket and checks that the
+toolbox never sees two of them at the same time.
+
+    python -m benchmarks.bench_parallel_tools --requests 50 --tool-latency-ms 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from google.genai import types
+
+from benchmarks.fakes import FAKE_ANSWER, FakeToolboxServer
+
+INTERACT_URL = "/agent/interact/"
+
+LOOKUPS = [
+    ("get-tickets-by-status", {"status": "Open", "after_ticket_id": 0}),
+    ("get-tickets-by-priority", {"priority": "P0", "after_ticket_id": 0}),
+    ("search-tickets", {"query": "login page freezes", "status": ""}),
+]
+
+
+class MultiLookupLlm(BaseLlm):
+    """Asks for all of LOOKUPS in one response, then answers."""
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"multi-lookup-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        last = llm_request.contents[-1]
+        if not any(p.function_response for p in last.parts or []):
+            yield LlmResponse(content=types.Content(role="model", parts=[
+                types.Part(function_call=types.FunctionCall(name=name, args=args)) for name, args in LOOKUPS
+            ]))
+            return
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part.from_text(text=FAKE_ANSWER)]))
+
+
+def _payload(text):
+    return json.dumps({
+        "appName": "AgentBugAssistant",
+        "userId": "bench_user",
+        "sessionId": str(uuid.uuid4()),
+        "newMessage": {"role": "user", "parts": [{"text": text}]},
+    })
+
+
+def _setup(args):
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "multi-lookup-gemini"
+    os.environ["TOOL_CACHE_TTL_SECONDS"] = "0"  # every lookup reaches the toolbox
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    LLMRegistry.register(MultiLookupLlm)
+
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_bug_ticket_agent import services
+
+    services._session_service_instance = InMemorySessionService()
+    services._memory_service_instance = InMemoryMemoryService()
+    services.warmup()
+    return toolbox
+
+
+async def _turns(n_requests, concurrency):
+    from django.test import AsyncClient
+
+    semaphore = asyncio.Semaphore(concurrency)
+    client = AsyncClient()
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(INTERACT_URL, _payload(f"Open P0 tickets about the login page? {i}"),
+                                         content_type="application/json")
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return latencies, time.perf_counter() - start
+
+
+async def _concurrent_writes(toolset, toolbox, writes):
+    tools = {tool.name: tool for tool in await toolset.get_tools()}
+    update = tools["update-ticket-status"]
+    in_flight = toolbox.app["stats"]["in_flight"]
+    in_flight["max"] = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(update.run_async(args={"ticket_id": "7", "status": "Open"}, tool_context=None)
+                           for _ in range(writes)))
+    return time.perf_counter() - start, in_flight["max"]
+
+
+def _track_in_flight(toolbox):
+    """Wraps the fake toolbox's invoke handler to record the peak number of concurrent invocations."""
+    route = next(r for r in toolbox.app.router.routes() if r.method == "POST")
+    handler = route.handler
+    stats = toolbox.app["stats"].setdefault("in_flight", {"now": 0, "max": 0})
+
+    async def counting(request):
+        stats["now"] += 1
+        stats["max"] = max(stats["max"], stats["now"])
+        try:
+            return await handler(request)
+        finally:
+            stats["now"] -= 1
+
+    route._handler = counting
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--tool-latency-ms", type=float, default=100)
+    parser.add_argument("--writes", type=int, default=5)
+    args = parser.parse_args()
+
+    toolbox = _setup(args)
+    _track_in_flight(toolbox)
+    from adk_bug_ticket_agent.tools.tools import parallel_reads, toolbox_toolset
+
+    try:
+        for parallelism in (1, 4):
+            parallel_reads.max_parallel = parallelism
+            invocations = toolbox.invocations
+            latencies, elapsed = asyncio.run(_turns(args.requests, args.concurrency))
+            ordered = sorted(latencies)
+            print(
+                f"parallelism={parallelism} turns={len(ordered)} throughput={len(ordered) / elapsed:6.1f} turns/s  "
+                f"p50={statistics.median(ordered) * 1000:7.1f} ms  p95={ordered[int(len(ordered) * 0.95)] * 1000:7.1f} ms  "
+                f"toolbox_calls={toolbox.invocations - invocations}"
+            )
+        elapsed, peak = asyncio.run(_concurrent_writes(toolbox_toolset, toolbox, args.writes))
+        print(f"{args.writes} concurrent updates of ticket 7: {elapsed * 1000:.0f} ms, "
+              f"at most {peak} in flight at the toolbox")
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Triage questions answered with and without the semantic response cache.
+
+Replays a mix of repeated and rephrased read questions plus a few write
+requests against ``agent/interact/`` (fake Gemini and toolbox, in-memory
+sessions) and reports latency, model calls and the cache counters.
+
+    python -m benchmarks.bench_response_cache --requests 300 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+
+from benchmarks.fakes import FakeLlm, FakeToolboxServer, register_fake_llm
+
+INTERACT_URL = "/agent/interact/"
+
+QUESTIONS = [
+    ["Show me P0 open tickets", "show me the open P0 tickets", "Show me P0 tickets that are Open"],
+    ["Any tickets about password reset emails?", "any tickets about password-reset emails",
+     "Are there tickets about password reset emails"],
+    ["Which issues are in progress?", "which issues are currently in progress"],
+    ["List the tickets assigned to user@example.com", "tickets assigned to user@example.com"],
+    ["What are the highest priority tickets?", "what are the highest-priority tickets"],
+    ["Show me ticket 7", "show ticket 7"],
+]
+WRITES = ["Bump the priority of ticket 7 to P0", "Create a ticket for the broken export button"]
+
+
+def _workload(n_requests, write_ratio, seed=7):
+    rng = random.Random(seed)
+    return [rng.choice(WRITES) if rng.random() < write_ratio else rng.choice(rng.choice(QUESTIONS))
+            for _ in range(n_requests)]
+
+
+def _payload(text):
+    return json.dumps({
+        "appName": "AgentBugAssistant",
+        "userId": "bench_user",
+        "sessionId": str(uuid.uuid4()),
+        "newMessage": {"role": "user", "parts": [{"text": text}]},
+    })
+
+
+def _setup(args):
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "fake-gemini"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    FakeLlm.latency = args.llm_latency_ms / 1000
+    register_fake_llm()
+
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_bug_ticket_agent import services
+
+    services._session_service_instance = InMemorySessionService()
+    services._memory_service_instance = InMemoryMemoryService()
+    services.warmup()
+    return toolbox
+
+
+async def _run(queries, concurrency):
+    from django.test import AsyncClient
+
+    semaphore = asyncio.Semaphore(concurrency)
+    client = AsyncClient()
+
+    async def one(text):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(INTERACT_URL, _payload(text), content_type="application/json")
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(q) for q in queries))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    toolbox = _setup(args)
+    from adk_bug_ticket_agent import response_cache
+
+    queries = _workload(args.requests, args.write_ratio)
+    try:
+        for enabled in (False, True):
+            response_cache.SEMANTIC_CACHE_ENABLED = enabled
+            response_cache._response_cache_instance = None
+            llm_calls = FakeLlm.calls
+            latencies, elapsed = asyncio.run(_run(queries, args.concurrency))
+            ordered = sorted(latencies)
+            print(
+                f"cache={'on ' if enabled else 'off'} requests={len(queries)} throughput={len(queries) / elapsed:7.1f} req/s  "
+                f"p50={statistics.median(ordered) * 1000:7.1f} ms  p99={ordered[int(len(ordered) * 0.99)] * 1000:7.1f} ms  "
+                f"model_calls={FakeLlm.calls - llm_calls}"
+            )
+            cache = response_cache.get_response_cache()
+            if cache is not None:
+                stats = cache.snapshot()
+                print(
+                    f"          hit_rate={stats['hit_rate']:.2f} hits={stats['hits']} (exact {stats['exact_hits']}) "
+                    f"misses={stats['misses']} skipped={stats['skipped']} invalidations={stats['invalidations']} "
+                    f"mean_lookup={stats['mean_lookup_ms']:.2f} ms"
+                )
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
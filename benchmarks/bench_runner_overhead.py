@@ -0,0 +1,126 @@
+"""Per-request overhead of obtaining a Runner, before and after the registry.
+
+"before" builds a Runner for every request, as interact_with_agent used to.
+"after" looks the Runner up in ``services.get_runner``. The second part races
+cold threads against the session service factory and counts how many engines
+get built with and without the init lock.
+
+    python -m benchmarks.bench_runner_overhead --iterations 20000
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+
+from benchmarks.fakes import FakeToolboxServer, register_fake_llm
+
+APP_NAME = "AgentBugAssistant"
+
+
+def _setup():
+    toolbox = FakeToolboxServer(latency=0)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "fake-gemini"
+    register_fake_llm()
+
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_bug_ticket_agent import services
+
+    services._session_service_instance = InMemorySessionService()
+    services._memory_service_instance = InMemoryMemoryService()
+    services.warmup([APP_NAME])
+    return toolbox, services
+
+
+def _time_per_call(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+    return statistics.mean(samples) / 1000, sorted(samples)[int(len(samples) * 0.99)] / 1000
+
+
+def bench_lookup(services, iterations):
+    from google.adk.runners import Runner
+
+    def per_request_runner():
+        Runner(
+            app_name=APP_NAME,
+            agent=services.get_root_agent(),
+            session_service=services.get_session_service(),
+            memory_service=services.get_memory_service(),
+        )
+
+    for name, fn in (("before", per_request_runner), ("after", lambda: services.get_runner(APP_NAME))):
+        mean_us, p99_us = _time_per_call(fn, iterations)
+        print(f"{name:<6} runner per request: mean={mean_us:8.2f} us  p99={p99_us:8.2f} us")
+
+
+def bench_cold_race(services, threads):
+    built = []
+
+    class SlowSessionService:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)  # engine creation + create_all
+            built.append(self)
+
+    def unlocked_factory():
+        # The factory as it was: a plain lazy global with no lock.
+        global _unlocked_instance
+        if _unlocked_instance is None:
+            _unlocked_instance = SlowSessionService()
+        return _unlocked_instance
+
+    def race(factory):
+        barrier = threading.Barrier(threads)
+
+        def worker():
+            barrier.wait()
+            factory()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+    global _unlocked_instance
+    _unlocked_instance = None
+    race(unlocked_factory)
+    print(f"before {threads} cold threads built {len(built)} session services")
+
+    built.clear()
+    original = services.CompactingDatabaseSessionService
+    services.CompactingDatabaseSessionService = SlowSessionService
+    services._session_service_instance = None
+    try:
+        race(services.get_session_service)
+    finally:
+        services.CompactingDatabaseSessionService = original
+    print(f"after  {threads} cold threads built {len(built)} session services")
+
+
+_unlocked_instance = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    toolbox, services = _setup()
+    try:
+        bench_lookup(services, args.iterations)
+        bench_cold_race(services, args.threads)
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Compares the WSGI and ASGI serving paths of ``agent/interact/``.
+
+Gemini and the MCP toolbox are replaced by the fakes in ``benchmarks.fakes``
+and sessions/memory are kept in memory, so only the serving path is measured.
+
+WSGI mode pushes every request through Django's sync handler (the async view
+runs under async_to_sync) with ``workers * threads`` request slots, matching
+gunicorn's sync workers. ASGI mode awaits the view directly on one event loop,
+matching a uvicorn worker.
+
+    python -m benchmarks.bench_serving --requests 400 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeToolboxServer, register_fake_llm
+
+INTERACT_URL = "/agent/interact/"
+
+
+def _payload(text="Show me all open tickets"):
+    return json.dumps(
+        {
+            "appName": "AgentBugAssistant",
+            "userId": "bench_user",
+            "sessionId": str(uuid.uuid4()),
+            "newMessage": {"role": "user", "parts": [{"text": text}]},
+        }
+    )
+
+
+def _setup(args):
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "fake-gemini"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    from benchmarks.fakes import FakeLlm
+
+    FakeLlm.latency = args.llm_latency_ms / 1000
+    register_fake_llm()
+
+    from google.adk.memory import InMemoryMemoryService
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_bug_ticket_agent import services
+
+    services._session_service_instance = InMemorySessionService()
+    services._memory_service_instance = InMemoryMemoryService()
+    services.warmup()
+    return toolbox
+
+
+def run_wsgi(n_requests, slots):
+    from django.test import Client
+
+    def one(_):
+        start = time.perf_counter()
+        response = Client().post(INTERACT_URL, _payload(), content_type="application/json")
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=slots) as pool:
+        latencies = list(pool.map(one, range(n_requests)))
+    return latencies, time.perf_counter() - start
+
+
+def run_asgi(n_requests, concurrency):
+    from django.test import AsyncClient
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        client = AsyncClient()
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(INTERACT_URL, _payload(), content_type="application/json")
+                assert response.status_code == 200, response.content
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(n_requests)))
+        return latencies, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def _report(name, latencies, elapsed):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{name:<5} requests={len(latencies):<5} throughput={len(latencies) / elapsed:8.1f} req/s  "
+        f"p50={statistics.median(ordered) * 1000:8.1f} ms  p99={p99 * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=200, help="in-flight requests for the ASGI worker")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn sync workers to emulate")
+    parser.add_argument("--threads", type=int, default=2, help="threads per sync worker")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    toolbox = _setup(args)
+    try:
+        _report("wsgi", *run_wsgi(args.requests, args.workers * args.threads))
+        _report("asgi", *run_asgi(args.requests, args.concurrency))
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
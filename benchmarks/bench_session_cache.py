@@ -0,0 +1,130 @@
+"""Database round-trips and turn overhead with and without the session cache.
+
+Runs ``--sessions`` conversations of ``--turns`` turns each through
+``agent/interact/`` (fake Gemini answering instantly after one ticket tool
+call, fake toolbox, fast path off), so the turn time is almost all
+session handling. Sessions live in a SQLite file, and every SQL statement
+waits ``--db-latency-ms`` first, like the network round-trip to Cloud SQL.
+Each run uses a fresh database. Once with CompactingDatabaseSessionService
+(every read and append goes to the database) and once with
+CachedDatabaseSessionService. Reported: statements and transactions per
+turn, and turn p50/p95.
+
+    python -m benchmarks.bench_session_cache --sessions 10 --turns 20 --db-latency-ms 1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import event
+
+from benchmarks.fakes import FakeLlm, FakeToolboxServer, register_fake_llm
+
+INTERACT_URL = "/agent/interact/"
+APP_NAME = "AgentBugAssistant"
+
+
+def _setup(args):
+    toolbox = FakeToolboxServer(latency=0)
+    os.environ["MCP_TOOLBOX_URL"] = toolbox.start()
+    os.environ["AGENT_MODEL"] = "fake-gemini"
+    os.environ["FAST_PATH_ENABLED"] = "false"
+    os.environ["MEMORY_INGESTION_ENABLED"] = "false"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+
+    import django
+
+    django.setup()
+    FakeLlm.latency = 0
+    register_fake_llm()
+
+    from google.adk.memory import InMemoryMemoryService
+
+    from adk_bug_ticket_agent import services
+
+    services._memory_service_instance = InMemoryMemoryService()
+    return toolbox
+
+
+def _use(service, db_latency):
+    """Makes ``service`` the worker's session service and counts its statements and commits."""
+    from adk_bug_ticket_agent import services
+
+    counts = {"statements": 0, "transactions": 0}
+
+    @event.listens_for(service.db_engine, "before_cursor_execute")
+    def before_cursor_execute(*_):
+        counts["statements"] += 1
+        if db_latency:
+            time.sleep(db_latency)
+
+    @event.listens_for(service.db_engine, "commit")
+    def commit(*_):
+        counts["transactions"] += 1
+
+    services._session_service_instance = service
+    services._runners.clear()
+    return counts
+
+
+async def _conversations(sessions, turns):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    latencies = []
+    for _ in range(sessions):
+        session_id = str(uuid.uuid4())
+        for turn in range(turns):
+            payload = json.dumps({
+                "appName": APP_NAME, "userId": "bench_user", "sessionId": session_id,
+                "newMessage": {"role": "user", "parts": [{"text": f"Show me the open tickets (turn {turn})"}]},
+            })
+            start = time.perf_counter()
+            response = await client.post(INTERACT_URL, payload, content_type="application/json")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.content
+    return latencies
+
+
+def _stored_events(service):
+    # Every turn must reach the database either way: 4 events per turn plus the compaction summaries.
+    with service.db_engine.connect() as connection:
+        return connection.exec_driver_sql("SELECT count(*) FROM events").scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--db-latency-ms", type=float, default=1)
+    args = parser.parse_args()
+
+    toolbox = _setup(args)
+    from adk_bug_ticket_agent.sessions import CachedDatabaseSessionService, CompactingDatabaseSessionService
+
+    try:
+        for name, service_class in (("database", CompactingDatabaseSessionService),
+                                    ("cached", CachedDatabaseSessionService)):
+            sessions_dir = tempfile.mkdtemp()
+            service = service_class(f"sqlite:///{os.path.join(sessions_dir, 'sessions.db')}")
+            counts = _use(service, args.db_latency_ms / 1000)
+            latencies = sorted(asyncio.run(_conversations(args.sessions, args.turns)))
+            n = len(latencies)
+            print(f"{name:<9} turns={n}  statements/turn={counts['statements'] / n:5.1f}  "
+                  f"transactions/turn={counts['transactions'] / n:4.2f}  "
+                  f"p50={statistics.median(latencies) * 1000:6.1f} ms  p95={latencies[int(n * 0.95)] * 1000:6.1f} ms  "
+                  f"events stored={_stored_events(service)}")
+            if hasattr(service, "snapshot"):
+                print(f"          {service.snapshot()}")
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Session load latency and prompt size with and without turn windowing.
+
+Builds sessions of increasing length in a SQLite database (or ``--db-url``),
+then times ``get_session`` and measures the contents ADK would send to the
+model, once with the full history (ThreadedDatabaseSessionService) and once
+with the window plus rolling summary (CompactingDatabaseSessionService).
+Tokens are estimated as characters / 4.
+
+    python -m benchmarks.bench_session_window --events 10 100 1000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from google.adk.events import Event
+from google.adk.flows.llm_flows.contents import _get_contents
+from google.genai import types as genai_types
+
+from adk_bug_ticket_agent import compaction
+from adk_bug_ticket_agent.sessions import CompactingDatabaseSessionService, ThreadedDatabaseSessionService
+
+APP_NAME = "AgentBugAssistant"
+USER_ID = "bench_user"
+AGENT_NAME = "it_bug_assistant_agent"
+EVENTS_PER_TURN = 4  # question, tool call, tool response, answer
+
+
+def _turn_events(i, timestamp):
+    tickets = ", ".join(
+        f'{{"ticket_id": {n}, "title": "Login page fails with 500 #{n}", "status": "Open", "priority": "P1 - High"}}'
+        for n in range(5)
+    )
+    yield Event(
+        invocation_id=f"inv-{i}", author="user", timestamp=timestamp,
+        content=genai_types.Content(role="user", parts=[genai_types.Part(text=f"Question {i}: which tickets are open for the login page?")]),
+    )
+    yield Event(
+        invocation_id=f"inv-{i}", author=AGENT_NAME, timestamp=timestamp + 0.001,
+        content=genai_types.Content(role="model", parts=[genai_types.Part(
+            function_call=genai_types.FunctionCall(id=f"call-{i}", name="get-tickets-by-status", args={"status": "Open"})
+        )]),
+    )
+    yield Event(
+        invocation_id=f"inv-{i}", author=AGENT_NAME, timestamp=timestamp + 0.002,
+        content=genai_types.Content(role="user", parts=[genai_types.Part(
+            function_response=genai_types.FunctionResponse(id=f"call-{i}", name="get-tickets-by-status", response={"result": f"[{tickets}]"})
+        )]),
+    )
+    yield Event(
+        invocation_id=f"inv-{i}", author=AGENT_NAME, timestamp=timestamp + 0.003,
+        content=genai_types.Content(role="model", parts=[genai_types.Part(
+            text=f"Answer {i}: there are five open login tickets, the most urgent is ticket 0 (P1 - High)."
+        )]),
+    )
+
+
+async def _populate(service, n_events):
+    session = await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=str(uuid.uuid4()))
+    start = time.time() - n_events
+    for i in range(n_events // EVENTS_PER_TURN):
+        for event in _turn_events(i, start + i):
+            await service.append_event(session, event)
+    return session.id
+
+
+def _prompt_chars(session):
+    contents = _get_contents(None, session.events, AGENT_NAME)
+    chars = sum(len(part.text or "") + len(str(part.function_call or "")) + len(str(part.function_response or ""))
+                for content in contents for part in content.parts)
+    return chars + len(session.state.get(compaction.SUMMARY_STATE_KEY, ""))
+
+
+async def _measure(service, session_id, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        session = await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, len(session.events), _prompt_chars(session) // 4
+
+
+async def main(args):
+    db_url = args.db_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'sessions.db')}"
+    full = ThreadedDatabaseSessionService(db_url)
+    windowed = CompactingDatabaseSessionService(db_url, window_turns=args.window_turns)
+    print(f"window={args.window_turns} turns, db={db_url}")
+    for n_events in args.events:
+        session_id = await _populate(full, n_events)
+        await windowed.compact_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+        for name, service in (("full", full), ("windowed", windowed)):
+            latency_ms, loaded, tokens = await _measure(service, session_id, args.repeats)
+            print(f"events={n_events:<5} {name:<8} get_session={latency_ms:7.2f} ms  "
+                  f"events_loaded={loaded:<5} prompt~{tokens:>6} tokens")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--window-turns", type=int, default=compaction.SESSION_WINDOW_TURNS)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--db-url", help="session database (defaults to a temporary SQLite file)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,164 @@
+"""Startup cost: cold imports, gunicorn boot to readiness, and the first request.
+
+Cold imports are timed in fresh interpreters: Django setup plus the URL conf
+(what ``manage.py`` commands load), the agent modules (ADK, Vertex AI, the
+toolbox client) and a whole ``manage.py check``.
+
+Then gunicorn is started with ``gunicorn.conf.py`` on the real app, once with
+PRELOAD_AGENT_MODULES on and once off. Sessions go to a temporary SQLite
+file, memory is in-memory and the MCP toolbox is the local fake, so no
+network or credentials are needed. Reported per run: time until /healthz
+answers (live), until /readyz answers 200 (a warm worker), until every
+worker has finished its warmup, and the latency of the first two POSTs
+("Show me ticket 7", answered by the fast path without a model call), plus
+the RSS of the workers.
+
+    python -m benchmarks.bench_startup --mode wsgi --workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import aiohttp
+
+from benchmarks.fakes import FakeToolboxServer
+from benchmarks.load_test import INTERACT_PATH, REPO_ROOT, _children, _free_port, _rss_mb
+
+IMPORTS = {
+    "django.setup + URL conf": "import django; django.setup(); import web_ui.urls",
+    "agent modules": "import django; django.setup(); import adk_bug_ticket_agent.services",
+}
+
+# Printed once per worker when its warmup is done (adk_bug_ticket_agent/health.py).
+WARM_MARKER = "Worker ready after"
+
+
+def _env(extra=None):
+    return dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="web_ui.settings",
+        PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])),
+        PYTHONWARNINGS="ignore",
+        **(extra or {}),
+    )
+
+
+def time_subprocess(command, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, env=_env(), check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+async def _post(session, base_url, text):
+    payload = {
+        "appName": "AgentBugAssistant",
+        "userId": "startup_user",
+        "sessionId": str(uuid.uuid4()),
+        "newMessage": {"role": "user", "parts": [{"text": text}]},
+    }
+    start = time.perf_counter()
+    async with session.post(base_url + INTERACT_PATH, json=payload) as response:
+        await response.read()
+        if response.status != 200:
+            raise RuntimeError(f"POST returned HTTP {response.status}")
+    return time.perf_counter() - start
+
+
+async def boot(args, toolbox_url, preload, log_path):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    db_path = Path(tempfile.mkdtemp()) / "sessions.db"
+    env = _env({
+        "SERVER_MODE": args.mode,
+        "WEB_CONCURRENCY": str(args.workers),
+        "PRELOAD_AGENT_MODULES": "true" if preload else "false",
+        "MCP_TOOLBOX_URL": toolbox_url,
+        "DB_URL": f"sqlite:///{db_path}",
+        "MEMORY_BACKEND": "inmemory",
+        "MEMORY_INGESTION_ENABLED": "false",
+        "PYTHONUNBUFFERED": "1",
+    })
+    app = "web_ui.asgi:application" if args.mode == "asgi" else "web_ui.wsgi:application"
+    with open(log_path, "w") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", app],
+            cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    result = {"preload": preload}
+    try:
+        async with aiohttp.ClientSession() as session:
+            while not {"live_s", "ready_s", "all_warm_s"} <= result.keys():
+                if process.poll() is not None:
+                    raise RuntimeError(f"gunicorn exited with status {process.returncode}; see {log_path}")
+                if time.perf_counter() - start > args.timeout:
+                    raise RuntimeError(f"gunicorn was not ready within {args.timeout} s; see {log_path}")
+                for key, path in (("live_s", "/healthz"), ("ready_s", "/readyz")):
+                    if key not in result:
+                        try:
+                            async with session.get(base_url + path) as response:
+                                if response.status == 200:
+                                    result[key] = time.perf_counter() - start
+                        except aiohttp.ClientError:
+                            pass
+                if "all_warm_s" not in result and Path(log_path).read_text().count(WARM_MARKER) >= args.workers:
+                    result["all_warm_s"] = time.perf_counter() - start
+                await asyncio.sleep(0.05)
+            result["first_request_ms"] = await _post(session, base_url, "Show me ticket 7") * 1000
+            result["second_request_ms"] = await _post(session, base_url, "Show me ticket 8") * 1000
+        result["worker_rss_mb"] = sorted(round(_rss_mb(pid), 1) for pid in _children(process.pid))
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["wsgi", "asgi"], default="wsgi")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=3, help="runs per cold import measurement")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--server-log", default=os.path.join(tempfile.gettempdir(), "bench_startup_gunicorn.log"))
+    args = parser.parse_args()
+
+    for label, code in IMPORTS.items():
+        seconds = time_subprocess([sys.executable, "-c", code], args.repeats)
+        print(f"cold import, {label:<24} {seconds:6.2f} s")
+    seconds = time_subprocess([sys.executable, "manage.py", "check"], args.repeats)
+    print(f"manage.py check                       {seconds:6.2f} s")
+
+    toolbox = FakeToolboxServer(latency=0.01)
+    toolbox_url = toolbox.start()
+    try:
+        for preload in (False, True):
+            result = asyncio.run(boot(args, toolbox_url, preload, args.server_log))
+            print(
+                f"{args.mode} workers={args.workers} preload_agent_modules={'on ' if preload else 'off'} "
+                f"live={result['live_s']:5.2f} s  ready={result['ready_s']:5.2f} s  all_workers_warm={result['all_warm_s']:5.2f} s  "
+                f"first_request={result['first_request_ms']:7.1f} ms  second_request={result['second_request_ms']:6.1f} ms  "
+                f"worker_rss_mb={result['worker_rss_mb']}"
+            )
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Size and latency of a list tool result before and after pagination.
+
+Calls get-tickets-by-status through the worker's pooled toolbox client
+against the fake toolbox, for ``--matches`` tickets matching the status.
+"before" returns every matching ticket with all columns, the way
+``SELECT *`` did: the description and the 768-dim embedding included
+("before, no embedding" for a table without the embedding column).
+"after" returns the first page of ``--page-size`` tickets with the projected
+columns and the total count, re-encoded as columns and rows. Reported per
+size: the latency of the call (HTTP hop, JSON decoding and encoding), the
+characters handed to the model and a token estimate (4 characters per
+token). No database is involved; bench_ticket_queries times the statements
+in Postgres.
+
+    python -m benchmarks.bench_ticket_pages --matches 100 500 2000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.fakes import FakeToolboxServer, fake_tickets
+
+PROJECTED = ("ticket_id", "title", "assignee", "priority", "status", "creation_time", "updated_time")
+
+
+def _tickets(n, seed=7):
+    rng = random.Random(seed)
+    tickets = fake_tickets(n)
+    for ticket in tickets:
+        ticket["status"] = "Open"
+        ticket["description"] = " ".join(
+            rng.choice(["login", "page", "fails", "after", "timeout", "the", "user", "error", "export", "widget"])
+            for _ in range(60))
+        ticket["embedding"] = [round(rng.uniform(-0.1, 0.1), 9) for _ in range(768)]
+    return tickets
+
+
+async def _measure(url, page_size, calls):
+    from adk_bug_ticket_agent.tools.toolbox import ToolboxPool, ToolboxToolset, ToolResultCache
+
+    toolset = ToolboxToolset("tickets_toolset", pool=ToolboxPool(url), bound_params={"page_size": page_size})
+    toolset.result_cache = ToolResultCache(ttl=0)
+    tool = next(t for t in await toolset.get_tools() if t.name == "get-tickets-by-status")
+    latencies = []
+    try:
+        for _ in range(calls):
+            start = time.perf_counter()
+            result = await tool.func(status="Open", after_ticket_id=0)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await toolset.close()
+    return statistics.median(latencies), len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--calls", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'matches':>8} {'':<20} {'p50 ms':>9} {'chars':>11} {'~tokens':>10}")
+    for n in args.matches:
+        full = _tickets(n)
+        without_embedding = [{name: value for name, value in ticket.items() if name != "embedding"} for ticket in full]
+        projected = [{name: ticket[name] for name in PROJECTED} for ticket in full]
+        for label, rows, paged in (("before", full, False), ("before, no embedding", without_embedding, False),
+                                   ("after", projected, True)):
+            toolbox = FakeToolboxServer(latency=0, rows=rows, paged=paged)
+            try:
+                seconds, chars = asyncio.run(_measure(toolbox.start(), args.page_size, args.calls))
+            finally:
+                toolbox.stop()
+            print(f"{n:>8} {label:<20} {seconds * 1000:9.1f} {chars:>11,} {chars // 4:>10,}")
+
+
+if __name__ == "__main__":
+    main()
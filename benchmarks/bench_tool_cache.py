@@ -0,0 +1,92 @@
+"""Read-only ticket tool calls with and without the read-through result cache.
+
+Replays agent-like traffic against the fake toolbox: each turn makes a few
+read calls drawn from a small set of popular arguments, repeating some of
+them, and every ``--write-every`` turns a status update clears the cache.
+
+    python -m benchmarks.bench_tool_cache --turns 300 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.fakes import FakeToolboxServer
+
+READS = [
+    ("get-tickets-by-status", {"status": "Open", "after_ticket_id": 0}),
+    ("get-tickets-by-status", {"status": "In Progress", "after_ticket_id": 0}),
+    ("get-tickets-by-priority", {"priority": "P0", "after_ticket_id": 0}),
+    ("get-tickets-by-priority", {"priority": "P1", "after_ticket_id": 0}),
+    ("get-tickets-by-assignee", {"assignee": "samuel.green@example.com", "after_ticket_id": 0}),
+    ("get-ticket-by-id", {"ticket_id": "7"}),
+    ("get-ticket-by-id", {"ticket_id": "12"}),
+]
+WRITE = ("update-ticket-status", {"status": "Closed", "ticket_id": "7"})
+
+
+def _turns(n_turns, write_every, seed=7):
+    rng = random.Random(seed)
+    turns = []
+    for i in range(n_turns):
+        calls = [rng.choice(READS) for _ in range(rng.randint(1, 3))]
+        calls.append(calls[0])  # the model re-reads within the turn
+        if write_every and i % write_every == write_every - 1:
+            calls.append(WRITE)
+        turns.append(calls)
+    return turns
+
+
+async def _run(url, ttl, turns, concurrency):
+    from adk_bug_ticket_agent.tools.toolbox import TICKET_PAGE_SIZE, ToolboxPool, ToolboxToolset, ToolResultCache
+
+    toolset = ToolboxToolset("tickets_toolset", pool=ToolboxPool(url), bound_params={"page_size": TICKET_PAGE_SIZE})
+    toolset.result_cache = ToolResultCache(ttl=ttl)
+    tools = {tool.name: tool.func for tool in await toolset.get_tools()}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def turn(calls):
+        async with semaphore:
+            for name, args in calls:
+                start = time.perf_counter()
+                await tools[name](**args)
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(turn(calls) for calls in turns))
+    finally:
+        await toolset.close()
+    return latencies, time.perf_counter() - start, toolset.result_cache.snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-every", type=int, default=10)
+    parser.add_argument("--ttl", type=float, default=30)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    server = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    url = server.start()
+    turns = _turns(args.turns, args.write_every)
+    try:
+        for name, ttl in (("no cache", 0), ("cache", args.ttl)):
+            invocations = server.invocations
+            latencies, elapsed, stats = asyncio.run(_run(url, ttl, turns, args.concurrency))
+            print(
+                f"{name:<8} tool_calls={len(latencies)} toolbox_invocations={server.invocations - invocations} "
+                f"mean={statistics.mean(latencies) * 1000:6.1f} ms  p50={statistics.median(latencies) * 1000:6.1f} ms  "
+                f"elapsed={elapsed:5.2f} s  hit_rate={stats['hit_rate']:.2f} invalidations={stats['invalidations']}"
+            )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
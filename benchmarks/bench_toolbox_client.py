@@ -0,0 +1,93 @@
+"""Concurrent ticket tool calls: sync toolbox client in threads vs. the pooled async client.
+
+"before" is how tools.py called the toolbox: ToolboxSyncClient tools run in
+the default thread pool (``asyncio.to_thread``) from an async view. "after"
+goes through ``ToolboxToolset`` and its shared keep-alive aiohttp pool. Both
+fire ``--calls`` calls from one event loop, ``--concurrency`` at a time,
+against the fake toolbox.
+
+    python -m benchmarks.bench_toolbox_client --calls 400 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.fakes import FakeToolboxServer
+
+TOOL_NAME = "get-tickets-by-status"
+# page_size is passed like any argument, as neither client binds it here.
+TOOL_ARGS = {"status": "Open", "after_ticket_id": 0, "page_size": 25}
+
+
+async def _fire(call, n_calls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call(**TOOL_ARGS)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(n_calls)))
+    return latencies, time.perf_counter() - start
+
+
+async def bench_before(url, n_calls, concurrency):
+    from toolbox_core import ToolboxSyncClient
+
+    client = ToolboxSyncClient(url)
+    tool = next(t for t in client.load_toolset("tickets_toolset") if t.__name__ == TOOL_NAME)
+
+    async def call(**kwargs):
+        return await asyncio.to_thread(tool, **kwargs)
+
+    try:
+        return await _fire(call, n_calls, concurrency)
+    finally:
+        client.close()
+
+
+async def bench_after(url, n_calls, concurrency):
+    from adk_bug_ticket_agent.tools.toolbox import ToolboxPool, ToolboxToolset
+
+    toolset = ToolboxToolset("tickets_toolset", pool=ToolboxPool(url))
+    tool = next(t for t in await toolset.get_tools() if t.name == TOOL_NAME)
+    try:
+        return await _fire(tool.func, n_calls, concurrency)
+    finally:
+        await toolset.close()
+
+
+def _report(name, latencies, elapsed, server, invocations_before, connections_before):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{name:<6} calls={server.invocations - invocations_before:<5} "
+        f"throughput={len(latencies) / elapsed:8.1f} calls/s  p50={statistics.median(ordered) * 1000:7.1f} ms  "
+        f"p99={p99 * 1000:7.1f} ms  connections={server.connections - connections_before}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    server = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    url = server.start()
+    try:
+        for name, bench in (("before", bench_before), ("after", bench_after)):
+            invocations, connections = server.invocations, server.connections
+            latencies, elapsed = asyncio.run(bench(url, args.calls, args.concurrency))
+            _report(name, latencies, elapsed, server, invocations, connections)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Throughput of batch triage by worker count and rate limit, failures, and resuming a run.
+
+Generates ``--reports`` synthetic bug reports: about 10% repeat an earlier
+title, 2% are malformed lines, and ``search-tickets`` finds a duplicate
+for a share set by the fake toolbox's query distances. The fake toolbox
+answers in ``--tool-latency-ms`` and fails ``--error-rate`` of the calls
+(retried by the pipeline). Reported per run: reports per second, outcomes,
+failed reports, retries and per-report p50/p95.
+
+The last run is cut after half the reports with ``limit`` and rerun with
+the same results file, to show it resuming where it stopped.
+
+    python -m benchmarks.bench_triage --reports 400 --workers 1 8 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+
+from benchmarks.fakes import FakeToolboxServer
+
+COMPONENTS = ["login page", "export button", "sales widget", "password reset", "search bar", "invoice PDF"]
+SYMPTOMS = ["times out", "returns a 500", "shows stale data", "freezes", "crashes the tab", "is blank"]
+
+
+def _reports(n, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        roll = rng.random()
+        if roll < 0.02:
+            lines.append("{not json")
+            continue
+        if roll < 0.12 and lines:
+            earlier = next((json.loads(line) for line in reversed(lines) if line.startswith("{\"")), None)
+            if earlier is not None:
+                lines.append(json.dumps(dict(earlier, id=f"r{i}")))
+                continue
+        title = f"{rng.choice(COMPONENTS).capitalize()} {rng.choice(SYMPTOMS)} (#{i})"
+        lines.append(json.dumps({
+            "id": f"r{i}",
+            "title": title,
+            "description": f"{title}. Seen by {rng.randint(1, 50)} users since the last deploy.",
+            "priority": rng.choice(["P0", "P1", "P2", "P3"]),
+            "assignee": f"user{rng.randint(0, 6)}@example.com",
+        }))
+    return "\n".join(lines) + "\n"
+
+
+async def _run(url, input_path, results_path, workers, qps, limit=None):
+    from adk_bug_ticket_agent.tools.toolbox import SEARCH_MAX_DISTANCE, SEARCH_TOP_K, ToolboxPool, ToolboxToolset
+    from adk_bug_ticket_agent.triage import TriagePipeline
+
+    toolset = ToolboxToolset("tickets_toolset", pool=ToolboxPool(url),
+                             bound_params={"top_k": SEARCH_TOP_K, "max_distance": SEARCH_MAX_DISTANCE})
+    pipeline = TriagePipeline(toolset, workers=workers, queries_per_second=qps, searches_per_second=0,
+                              retry_seconds=0.05)
+    try:
+        stats = await pipeline.run(input_path, results_path, limit=limit)
+    finally:
+        await toolset.close()
+    return stats, pipeline.errors
+
+
+def _latencies(results_path):
+    with open(results_path) as results:
+        seconds = sorted(json.loads(line)["seconds"] for line in results)
+    return statistics.median(seconds), seconds[int(len(seconds) * 0.95)]
+
+
+def _report(label, stats, errors, results_path):
+    p50, p95 = _latencies(results_path)
+    print(f"{label:<28} {stats['items_per_second']:7.1f} reports/s  created={stats['created']:<4} "
+          f"updated={stats['updated']:<4} duplicate={stats['duplicate']:<4} failed={stats['failed']:<3} "
+          f"retries={stats['retries']:<4} p50={p50 * 1000:6.1f} ms  p95={p95 * 1000:6.1f} ms")
+    if errors:
+        print(f"{'':<28} failures: " + "; ".join(f"{count} x {error[:60]}" for error, count in errors.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--queries-per-second", type=float, default=50, help="for the rate-limited run")
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    input_path = os.path.join(workdir, "reports.jsonl")
+    with open(input_path, "w") as f:
+        f.write(_reports(args.reports))
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000, error_rate=args.error_rate)
+    url = toolbox.start()
+    try:
+        runs = [(f"workers={w}", w, 0) for w in args.workers]
+        runs.append((f"workers={max(args.workers)} qps={args.queries_per_second:g}", max(args.workers),
+                     args.queries_per_second))
+        for i, (label, workers, qps) in enumerate(runs):
+            results_path = os.path.join(workdir, f"results-{i}.jsonl")
+            stats, errors = asyncio.run(_run(url, input_path, results_path, workers, qps))
+            _report(label, stats, errors, results_path)
+
+        results_path = os.path.join(workdir, "results-resume.jsonl")
+        workers = max(args.workers)
+        first, _ = asyncio.run(_run(url, input_path, results_path, workers, 0, limit=args.reports // 2))
+        second, _ = asyncio.run(_run(url, input_path, results_path, workers, 0))
+        print(f"resume: first run stopped after {first['items']} reports; second run skipped "
+              f"{second['skipped']} and triaged {second['items']} (of which {second['failed']} failed)")
+    finally:
+        toolbox.stop()
+
+
+if __name__ == "__main__":
+    main()
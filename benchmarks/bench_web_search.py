@@ -0,0 +1,113 @@
+"""Web search latency with and without the result cache, and the per-turn budget.
+
+Sends ``--lookups`` web searches, one per simulated agent turn, drawn from a
+pool of ``--distinct`` queries with a skewed (Zipf-like) popularity, the way
+the same CVE or outage is looked up by many users. Two search paths are
+measured, each with the cache off and on:
+
+- ``sub-agent``: a stand-in for search_agent that takes ``--agent-latency-ms``
+  (a nested Gemini call with grounding; no network is used here)
+- ``snippets``: the web_search function tool on the stub backend with
+  ``--snippet-latency-ms``
+
+Finally one turn issues three slow searches against a ``--budget`` second
+budget to show the later ones being cancelled.
+
+    python -m benchmarks.bench_web_search --lookups 300 --distinct 40
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from adk_bug_ticket_agent.tools import web_search as web_search_module
+from adk_bug_ticket_agent.tools.web_search import StubSearchBackend, WebSearchCache
+
+
+def _queries(n, distinct, seed):
+    rng = random.Random(seed)
+    pool = [f"known issues CVE-2025-{1000 + i} login service" for i in range(distinct)]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    return rng.choices(pool, weights=weights, k=n)
+
+
+async def _run(queries, concurrency, lookup):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i, query):
+        async with semaphore:
+            start = time.perf_counter()
+            await lookup(query, f"turn-{i}")
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i, query) for i, query in enumerate(queries)))
+    return sorted(latencies), time.perf_counter() - start
+
+
+def _report(label, latencies, elapsed, cache, backend_calls):
+    stats = cache.snapshot()
+    print(
+        f"{label:<22} throughput={len(latencies) / elapsed:7.1f} lookups/s  "
+        f"p50={statistics.median(latencies) * 1000:7.1f} ms  p95={latencies[int(len(latencies) * 0.95)] * 1000:7.1f} ms  "
+        f"hit_rate={stats['hit_rate']:5.1%}  searches={backend_calls}"
+    )
+
+
+async def _budget_turn(budget, search_seconds):
+    cache = WebSearchCache(ttl=0, budget=budget)
+    outcomes = []
+    start = time.perf_counter()
+    for i in range(3):
+        result = await cache.lookup(f"slow query {i}", "budget-turn", lambda: asyncio.sleep(search_seconds, "done"))
+        outcomes.append("ok" if result == "done" else result["error"].split(".")[0])
+    return time.perf_counter() - start, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=300)
+    parser.add_argument("--distinct", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--agent-latency-ms", type=float, default=3000)
+    parser.add_argument("--snippet-latency-ms", type=float, default=400)
+    parser.add_argument("--budget", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    queries = _queries(args.lookups, args.distinct, args.seed)
+    for ttl in (0, 3600):
+        cache = WebSearchCache(ttl=ttl, budget=60)
+        calls = {"n": 0}
+
+        async def sub_agent():
+            calls["n"] += 1
+            await asyncio.sleep(args.agent_latency_ms / 1000)
+            return "Summary of the known issues."
+
+        latencies, elapsed = asyncio.run(_run(queries, args.concurrency,
+                                              lambda query, turn: cache.lookup(query, turn, sub_agent)))
+        _report(f"sub-agent cache={'on' if ttl else 'off'}", latencies, elapsed, cache, calls["n"])
+
+    for ttl in (0, 3600):
+        cache = WebSearchCache(ttl=ttl, budget=60)
+        backend = StubSearchBackend(latency=args.snippet_latency_ms / 1000)
+        web_search_module.web_search_cache, web_search_module._search_backend = cache, backend
+
+        async def tool_call(query, turn):
+            return await web_search_module.web_search(query, SimpleNamespace(invocation_id=turn))
+
+        latencies, elapsed = asyncio.run(_run(queries, args.concurrency, tool_call))
+        _report(f"snippets cache={'on' if ttl else 'off'}", latencies, elapsed, cache, backend.calls)
+
+    search_seconds = args.budget * 0.8
+    elapsed, outcomes = asyncio.run(_budget_turn(args.budget, search_seconds))
+    print(f"one turn, 3 searches of {search_seconds:.1f} s, budget {args.budget:.1f} s: "
+          f"finished in {elapsed:.2f} s, outcomes={outcomes}")
+
+
+if __name__ == "__main__":
+    main()
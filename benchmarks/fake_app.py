@@ -0,0 +1,32 @@
+"""The Django app with Gemini and the memory service replaced by the fakes, for gunicorn.
+
+Used by ``benchmarks.load_test``; the fake toolbox runs in the harness process
+and is reached through MCP_TOOLBOX_URL. FAKE_LLM_LATENCY_MS and
+FAKE_MEMORY_LATENCY_MS set the fake latencies. Sessions are kept in memory
+per worker unless LOAD_TEST_DB_URL names a session database.
+
+    gunicorn --config gunicorn.conf.py benchmarks.fake_app:wsgi_application
+    SERVER_MODE=asgi gunicorn --config gunicorn.conf.py benchmarks.fake_app:asgi_application
+"""
+
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
+os.environ["AGENT_MODEL"] = os.environ.get("AGENT_MODEL", "fake-gemini")
+
+from benchmarks.fakes import FakeMemoryService, register_fake_llm  # noqa: E402
+
+register_fake_llm()
+
+from google.adk.sessions import InMemorySessionService  # noqa: E402
+
+from adk_bug_ticket_agent import services  # noqa: E402
+
+if os.environ.get("LOAD_TEST_DB_URL"):
+    services.DB_URL = os.environ["LOAD_TEST_DB_URL"]
+else:
+    services._session_service_instance = InMemorySessionService()
+services._memory_service_instance = FakeMemoryService()
+
+from web_ui.asgi import application as asgi_application  # noqa: E402
+from web_ui.wsgi import application as wsgi_application  # noqa: E402
@@ -0,0 +1,280 @@
+"""Local stand-ins for Gemini, the MCP toolbox and the memory service used by the benchmarks.
+
+FakeLlm registers itself with ADK's LLMRegistry for model names matching
+``fake-.*``, so setting ``AGENT_MODEL=fake-gemini`` swaps it in without code
+changes. The fake toolbox serves the toolbox HTTP API for every tool in
+``mcp-server/mcp-toolbox/tools.yaml`` and answers with synthetic tickets,
+in pages shaped like the list tools' when the call carries a page_size.
+search-tickets gets distances derived from the query, the count tools the
+tickets counted by their group_by, create-new-ticket a new ticket id and the
+updates no rows; ``error_rate`` fails that share of the calls with HTTP 500.
+FakeMemoryService is ADK's InMemoryMemoryService with added latency.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import zlib
+from pathlib import Path
+from typing import AsyncGenerator, ClassVar
+
+import yaml
+from aiohttp import web
+from google.adk.memory import InMemoryMemoryService
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from google.genai import types
+
+TOOLS_YAML = Path(__file__).resolve().parent.parent / "mcp-server" / "mcp-toolbox" / "tools.yaml"
+
+FAKE_ANSWER = (
+    "I found the following tickets:\n\n"
+    "| ticket_id | title | priority | status |\n"
+    "|---|---|---|---|\n"
+    "| 1 | Login Page Freezes After Multiple Failed Attempts | P1 - High | Open |\n"
+    "| 2 | Dashboard Sales Widget Intermittent Data Loading Failure | P2 - Medium | Open |\n\n"
+    "Is there anything else I can help you with?"
+)
+
+
+# Questions containing one of these make FakeLlm call load_memory instead of a ticket tool.
+MEMORY_WORDS = ("remember", "earlier", "last time")
+
+
+class FakeLlm(BaseLlm):
+    """Scripted model: calls load_memory or one read-only ticket tool, then answers with a table."""
+
+    latency: ClassVar[float] = float(os.environ.get("FAKE_LLM_LATENCY_MS", 200)) / 1000
+    calls: ClassVar[int] = 0
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        FakeLlm.calls += 1
+        await asyncio.sleep(self.latency)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered = last is not None and any(p.function_response for p in last.parts or [])
+        tool_names = [
+            decl.name
+            for tool in (llm_request.config.tools or [])
+            for decl in (tool.function_declarations or [])
+        ]
+        # Rough token counts (4 characters per token) so usage metrics have something to report.
+        prompt_chars = sum(len(p.text or "") for c in llm_request.contents for p in c.parts or [])
+        question = " ".join(p.text or "" for p in last.parts or []).lower() if last is not None else ""
+        if not answered and "load_memory" in tool_names and any(w in question for w in MEMORY_WORDS):
+            yield LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part(function_call=types.FunctionCall(name="load_memory", args={"query": question}))],
+                )
+            )
+            return
+        if not answered and "get-tickets-by-status" in tool_names:
+            yield LlmResponse(
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=prompt_chars // 4, candidates_token_count=10
+                ),
+                content=types.Content(
+                    role="model",
+                    parts=[
+                        types.Part(
+                            function_call=types.FunctionCall(
+                                name="get-tickets-by-status", args={"status": "Open", "after_ticket_id": 0}
+                            )
+                        )
+                    ],
+                )
+            )
+            return
+        if stream:
+            # Mirror Gemini's SSE mode: partial chunks, then the aggregated text.
+            for line in FAKE_ANSWER.splitlines(keepends=True):
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part.from_text(text=line)]),
+                    partial=True,
+                )
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part.from_text(text=FAKE_ANSWER)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // 4, candidates_token_count=len(FAKE_ANSWER) // 4
+            ),
+        )
+
+
+def register_fake_llm():
+    LLMRegistry.register(FakeLlm)
+
+
+class FakeMemoryService(InMemoryMemoryService):
+    """Keyword memory that takes ``latency`` seconds per add and search, like a remote corpus."""
+
+    def __init__(self, latency=float(os.environ.get("FAKE_MEMORY_LATENCY_MS", 100)) / 1000):
+        super().__init__()
+        self.latency = latency
+
+    async def add_session_to_memory(self, session):
+        await asyncio.sleep(self.latency)
+        await super().add_session_to_memory(session)
+
+    async def search_memory(self, *, app_name, user_id, query):
+        await asyncio.sleep(self.latency)
+        return await super().search_memory(app_name=app_name, user_id=user_id, query=query)
+
+
+def fake_tickets(count=25):
+    statuses = ["Open", "In Progress", "Closed", "Resolved"]
+    priorities = ["P0 - Critical", "P1 - High", "P2 - Medium", "P3 - Low"]
+    return [
+        {
+            "ticket_id": i,
+            "title": f"Synthetic ticket {i}",
+            "description": f"Synthetic description for ticket {i}.",
+            "assignee": f"user{i % 7}@example.com",
+            "priority": priorities[i % len(priorities)],
+            "status": statuses[i % len(statuses)],
+            "creation_time": "2025-01-01T00:00:00Z",
+            "updated_time": "2025-01-02T00:00:00Z",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _load_manifest():
+    config = yaml.safe_load(TOOLS_YAML.read_text())
+    tools = {
+        name: {
+            "description": spec["description"],
+            "parameters": [
+                {"name": p["name"], "type": p["type"], "description": p["description"], "authSources": []}
+                for p in spec.get("parameters", [])
+            ],
+        }
+        for name, spec in config["tools"].items()
+    }
+    return tools, config["toolsets"]
+
+
+def fake_page(rows, after_ticket_id, page_size):
+    """Rows the way the paginated list tools return them: total_count on each, page_size + 1 rows past the cursor."""
+    page = [row for row in rows if row["ticket_id"] > after_ticket_id][:page_size + 1]
+    if not page:
+        page = [dict.fromkeys(rows[0] if rows else ["ticket_id"])]
+    return [dict({"total_count": len(rows)}, **row) for row in page]
+
+
+def fake_counts(rows, group_by):
+    """Rows the way the count tools return them: the grouped columns (others null) and a tickets count."""
+    dims = group_by.replace(" ", "").lower().split(",")
+    counts = {}
+    for row in rows:
+        key = tuple(row.get(dim) if dim in dims else None for dim in ("status", "priority", "assignee"))
+        counts[key] = counts.get(key, 0) + 1
+    return [{"status": status, "priority": priority, "assignee": assignee, "tickets": tickets}
+            for (status, priority, assignee), tickets in sorted(counts.items(), key=lambda item: -item[1])]
+
+
+def search_distance(query):
+    """Distance of the nearest fake ticket to ``query``: spread evenly over [0, 1) and stable per query."""
+    return zlib.crc32(query.encode()) % 1000 / 1000
+
+
+def build_fake_toolbox_app(latency=0.05, rows=None, paged=True, error_rate=0.0, seed=7):
+    """aiohttp application implementing the toolbox endpoints used by toolbox-core.
+
+    With ``paged`` off every call returns all rows, like the list tools before pagination.
+    """
+    tools, toolsets = _load_manifest()
+    rows = fake_tickets() if rows is None else rows
+    stats = {"invocations": 0, "peers": set(), "created": 0, "errors": 0}
+    rng = random.Random(seed)
+
+    async def get_toolset(request):
+        names = toolsets.get(request.match_info["name"], [])
+        return web.json_response({"serverVersion": "fake", "tools": {n: tools[n] for n in names}})
+
+    async def get_tool(request):
+        name = request.match_info["name"]
+        return web.json_response({"serverVersion": "fake", "tools": {name: tools[name]}})
+
+    async def invoke(request):
+        stats["invocations"] += 1
+        stats["peers"].add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(latency)
+        body = await request.json() if request.can_read_body else {}
+        name = request.match_info["name"]
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return web.json_response({"error": "injected failure"}, status=500)
+        if name == "search-tickets":
+            distance = search_distance(body.get("query") or "")
+            found = [dict(row, distance=round(distance + 0.1 * i, 3)) for i, row in enumerate(rows[:body.get("top_k", 3)])]
+            return web.json_response({"result": json.dumps(found)})
+        if name == "create-new-ticket":
+            stats["created"] += 1
+            return web.json_response({"result": json.dumps([{"ticket_id": len(rows) + stats["created"]}])})
+        if name.startswith("update-ticket-"):
+            return web.json_response({"result": "null"})
+        if name.startswith("get-ticket-counts"):
+            return web.json_response({"result": json.dumps(fake_counts(rows, body.get("group_by") or "none"))})
+        if paged and "page_size" in body:
+            return web.json_response({"result": json.dumps(fake_page(rows, body.get("after_ticket_id") or 0,
+                                                                     body["page_size"]))})
+        return web.json_response({"result": json.dumps(rows)})
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_get("/api/toolset/{name}", get_toolset)
+    app.router.add_get("/api/tool/{name}", get_tool)
+    app.router.add_post("/api/tool/{name}/invoke", invoke)
+    return app
+
+
+class FakeToolboxServer:
+    """Runs the fake toolbox on its own event loop thread so sync callers can use it."""
+
+    def __init__(self, latency=0.05, host="127.0.0.1", port=0, rows=None, paged=True, error_rate=0.0):
+        self.app = build_fake_toolbox_app(latency, rows, paged, error_rate)
+        self.host = host
+        self.port = port
+        self.url = None
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+
+    def start(self):
+        started = threading.Event()
+
+        async def serve():
+            self._runner = web.AppRunner(self.app)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://{self.host}:{port}"
+            started.set()
+
+        def run():
+            self._loop.run_until_complete(serve())
+            self._loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait(10)
+        return self.url
+
+    @property
+    def invocations(self):
+        return self.app["stats"]["invocations"]
+
+    @property
+    def connections(self):
+        """Distinct client connections that invoked a tool."""
+        return len(self.app["stats"]["peers"])
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
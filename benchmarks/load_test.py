@@ -0,0 +1,291 @@
+"""Load test of the real gunicorn serving path with scripted multi-turn conversations.
+
+Starts gunicorn with ``gunicorn.conf.py`` on ``benchmarks.fake_app`` (fake
+Gemini and memory service) plus the fake MCP toolbox, then runs
+``--concurrency`` virtual users against ``agent/interact/``. Each user plays
+conversations from the script turn by turn in one session. Reports
+throughput, p50/p95/p99 latency, errors and the peak RSS of each worker for
+every concurrency level. No network or GCP credentials are needed.
+
+    python -m benchmarks.load_test --mode asgi --workers 2 --concurrency 10 50 100
+    python -m benchmarks.load_test --mode wsgi --output wsgi.json
+    python -m benchmarks.load_test --baseline wsgi.json --max-regression 0.15
+
+``--script`` takes a JSON file with a list of conversations, each a list of
+user messages. With ``--baseline`` the run fails (exit status 1) when
+throughput drops or p95 latency grows by more than ``--max-regression``
+against the same concurrency level of a previous ``--output`` file.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import aiohttp
+
+from benchmarks.fakes import FakeToolboxServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INTERACT_PATH = "/agent/interact/"
+
+CONVERSATIONS = [
+    ["Show me all the tickets with status Open", "Which of them are P0?", "Show me ticket 7"],
+    ["Which issues are currently marked as In Progress?", "Who is assigned to the login page bug?"],
+    ["List the tickets with highest priority", "Can you bump the priority of ticket 7 to P0?",
+     "Show me ticket 7 again"],
+    ["Any tickets about password reset emails?", "What did we find about password resets last time?"],
+    ["all bugs that are assigned to user@example.com", "Do you remember which ones were blocked earlier?",
+     "Thanks, show me the open ones"],
+]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid):
+    children = []
+    for entry in Path("/proc").iterdir():
+        if entry.name.isdigit():
+            try:
+                if int((entry / "stat").read_text().rsplit(")", 1)[1].split()[1]) == pid:
+                    children.append(int(entry.name))
+            except (OSError, IndexError, ValueError):
+                continue
+    return children
+
+
+def _rss_mb(pid):
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class RssSampler:
+    """Peak resident memory of each gunicorn worker, sampled from /proc (Linux)."""
+
+    def __init__(self, master_pid, interval=0.5):
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peak = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            for pid in _children(self.master_pid):
+                self.peak[pid] = max(self.peak.get(pid, 0.0), _rss_mb(pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = {}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def start_gunicorn(args, toolbox_url, port):
+    env = dict(
+        os.environ,
+        SERVER_MODE=args.mode,
+        WEB_CONCURRENCY=str(args.workers),
+        MCP_TOOLBOX_URL=toolbox_url,
+        FAKE_LLM_LATENCY_MS=str(args.llm_latency_ms),
+        FAKE_MEMORY_LATENCY_MS=str(args.memory_latency_ms),
+        AGENT_MODEL="fake-gemini",
+        PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])),
+    )
+    if args.db_url:
+        env["LOAD_TEST_DB_URL"] = args.db_url
+    app = "benchmarks.fake_app:asgi_application" if args.mode == "asgi" else "benchmarks.fake_app:wsgi_application"
+    command = [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", app]
+    if args.mode == "wsgi":
+        command[5:5] = ["--threads", str(args.threads)]
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+async def wait_until_ready(base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {process.returncode}; see --server-log")
+            try:
+                async with session.get(base_url + "/readyz") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"gunicorn did not answer within {timeout} s")
+
+
+async def run_level(base_url, conversations, concurrency, duration, timeout, seed):
+    """``concurrency`` users play conversations back to back for ``duration`` seconds."""
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    rng = random.Random(seed)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        async def user(user_index):
+            user_rng = random.Random(rng.random())
+            while time.monotonic() < deadline:
+                session_id = str(uuid.uuid4())
+                for text in user_rng.choice(conversations):
+                    payload = {
+                        "appName": "AgentBugAssistant",
+                        "userId": f"load_user_{user_index}",
+                        "sessionId": session_id,
+                        "newMessage": {"role": "user", "parts": [{"text": text}]},
+                    }
+                    start = time.perf_counter()
+                    try:
+                        async with session.post(base_url + INTERACT_PATH, json=payload) as response:
+                            await response.read()
+                            if response.status != 200:
+                                errors.append(f"HTTP {response.status}")
+                                continue
+                        latencies.append(time.perf_counter() - start)
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        errors.append(type(e).__name__)
+                    if time.monotonic() >= deadline:
+                        return
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def summarize(concurrency, latencies, errors, elapsed, peak_rss):
+    ordered = sorted(latencies)
+    return {
+        "concurrency": concurrency,
+        "turns": len(ordered),
+        "errors": len(errors),
+        "error_kinds": sorted(set(errors)),
+        "throughput": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(ordered) * 1000 if ordered else 0.0,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "worker_rss_mb": sorted(round(rss, 1) for rss in peak_rss.values()),
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Returns the regressions of ``results`` against a baseline run, as messages."""
+    by_level = {level["concurrency"]: level for level in baseline["levels"]}
+    problems = []
+    for level in results["levels"]:
+        before = by_level.get(level["concurrency"])
+        if before is None:
+            continue
+        if level["throughput"] < before["throughput"] * (1 - max_regression):
+            problems.append(f"concurrency={level['concurrency']}: throughput {before['throughput']:.1f} -> "
+                            f"{level['throughput']:.1f} req/s")
+        if level["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            problems.append(f"concurrency={level['concurrency']}: p95 {before['p95_ms']:.1f} -> {level['p95_ms']:.1f} ms")
+        if level["errors"] > before["errors"]:
+            problems.append(f"concurrency={level['concurrency']}: errors {before['errors']} -> {level['errors']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["wsgi", "asgi"], default="asgi")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=2, help="threads per worker in wsgi mode")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--duration", type=float, default=20, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds of unmeasured load before the first level")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--tool-latency-ms", type=float, default=50)
+    parser.add_argument("--memory-latency-ms", type=float, default=100)
+    parser.add_argument("--script", type=Path, help="JSON list of conversations (lists of user messages)")
+    parser.add_argument("--db-url", help="session database; sessions stay in worker memory when omitted")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="results JSON of a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    parser.add_argument("--server-log", help="file for the gunicorn output")
+    args = parser.parse_args()
+
+    conversations = json.loads(args.script.read_text()) if args.script else CONVERSATIONS
+    toolbox = FakeToolboxServer(latency=args.tool_latency_ms / 1000)
+    toolbox_url = toolbox.start()
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = start_gunicorn(args, toolbox_url, port)
+    results = {"mode": args.mode, "workers": args.workers, "threads": args.threads if args.mode == "wsgi" else None,
+               "llm_latency_ms": args.llm_latency_ms, "tool_latency_ms": args.tool_latency_ms,
+               "memory_latency_ms": args.memory_latency_ms, "levels": []}
+    try:
+        asyncio.run(wait_until_ready(base_url, process))
+        if args.warmup:
+            asyncio.run(run_level(base_url, conversations, min(args.concurrency), args.warmup, args.timeout, args.seed))
+        sampler = RssSampler(process.pid)
+        for concurrency in args.concurrency:
+            with sampler:
+                latencies, errors, elapsed = asyncio.run(
+                    run_level(base_url, conversations, concurrency, args.duration, args.timeout, args.seed)
+                )
+            level = summarize(concurrency, latencies, errors, elapsed, sampler.peak)
+            results["levels"].append(level)
+            print(
+                f"{args.mode} workers={args.workers} concurrency={concurrency:<4} turns={level['turns']:<6} "
+                f"throughput={level['throughput']:7.1f} turns/s  p50={level['p50_ms']:7.1f} ms  "
+                f"p95={level['p95_ms']:7.1f} ms  p99={level['p99_ms']:7.1f} ms  errors={level['errors']}  "
+                f"worker_rss_mb={level['worker_rss_mb']}"
+            )
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        toolbox.stop()
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        problems = compare(results, json.loads(args.baseline.read_text()), args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"No regression beyond {args.max_regression:.0%} against {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,58 @@
+import os
+import time
+
+# SERVER_MODE=wsgi runs sync workers, where every async view call goes through
+# async_to_sync and in-flight agent turns are capped at workers * threads.
+# SERVER_MODE=asgi runs uvicorn workers, each with one long-lived event loop
+# shared by all of its in-flight agent turns.
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+
 timeout = 120
 preload_app = True
-workers = 2
-threads = 2
\ No newline at end of file
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# Import ADK, Vertex AI and the agent modules in the master before forking, so
+# workers start with them loaded and share those pages. Importing them opens no
+# connections and starts no threads; clients are created per worker in warmup.
+PRELOAD_AGENT_MODULES = os.environ.get("PRELOAD_AGENT_MODULES", "true").lower() == "true"
+
+
+def on_starting(server):
+    # Start /metrics from zero; snapshots of workers from a previous run (and their archive) would be summed in.
+    metrics_dir = os.environ.get("METRICS_DIR")
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for filename in os.listdir(metrics_dir):
+            if filename.endswith(".json"):
+                os.remove(os.path.join(metrics_dir, filename))
+
+
+def when_ready(server):
+    # Runs in the master after the (preloaded) app is loaded and before the workers are forked.
+    if preload_app and PRELOAD_AGENT_MODULES:
+        start = time.perf_counter()
+        import adk_bug_ticket_agent.services  # noqa: F401
+
+        server.log.info("Agent modules imported in %.2f s before forking workers", time.perf_counter() - start)
+
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "web_ui.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "web_ui.wsgi:application"
+    threads = 2
+
+    # Uvicorn workers get the same hooks through the ASGI lifespan protocol.
+    def post_worker_init(worker):
+        try:
+            from adk_bug_ticket_agent import health
+
+            # In a background thread by default; /readyz passes once it is done.
+            health.start_warmup()
+        except Exception as e:
+            # Keep the worker up; the services are retried lazily on the first request.
+            worker.log.warning("Agent service initialization failed at startup: %s", e)
+
+    def worker_exit(server, worker):
+        from adk_bug_ticket_agent import services
+
+        services.shutdown_sync()
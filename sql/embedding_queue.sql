@@ -0,0 +1,61 @@
+-- Incremental embedding of tickets. Run after sql/data.sql and README step 6 (and step 7,
+-- if the embedding column already exists). Safe to re-run.
+--
+-- Inserts and title/description edits queue the ticket in ticket_embedding_queue;
+-- `python manage.py embed_tickets` embeds queued tickets in batches, outside the write path.
+
+-- The embedding becomes a plain column written by the worker. If it was created as a
+-- generated column (embedding(...) on every INSERT/UPDATE), existing values are kept.
+ALTER TABLE tickets ADD COLUMN IF NOT EXISTS embedding vector(768);
+ALTER TABLE tickets ALTER COLUMN embedding DROP EXPRESSION IF EXISTS;
+
+CREATE TABLE IF NOT EXISTS ticket_embedding_queue (
+    ticket_id INTEGER PRIMARY KEY REFERENCES tickets (ticket_id) ON DELETE CASCADE,
+    enqueued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ticket_embedding_queue_due_idx ON ticket_embedding_queue (next_attempt_at);
+
+CREATE OR REPLACE FUNCTION enqueue_ticket_embedding()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT'
+       OR NEW.title IS DISTINCT FROM OLD.title
+       OR NEW.description IS DISTINCT FROM OLD.description THEN
+        INSERT INTO ticket_embedding_queue (ticket_id) VALUES (NEW.ticket_id)
+        ON CONFLICT (ticket_id) DO UPDATE
+            SET enqueued_at = CURRENT_TIMESTAMP, attempts = 0,
+                next_attempt_at = CURRENT_TIMESTAMP, last_error = NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tickets_enqueue_embedding ON tickets;
+CREATE TRIGGER tickets_enqueue_embedding
+AFTER INSERT OR UPDATE OF title, description ON tickets
+FOR EACH ROW
+EXECUTE PROCEDURE enqueue_ticket_embedding();
+
+-- The updated_time trigger of README step 6, limited to the columns users edit: the worker's
+-- embedding writes must not make every embedded ticket look freshly updated.
+CREATE OR REPLACE FUNCTION update_updated_time_tickets()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_time = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_tickets_updated_time ON tickets;
+CREATE TRIGGER update_tickets_updated_time
+BEFORE UPDATE OF title, description, assignee, priority, status ON tickets
+FOR EACH ROW
+EXECUTE PROCEDURE update_updated_time_tickets();
+
+-- Queue the tickets that have no embedding yet.
+INSERT INTO ticket_embedding_queue (ticket_id)
+SELECT ticket_id FROM tickets WHERE embedding IS NULL
+ON CONFLICT (ticket_id) DO NOTHING;
@@ -0,0 +1,25 @@
+-- Indexes backing the ticket tools in mcp-server/mcp-toolbox/tools.yaml.
+-- Safe to re-run. On a large live table, run each CREATE INDEX with CONCURRENTLY
+-- (outside a transaction block) to avoid locking out writes while it builds.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- get-tickets-by-status: lower(status) = lower($1), paged by ticket_id. The trailing
+-- ticket_id lets a page start at the cursor and stop after page_size rows.
+CREATE INDEX IF NOT EXISTS tickets_status_lower_id_idx ON tickets (lower(status), ticket_id);
+DROP INDEX IF EXISTS tickets_status_lower_idx;
+
+-- get-tickets-by-priority: matches on the priority code ('p0' for 'P0 - Critical'),
+-- so both 'P0' and 'P0 - Critical' hit the index; paged by ticket_id like the above.
+CREATE INDEX IF NOT EXISTS tickets_priority_code_id_idx ON tickets (lower(split_part(priority, ' - ', 1)), ticket_id);
+DROP INDEX IF EXISTS tickets_priority_code_idx;
+
+-- get-tickets-by-assignee: substring match on the e-mail ('%' || $1 || '%').
+-- A trigram index serves ILIKE patterns with a leading wildcard.
+CREATE INDEX IF NOT EXISTS tickets_assignee_trgm_idx ON tickets USING gin (assignee gin_trgm_ops);
+
+-- get-tickets-by-date-range: one range scan per column.
+CREATE INDEX IF NOT EXISTS tickets_creation_time_idx ON tickets (creation_time);
+CREATE INDEX IF NOT EXISTS tickets_updated_time_idx ON tickets (updated_time);
+
+ANALYZE tickets;
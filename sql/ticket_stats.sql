@@ -0,0 +1,105 @@
+-- Ticket statistics behind get-ticket-counts and get-ticket-counts-by-day in
+-- mcp-server/mcp-toolbox/tools.yaml. Run after sql/data.sql and the updated_time
+-- trigger of README step 6. Safe to re-run: the counts are rebuilt from tickets.
+--
+-- ticket_counts holds the number of tickets per (status, priority, assignee) as they
+-- are now. ticket_daily_counts holds, per day and (status, priority, assignee), the
+-- tickets created that day and the tickets that moved into that status that day.
+-- A trigger keeps both up to date on every INSERT, UPDATE and DELETE of tickets, in
+-- the same transaction, so the tools read a few summary rows instead of the tickets.
+-- Missing values are stored as '' (they are part of the primary key).
+
+CREATE TABLE IF NOT EXISTS ticket_counts (
+    status VARCHAR(50) NOT NULL,
+    priority VARCHAR(50) NOT NULL,
+    assignee VARCHAR(100) NOT NULL,
+    tickets INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, priority, assignee)
+);
+
+CREATE TABLE IF NOT EXISTS ticket_daily_counts (
+    day DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    priority VARCHAR(50) NOT NULL,
+    assignee VARCHAR(100) NOT NULL,
+    created INTEGER NOT NULL DEFAULT 0,  -- created that day (under the status they were created with)
+    entered INTEGER NOT NULL DEFAULT 0,  -- moved into this status that day, creation included
+    PRIMARY KEY (day, status, priority, assignee)
+);
+
+CREATE OR REPLACE FUNCTION bump_ticket_count(p_status TEXT, p_priority TEXT, p_assignee TEXT, p_delta INTEGER)
+RETURNS VOID AS $$
+    INSERT INTO ticket_counts (status, priority, assignee, tickets)
+    VALUES (COALESCE(p_status, ''), COALESCE(p_priority, ''), COALESCE(p_assignee, ''), p_delta)
+    ON CONFLICT (status, priority, assignee) DO UPDATE SET tickets = ticket_counts.tickets + EXCLUDED.tickets;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION bump_ticket_daily_count(p_day DATE, p_status TEXT, p_priority TEXT, p_assignee TEXT,
+                                                   p_created INTEGER, p_entered INTEGER)
+RETURNS VOID AS $$
+    INSERT INTO ticket_daily_counts (day, status, priority, assignee, created, entered)
+    VALUES (p_day, COALESCE(p_status, ''), COALESCE(p_priority, ''), COALESCE(p_assignee, ''), p_created, p_entered)
+    ON CONFLICT (day, status, priority, assignee) DO UPDATE
+        SET created = ticket_daily_counts.created + EXCLUDED.created,
+            entered = ticket_daily_counts.entered + EXCLUDED.entered;
+$$ LANGUAGE sql;
+
+-- Runs after update_updated_time_tickets() (README step 6) has set NEW.updated_time, which
+-- dates the status change.
+CREATE OR REPLACE FUNCTION update_ticket_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_ticket_count(NEW.status, NEW.priority, NEW.assignee, 1);
+        PERFORM bump_ticket_daily_count(COALESCE(NEW.creation_time, now())::date, NEW.status, NEW.priority, NEW.assignee, 1, 1);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_ticket_count(OLD.status, OLD.priority, OLD.assignee, -1);
+    ELSIF (OLD.status, OLD.priority, OLD.assignee) IS DISTINCT FROM (NEW.status, NEW.priority, NEW.assignee) THEN
+        -- Lower key first, so two tickets moving in opposite directions cannot deadlock.
+        IF (COALESCE(OLD.status, ''), COALESCE(OLD.priority, ''), COALESCE(OLD.assignee, ''))
+           < (COALESCE(NEW.status, ''), COALESCE(NEW.priority, ''), COALESCE(NEW.assignee, '')) THEN
+            PERFORM bump_ticket_count(OLD.status, OLD.priority, OLD.assignee, -1);
+            PERFORM bump_ticket_count(NEW.status, NEW.priority, NEW.assignee, 1);
+        ELSE
+            PERFORM bump_ticket_count(NEW.status, NEW.priority, NEW.assignee, 1);
+            PERFORM bump_ticket_count(OLD.status, OLD.priority, OLD.assignee, -1);
+        END IF;
+        IF lower(OLD.status) IS DISTINCT FROM lower(NEW.status) THEN
+            PERFORM bump_ticket_daily_count(COALESCE(NEW.updated_time, now())::date, NEW.status, NEW.priority, NEW.assignee, 0, 1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tickets_update_stats ON tickets;
+CREATE TRIGGER tickets_update_stats
+AFTER INSERT OR UPDATE OF status, priority, assignee OR DELETE ON tickets
+FOR EACH ROW
+EXECUTE PROCEDURE update_ticket_stats();
+
+-- Rebuild from the current tickets, with writes held off so none is counted twice or missed.
+-- Status history before this script ran is not known: a ticket counts as having entered its
+-- current status on the day of its last update.
+BEGIN;
+LOCK TABLE tickets IN SHARE ROW EXCLUSIVE MODE;
+TRUNCATE ticket_counts, ticket_daily_counts;
+INSERT INTO ticket_counts (status, priority, assignee, tickets)
+SELECT COALESCE(status, ''), COALESCE(priority, ''), COALESCE(assignee, ''), count(*)
+FROM tickets
+GROUP BY 1, 2, 3;
+INSERT INTO ticket_daily_counts (day, status, priority, assignee, created, entered)
+SELECT day, status, priority, assignee, sum(created), sum(entered)
+FROM (
+    SELECT COALESCE(creation_time, updated_time, now())::date AS day, COALESCE(status, '') AS status, COALESCE(priority, '') AS priority,
+           COALESCE(assignee, '') AS assignee, 1 AS created, 0 AS entered
+    FROM tickets
+    UNION ALL
+    SELECT COALESCE(updated_time, creation_time, now())::date, COALESCE(status, ''), COALESCE(priority, ''), COALESCE(assignee, ''), 0, 1
+    FROM tickets
+) changes
+GROUP BY 1, 2, 3, 4;
+COMMIT;
+
+ANALYZE ticket_counts;
+ANALYZE ticket_daily_counts;
@@ -0,0 +1,48 @@
+-- Vector search for the search-tickets tool in mcp-server/mcp-toolbox/tools.yaml.
+-- Run after the embedding column exists (README step 7). Safe to re-run.
+
+-- Approximate nearest-neighbour index on the ticket embeddings (cosine distance, the <=> operator).
+-- Query cost grows roughly with log(rows) instead of scanning every embedding.
+CREATE INDEX IF NOT EXISTS tickets_embedding_hnsw_idx ON tickets
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+-- Candidates examined per search (pgvector default 40). Higher is slower but finds more of the true neighbours.
+-- ALTER DATABASE "tickets-db" SET hnsw.ef_search = 100;
+-- With pgvector >= 0.8, keep scanning the index when the status filter discards candidates,
+-- so filtered searches still return up to top_k rows:
+-- ALTER DATABASE "tickets-db" SET hnsw.iterative_scan = relaxed_order;
+
+-- Query embeddings keyed by model and normalized query text, so repeated searches
+-- skip the call to the embedding model.
+CREATE TABLE IF NOT EXISTS query_embeddings (
+    model TEXT NOT NULL,
+    query_text TEXT NOT NULL,
+    embedding vector(768) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (model, query_text)
+);
+
+CREATE OR REPLACE FUNCTION cached_query_embedding(p_query TEXT, p_model TEXT DEFAULT 'text-embedding-005')
+RETURNS vector
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    normalized TEXT := lower(regexp_replace(trim(p_query), '\s+', ' ', 'g'));
+    result vector;
+BEGIN
+    SELECT e.embedding INTO result
+    FROM query_embeddings e
+    WHERE e.model = p_model AND e.query_text = normalized;
+
+    IF result IS NULL THEN
+        result := embedding(p_model, normalized)::vector;
+        INSERT INTO query_embeddings (model, query_text, embedding)
+        VALUES (p_model, normalized, result)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN result;
+END;
+$$;
+
+-- Old entries can be pruned at any time, for example from a nightly job:
+-- DELETE FROM query_embeddings WHERE created_at < NOW() - INTERVAL '30 days';
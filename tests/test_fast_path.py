@@ -0,0 +1,100 @@
+import asyncio
+import json
+from datetime import date
+
+import pytest
+
+from adk_bug_ticket_agent.fast_path import FastPathRouter, parse_lookup, plan_call
+
+TODAY = date(2025, 6, 11)  # a Wednesday
+
+
+@pytest.mark.parametrize("query, filters", [
+    ("Show me ticket 42", {"ticket_id": "42"}),
+    ("tickets assigned to susan.chen", {"assignee": "susan.chen"}),
+    ("bugs owned by user with email susan.chen@example.com", {"assignee": "susan.chen@example.com"}),
+    ("open tickets for susan.chen@example.com", {"assignee": "susan.chen@example.com", "status": "Open"}),
+    ("susan.chen@example.com tickets", {"assignee": "susan.chen@example.com"}),
+    ("critical priority tickets", {"priority": "p0"}),
+    ("Which issues are currently marked as In Progress?", {"status": "In Progress"}),
+])
+def test_parse_lookup(query, filters):
+    assert parse_lookup(query, TODAY) == filters
+
+
+def test_parse_lookup_dates():
+    filters = parse_lookup("P0 open bugs this week", TODAY)
+    assert filters["priority"] == "p0" and filters["status"] == "Open"
+    assert (filters["dates"]["start_date"], filters["dates"]["end_date"]) == ("2025-06-09", "2025-06-11")
+    assert filters["dates"]["date_field"] == "creation_time"
+    assert parse_lookup("closed tickets updated yesterday", TODAY)["dates"]["date_field"] == "updated_time"
+
+
+@pytest.mark.parametrize("query", [
+    "open tickets for v2.3",  # a version, not an assignee
+    "tickets for release.candidate",
+    "resolved bugs yesterday",  # resolved yesterday or created yesterday?
+    "closed tickets this week",
+    "tickets not assigned to susan.chen",
+    "tickets about the login page",
+    "ticket 42 and ticket 43",
+    "open and closed tickets",
+    "how many tickets are open",
+    "which of them are P0",
+    "close ticket 42",
+])
+def test_parse_lookup_sends_to_agent(query):
+    assert parse_lookup(query, TODAY) is None
+
+
+def test_plan_call_leaves_out_internal_keys():
+    name, args = plan_call(parse_lookup("bugs created in the last 3 days", TODAY))
+    assert name == "get-tickets-by-date-range"
+    assert args == {"start_date": "2025-06-08", "end_date": "2025-06-11", "date_field": "creation_time",
+                    "after_ticket_id": 0}
+
+
+class FakeTool:
+    def __init__(self, name, run):
+        self.name = name
+        self.run = run
+        self.calls = []
+
+    async def run_async(self, args, tool_context):
+        self.calls.append(args)
+        return json.dumps(self.run(args))
+
+
+class FakeToolset:
+    def __init__(self, tickets):
+        by_id = {str(t["ticket_id"]): t for t in tickets}
+        listed = [{k: v for k, v in t.items() if k != "description"} for t in tickets]
+        self.tools = {
+            "get-ticket-by-id": FakeTool("get-ticket-by-id", lambda args: by_id.get(args["ticket_id"])),
+            "get-tickets-by-assignee": FakeTool(
+                "get-tickets-by-assignee", lambda args: [t for t in listed if t["assignee"] == args["assignee"]]),
+        }
+
+    async def get_tools(self):
+        return list(self.tools.values())
+
+
+TICKETS = [
+    {"ticket_id": 1, "title": "Login fails", "description": "SSO loop on Safari", "assignee": "a.b@x.com",
+     "priority": "P0", "status": "Open", "creation_time": "2025-06-10", "updated_time": "2025-06-10"},
+]
+
+
+def test_single_row_from_list_tool_is_fetched_in_full():
+    toolset = FakeToolset(TICKETS)
+    answer = asyncio.run(FastPathRouter(toolset).answer("tickets assigned to a.b@x.com"))
+    assert "**Description:** SSO loop on Safari" in answer
+    assert "`get-ticket-by-id`" in answer
+    assert toolset.tools["get-ticket-by-id"].calls == [{"ticket_id": "1"}]
+
+
+def test_no_rows_goes_to_agent():
+    router = FastPathRouter(FakeToolset(TICKETS))
+    assert asyncio.run(router.answer("tickets assigned to nobody@x.com")) is None
+    assert asyncio.run(router.answer("ticket 99")) is None
+    assert router.stats["fallbacks"] == 2
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from adk_bug_ticket_agent.tools.toolbox import ParallelReadCalls
+
+
+class SlowTool:
+    def __init__(self, name, seconds=0.05):
+        self.name = name
+        self.seconds = seconds
+        self.calls = 0
+        self.cancelled = 0
+
+    async def run_async(self, args, tool_context):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"ticket_id": args.get("ticket_id")}
+
+
+def _response(*calls):
+    return LlmResponse(content=types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name=name, args=args)) for name, args in calls]))
+
+
+def _context(invocation_id="inv-1"):
+    return SimpleNamespace(invocation_id=invocation_id)
+
+
+def test_started_calls_answer_the_tool_calls():
+    tool = SlowTool("get-ticket-by-id")
+    reads = ParallelReadCalls(SimpleNamespace(_tools=[tool]))
+
+    async def turn():
+        reads.after_model(_context(), _response(("get-ticket-by-id", {"ticket_id": "1"}),
+                                                ("get-ticket-by-id", {"ticket_id": "2"})))
+        assert tool.calls == 0  # started, not yet run
+        first = await reads.before_tool(tool, {"ticket_id": "1"}, _context())
+        second = await reads.before_tool(tool, {"ticket_id": "2"}, _context())
+        # A third, unplanned call is left to ADK.
+        third = await reads.before_tool(tool, {"ticket_id": "1"}, _context())
+        return first, second, third
+
+    first, second, third = asyncio.run(turn())
+    assert (first, second, third) == ({"ticket_id": "1"}, {"ticket_id": "2"}, None)
+    assert tool.calls == 2
+    assert reads._started == {}
+
+
+def test_write_cancels_started_reads():
+    tool = SlowTool("get-ticket-by-id", seconds=5)
+    write = SlowTool("update-ticket-status")
+    reads = ParallelReadCalls(SimpleNamespace(_tools=[tool, write]))
+
+    async def turn():
+        reads.after_model(_context(), _response(("get-ticket-by-id", {"ticket_id": "1"}),
+                                                ("get-ticket-by-id", {"ticket_id": "2"})))
+        await asyncio.sleep(0)
+        assert await reads.before_tool(write, {}, _context()) is None
+        await asyncio.sleep(0.01)
+
+    asyncio.run(turn())
+    assert tool.cancelled == 2
+    assert reads._started == {}
+
+
+def test_drop_from_another_thread_cancels_on_the_task_loop():
+    tool = SlowTool("get-ticket-by-id", seconds=5)
+    reads = ParallelReadCalls(SimpleNamespace(_tools=[tool]))
+    started, dropped = threading.Event(), threading.Event()
+
+    async def turn():
+        reads.after_model(_context("inv-a"), _response(("get-ticket-by-id", {"ticket_id": "1"}),
+                                                       ("get-ticket-by-id", {"ticket_id": "2"})))
+        await asyncio.sleep(0)
+        started.set()
+        while not dropped.is_set():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+
+    thread = threading.Thread(target=asyncio.run, args=(turn(),))
+    thread.start()
+    assert started.wait(5)
+    reads._drop("inv-a")  # this thread runs no loop of its own
+    dropped.set()
+    thread.join(5)
+    assert tool.cancelled == 2
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from adk_bug_ticket_agent.embeddings import HashingEmbedder
+from adk_bug_ticket_agent.response_cache import SemanticResponseCache, _entities, normalize_query
+
+
+def _ask(cache, query):
+    return asyncio.run(cache.lookup("app", "user", query))
+
+
+def _answer(cache, query, answer):
+    found, ticket = _ask(cache, query)
+    assert found is None
+    asyncio.run(cache.store(ticket, answer))
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("tickets assigned to susan.chen@x.com", "tickets not assigned to susan.chen@x.com"),
+    ("open tickets assigned to susan.chen@x.com", "open tickets that aren't assigned to susan.chen@x.com"),
+    ("P1 tickets created before 2025-06-01", "P1 tickets created after 2025-06-01"),
+    ("open tickets", "unassigned open tickets"),
+])
+def test_negated_or_compared_query_misses(stored, asked):
+    cache = SemanticResponseCache(embedder=HashingEmbedder(), threshold=0.5)
+    _answer(cache, stored, "stored answer")
+    assert _entities(normalize_query(stored)) != _entities(normalize_query(asked))
+    assert _ask(cache, asked)[0] is None
+    assert cache.stats["hits"] == 0
+
+
+def test_paraphrase_hits():
+    cache = SemanticResponseCache(embedder=HashingEmbedder(), threshold=0.5)
+    _answer(cache, "tickets assigned to susan.chen@x.com", "stored answer")
+    assert _ask(cache, "Tickets assigned to susan.chen@x.com?")[0] == "stored answer"
+    assert _ask(cache, "show me tickets assigned to susan.chen@x.com")[0] == "stored answer"
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from adk_bug_ticket_agent.sessions import CachedDatabaseSessionService
+
+KEY = {"app_name": "app", "user_id": "user"}
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'sessions.db'}"
+
+
+def _event(author, text, **state):
+    return Event(author=author, invocation_id="inv", timestamp=time.time(),
+                 content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+                 actions=EventActions(state_delta=state))
+
+
+def test_held_events_are_written_by_flush(db_url):
+    async def run():
+        service = CachedDatabaseSessionService(db_url)
+        created = await service.create_session(**KEY)
+        session = await service.get_session(**KEY, session_id=created.id)
+        for text in ("hi", "hello", "bye"):
+            await service.append_event(session, _event("user", text, step=text))
+        other_worker = CachedDatabaseSessionService(db_url)
+        before = await other_worker.get_session(**KEY, session_id=created.id, config=GetSessionConfig())
+        assert await service.flush_session(**KEY, session_id=created.id) == 3
+        after = await other_worker.get_session(**KEY, session_id=created.id, config=GetSessionConfig())
+        return before, after, service.snapshot()
+
+    before, after, stats = asyncio.run(run())
+    assert before.events == []
+    assert [e.content.parts[0].text for e in after.events] == ["hi", "hello", "bye"]
+    assert after.state["step"] == "bye"
+    assert after.last_update_time > before.last_update_time
+    assert stats["flushes"] == 1 and stats["conflicts"] == 0
+
+
+def test_versions_move_forward_within_one_second(db_url):
+    # SQLite's now() has second resolution; each write must still change the version.
+    async def run():
+        service = CachedDatabaseSessionService(db_url)
+        created = await service.create_session(**KEY)
+        versions = []
+        for text in ("one", "two", "three"):
+            session = await service.get_session(**KEY, session_id=created.id)
+            await service.append_event(session, _event("user", text))
+            await service.flush_session(**KEY, session_id=created.id)
+            versions.append(service._read_version((KEY["app_name"], KEY["user_id"], created.id)))
+        return versions, service.snapshot()
+
+    versions, stats = asyncio.run(run())
+    assert versions == sorted(set(versions))
+    assert stats["hits"] == 3 and stats["stale"] == 0
+
+
+def test_conflicting_turns_are_not_interleaved(db_url):
+    async def run():
+        worker_a = CachedDatabaseSessionService(db_url)
+        worker_b = CachedDatabaseSessionService(db_url)
+        created = await worker_a.create_session(**KEY)
+        session_a = await worker_a.get_session(**KEY, session_id=created.id)
+        session_b = await worker_b.get_session(**KEY, session_id=created.id)
+        # Both workers run a turn of the same session at once; B writes first.
+        await worker_a.append_event(session_a, _event("user", "a question", a="1"))
+        await worker_b.append_event(session_b, _event("user", "b question", b="1"))
+        await worker_a.append_event(session_a, _event("agent", "a answer"))
+        await worker_b.append_event(session_b, _event("agent", "b answer"))
+        await worker_b.flush_session(**KEY, session_id=created.id)
+        assert await worker_a.flush_session(**KEY, session_id=created.id) == 2
+        stored = await worker_b.get_session(**KEY, session_id=created.id, config=GetSessionConfig())
+        reloaded = await worker_a.get_session(**KEY, session_id=created.id)
+        return stored, reloaded, worker_a.snapshot()
+
+    stored, reloaded, stats = asyncio.run(run())
+    assert [e.content.parts[0].text for e in stored.events] == ["b question", "b answer", "a question", "a answer"]
+    assert stored.state == {"a": "1", "b": "1"}
+    assert stats["conflicts"] == 1 and stats["misses"] == 1  # the entry was dropped and reloaded
+    assert [e.content.parts[0].text for e in reloaded.events][-2:] == ["a question", "a answer"]
+
+
+def test_window_keeps_whole_turns_with_many_tool_calls(db_url):
+    from adk_bug_ticket_agent.sessions import CompactingDatabaseSessionService
+
+    async def run():
+        service = CompactingDatabaseSessionService(db_url, window_turns=2, compact_every=1)
+        session = await service.create_session(**KEY)
+        for turn in range(4):
+            await service.append_event(session, _event("user", f"question {turn}"))
+            for call in range(12):  # far more events than a turn used to be budgeted
+                await service.append_event(session, _event("agent", f"tool {turn}.{call}"))
+        return await service.get_session(**KEY, session_id=session.id)
+
+    session = asyncio.run(run())
+    texts = [e.content.parts[0].text for e in session.events]
+    # No summary yet: the last window_turns + compact_every turns, each complete.
+    assert [t for t in texts if t.startswith("question")] == ["question 1", "question 2", "question 3"]
+    assert len(texts) == 3 * 13
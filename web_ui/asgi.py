@@ -13,4 +13,41 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_ui.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def lifespan(scope, receive, send):
+    """Handles the ASGI lifespan protocol, which Django itself does not implement.
+
+    Startup hands the creation of the agent and its services to a warmup
+    thread (see adk_bug_ticket_agent/health.py); they are created once and
+    then shared by every request served by the worker's loop. /readyz passes
+    once warmup is done.
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                from adk_bug_ticket_agent import health
+
+                health.start_warmup()
+            except Exception as e:
+                # Keep the worker up; the services are retried lazily on the first request.
+                print(f"Agent service initialization failed at startup: {e}")
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            try:
+                from adk_bug_ticket_agent import services
+
+                await services.shutdown()
+            except Exception as e:
+                print(f"Agent service shutdown failed: {e}")
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
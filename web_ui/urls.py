@@ -18,7 +18,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from adk_bug_ticket_agent.views import healthz, metrics_endpoint, readyz
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("healthz", healthz, name="healthz"),
+    path("readyz", readyz, name="readyz"),
+    path("metrics", metrics_endpoint, name="metrics"),
     path("agent/", include("adk_bug_ticket_agent.urls")),
 ]